@@ -11,6 +11,7 @@ Usage:
     python tfsm_report_server.py --tfsm-db path/to/db     # Custom template DB
     python tfsm_report_server.py --no-browser             # Don't auto-open browser
     python tfsm_report_server.py --json report.json       # Load pre-generated report (fast!)
+    python tfsm_report_server.py --workers 4              # Analyze on 4 processes
 
 Workflow for large datasets:
     # Generate report once (slow)
@@ -1107,6 +1108,9 @@ Workflow for large datasets:
   
   # Step 2: View instantly, as many times as you want
   python tfsm_report_server.py --json report.json
+
+Fresh analyses reuse parse results cached by earlier runs
+(~/.vcollector/parse_cache.db); pass --no-cache to parse everything.
         """
     )
     
@@ -1151,12 +1155,25 @@ Workflow for large datasets:
         help="Minimum score for extraction (default: 50)"
     )
     
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help="Don't use or update the parse result cache"
+    )
+    
     parser.add_argument(
         '--no-browser',
         action='store_true',
         help="Don't auto-open browser"
     )
     
+    parser.add_argument(
+        '--workers', '-w',
+        type=int,
+        default=1,
+        help="Analyze files in N processes (default: 1)"
+    )
+    
     args = parser.parse_args()
     
     # Load from JSON or run fresh analysis
@@ -1190,12 +1207,14 @@ Workflow for large datasets:
             collections_dir=args.collections_dir,
             tfsm_db=tfsm_db,
             dcim_db=args.dcim_db,
-            verbose=False
+            verbose=False,
+            use_cache=not args.no_cache
         )
         
         report = analyzer.analyze_all(
             extract=True,
-            min_score_for_extract=args.min_score
+            min_score_for_extract=args.min_score,
+            workers=args.workers
         )
         
         print(f"Analysis complete: {report.total_files} files, {report.total_matched} matched")
@@ -0,0 +1,147 @@
+"""
+Microbenchmark: per-chunk ANSI filtering vs. AnsiStreamFilter.
+
+Path: scripts/bench_ansi_filter.py
+
+Compares the old receive path (decode each chunk on its own, then
+filter_ansi_sequences) against the stateful AnsiStreamFilter used by
+SSHClient, reporting throughput in MB/s and how many characters each
+approach corrupts at chunk boundaries.
+
+Transcripts are raw session captures (bytes as received, ANSI sequences
+included). If none are given, synthetic Arista/Cisco/Juniper-style
+transcripts are generated.
+
+Usage:
+    python scripts/bench_ansi_filter.py
+    python scripts/bench_ansi_filter.py transcripts/arista.raw transcripts/junos.raw
+    python scripts/bench_ansi_filter.py --chunk-size 4096 --repeat 5 ./transcripts
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from vcollector.ssh.client import AnsiStreamFilter, filter_ansi_sequences  # noqa: E402
+
+
+LEGACY_PATTERN = r'\x1b\[[0-9;?]*[a-zA-Z]|\x1b[()][AB012]|\x07|[\x00-\x08\x0B\x0C\x0E-\x1F]'
+
+
+def synthetic_transcripts(target_bytes=8 * 1024 * 1024):
+    """Build vendor-flavoured raw transcripts of roughly target_bytes each."""
+    arista_line = "Ethernet{n}/1    connected    {n}    full    10G    10GBASE-SR  – uplink\r\n"
+    cisco_line = "Internet  10.{a}.{b}.1    {n}   0050.56{a:02x}.{b:02x}01  ARPA   Vlan{n}\r\n"
+    junos_line = ("\x1b[K10.{a}.{b}.0/24   *[OSPF/10] 3w2d, metric {n}\r\n"
+                  "\x1b[7m---(more)---\x1b[m\x1b[2K\r")
+
+    transcripts = {}
+    for name, line, prompt in (
+        ("arista", arista_line, "\x1b[?2004hleaf1#"),
+        ("cisco", cisco_line, "\x1b[24;1H\x1b[2Kcore1#"),
+        ("juniper", junos_line, "\x1b]0;user@mx1\x07user@mx1> "),
+    ):
+        parts = []
+        size = 0
+        n = 0
+        while size < target_bytes:
+            text = line.format(n=n % 4096, a=n % 250, b=(n // 250) % 250)
+            if n % 200 == 0:
+                text += prompt + "\r\n"
+            data = text.encode('utf-8')
+            parts.append(data)
+            size += len(data)
+            n += 1
+        transcripts[name] = b''.join(parts)
+    return transcripts
+
+
+def load_transcripts(paths):
+    """Load raw transcripts from files or directories."""
+    transcripts = {}
+    for path in paths:
+        path = Path(path).expanduser()
+        files = sorted(p for p in path.rglob('*') if p.is_file()) if path.is_dir() else [path]
+        for f in files:
+            transcripts[str(f)] = f.read_bytes()
+    return transcripts
+
+
+def chunks_of(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def run_legacy(chunks):
+    """Old _recv_filtered behaviour: independent decode + re.sub per chunk."""
+    out = []
+    for chunk in chunks:
+        text = chunk.decode('utf-8', errors='replace')
+        out.append(re.sub(LEGACY_PATTERN, '', text))
+    return ''.join(out)
+
+
+def run_stream(chunks):
+    """AnsiStreamFilter: incremental decode, precompiled pattern, carried state."""
+    f = AnsiStreamFilter()
+    out = [f.feed(chunk) for chunk in chunks]
+    out.append(f.flush())
+    return ''.join(out)
+
+
+def time_it(func, chunks, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(chunks)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def corrupted_chars(expected, actual):
+    """
+    Characters damaged at chunk boundaries, relative to filtering the whole
+    transcript at once: escape-sequence fragments left behind (length delta)
+    plus multibyte characters replaced with U+FFFD.
+    """
+    if expected == actual:
+        return 0
+    return abs(len(expected) - len(actual)) + max(actual.count('\ufffd') - expected.count('\ufffd'), 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ANSI filtering of SSH output")
+    parser.add_argument('paths', nargs='*', help="Raw transcript files or directories")
+    parser.add_argument('--chunk-size', type=int, action='append',
+                        help="Chunk size(s) in bytes (default: 4096 and 65536)")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per measurement (best is kept)")
+    args = parser.parse_args()
+
+    transcripts = load_transcripts(args.paths) if args.paths else synthetic_transcripts()
+    chunk_sizes = args.chunk_size or [4096, 65536]
+
+    print(f"{'Transcript':<30} {'Chunk':>7} {'Legacy MB/s':>12} {'Stream MB/s':>12} "
+          f"{'Legacy bad':>11} {'Stream bad':>11}")
+    print("-" * 88)
+
+    for name, data in transcripts.items():
+        reference = filter_ansi_sequences(data.decode('utf-8', errors='replace'))
+        mb = len(data) / (1024 * 1024)
+
+        for size in chunk_sizes:
+            chunks = chunks_of(data, size)
+            legacy_time, legacy_out = time_it(run_legacy, chunks, args.repeat)
+            stream_time, stream_out = time_it(run_stream, chunks, args.repeat)
+
+            print(f"{Path(name).name[:30]:<30} {size:>7} "
+                  f"{mb / legacy_time:>12.1f} {mb / stream_time:>12.1f} "
+                  f"{corrupted_chars(reference, legacy_out):>11} {corrupted_chars(reference, stream_out):>11}")
+
+
+if __name__ == '__main__':
+    main()
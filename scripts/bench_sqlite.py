@@ -0,0 +1,185 @@
+"""
+Benchmark: concurrent readers and writers on default vs. shared connections.
+
+Path: scripts/bench_sqlite.py
+
+Models a batch run writing collector.db while the GUI polls it. Writer
+threads insert captures rows one transaction at a time (the old runner's
+pattern), reader threads run the queries the history and captures views
+issue. Each mode gets its own fresh database:
+
+    default  sqlite3.connect() - rollback journal, Python's 5s busy wait
+    shared   vcollector.core.db.connect() / ThreadLocalConnections -
+             WAL, synchronous=NORMAL, busy_timeout, mmap, cache_size
+
+Reports write and read throughput, read latency and lock errors.
+
+Usage:
+    python scripts/bench_sqlite.py
+    python scripts/bench_sqlite.py --writers 4 --readers 4 --seconds 10
+    python scripts/bench_sqlite.py --dir /path/on/the/real/disk
+"""
+
+import argparse
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from vcollector.core.db import ThreadLocalConnections, connect, pragma_summary  # noqa: E402
+
+
+SCHEMA = """
+    CREATE TABLE captures (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        device_id INTEGER,
+        device_name TEXT NOT NULL,
+        capture_type TEXT NOT NULL,
+        filepath TEXT NOT NULL,
+        file_size INTEGER,
+        captured_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        job_history_id INTEGER
+    );
+    CREATE INDEX idx_captures_device ON captures(device_name);
+    CREATE INDEX idx_captures_type ON captures(capture_type);
+"""
+
+CAPTURE_TYPES = ('arp', 'mac', 'config', 'interfaces', 'routes', 'version')
+
+READ_QUERIES = (
+    "SELECT capture_type, COUNT(*), SUM(file_size) FROM captures GROUP BY capture_type",
+    "SELECT * FROM captures ORDER BY id DESC LIMIT 100",
+    "SELECT * FROM captures WHERE device_name = ? ORDER BY captured_at DESC LIMIT 20",
+)
+
+
+def seed(path: Path, rows: int):
+    """Create the captures table with rows of history."""
+    conn = sqlite3.connect(str(path))
+    conn.executescript(SCHEMA)
+    conn.executemany(
+        "INSERT INTO captures (device_id, device_name, capture_type, filepath, file_size) VALUES (?, ?, ?, ?, ?)",
+        ((i % 2000, f"device-{i % 2000}", CAPTURE_TYPES[i % len(CAPTURE_TYPES)],
+          f"/collections/{CAPTURE_TYPES[i % len(CAPTURE_TYPES)]}/device-{i % 2000}.txt", 4096 + i % 8192)
+         for i in range(rows)),
+    )
+    conn.commit()
+    conn.close()
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def run(mode: str, path: Path, writers: int, readers: int, seconds: float) -> dict:
+    """Run writers and readers against path for seconds; return counters."""
+    stop = threading.Event()
+    lock = threading.Lock()
+    totals = {'writes': 0, 'reads': 0, 'write_errors': 0, 'read_errors': 0}
+    latencies = []
+
+    shared_readers = ThreadLocalConnections(path, readonly=True) if mode == 'shared' else None
+
+    def open_writer():
+        return connect(path) if mode == 'shared' else sqlite3.connect(str(path))
+
+    def writer(n):
+        conn = open_writer()
+        writes = errors = 0
+        i = 0
+        while not stop.is_set():
+            i += 1
+            try:
+                conn.execute(
+                    "INSERT INTO captures (device_id, device_name, capture_type, filepath, file_size) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (n, f"bench-{n}", CAPTURE_TYPES[i % len(CAPTURE_TYPES)], f"/bench/{n}/{i}.txt", i),
+                )
+                conn.commit()
+                writes += 1
+            except sqlite3.OperationalError:
+                conn.rollback()
+                errors += 1
+        conn.close()
+        with lock:
+            totals['writes'] += writes
+            totals['write_errors'] += errors
+
+    def reader(n):
+        conn = shared_readers.get() if shared_readers else sqlite3.connect(str(path))
+        reads = errors = 0
+        own = []
+        i = 0
+        while not stop.is_set():
+            i += 1
+            query = READ_QUERIES[i % len(READ_QUERIES)]
+            params = (f"device-{(n * 7 + i) % 2000}",) if '?' in query else ()
+            start = time.perf_counter()
+            try:
+                conn.execute(query, params).fetchall()
+                own.append((time.perf_counter() - start) * 1000)
+                reads += 1
+            except sqlite3.OperationalError:
+                errors += 1
+        if not shared_readers:
+            conn.close()
+        with lock:
+            totals['reads'] += reads
+            totals['read_errors'] += errors
+            latencies.extend(own)
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(writers)]
+    threads += [threading.Thread(target=reader, args=(n,)) for n in range(readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    if shared_readers:
+        shared_readers.close_all()
+
+    totals['read_p50'] = percentile(latencies, 50)
+    totals['read_p95'] = percentile(latencies, 95)
+    totals['read_max'] = max(latencies) if latencies else 0.0
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--writers', type=int, default=2, help="Writer threads (default: 2)")
+    parser.add_argument('--readers', type=int, default=4, help="Reader threads (default: 4)")
+    parser.add_argument('--seconds', type=float, default=5.0, help="Duration per mode (default: 5)")
+    parser.add_argument('--rows', type=int, default=100000, help="Seeded captures rows (default: 100000)")
+    parser.add_argument('--dir', type=Path, help="Where to create the databases (default: a temp dir)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        print(f"{args.writers} writer(s), {args.readers} reader(s), {args.seconds:.0f}s per mode, "
+              f"{args.rows} seeded rows\n")
+        print(f"{'mode':<9} {'writes/s':>9} {'reads/s':>9} {'read p50':>9} {'read p95':>9} "
+              f"{'read max':>9} {'w errors':>9} {'r errors':>9}")
+
+        for mode in ('default', 'shared'):
+            path = Path(tmp) / f"{mode}.db"
+            seed(path, args.rows)
+            r = run(mode, path, args.writers, args.readers, args.seconds)
+            print(f"{mode:<9} {r['writes'] / args.seconds:>9.0f} {r['reads'] / args.seconds:>9.0f} "
+                  f"{r['read_p50']:>7.1f}ms {r['read_p95']:>7.1f}ms {r['read_max']:>7.1f}ms "
+                  f"{r['write_errors']:>9} {r['read_errors']:>9}")
+
+        conn = connect(Path(tmp) / "shared.db")
+        settings = ', '.join(f"{k}={v}" for k, v in pragma_summary(conn).items())
+        conn.close()
+        print(f"\nshared settings: {settings}")
+
+
+if __name__ == '__main__':
+    main()
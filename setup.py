@@ -69,6 +69,12 @@ setup(
             'pytest>=7.0',
             'pytest-qt>=4.0',
         ],
+        'parquet': [
+            'pyarrow>=14.0',
+        ],
+        'zstd': [
+            'zstandard>=0.21',
+        ],
     },
 
     # Include package data (non-Python files)
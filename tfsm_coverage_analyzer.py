@@ -19,8 +19,21 @@ Usage:
     python tfsm_coverage_analyzer.py --extract-dir ./parsed         # Custom output dir
     python tfsm_coverage_analyzer.py --extract-db network.db        # SQLite database
     python tfsm_coverage_analyzer.py --extract-ndjson all.ndjson    # NDJSON for jq
+    python tfsm_coverage_analyzer.py --extract-parquet ./dataset    # Parquet (needs pyarrow)
     python tfsm_coverage_analyzer.py --extract --min-score 75       # Only high-confidence
 
+    # Files saved with save_parsed use the runner's stored records;
+    # force TextFSM over everything with --reparse
+    python tfsm_coverage_analyzer.py --reparse
+
+    # Results are cached in ~/.vcollector/parse_cache.db, so a rerun only
+    # parses new output or templates that changed; bypass with --no-cache
+    python tfsm_coverage_analyzer.py --no-cache
+
+    # Large collections: analyze on 8 processes; only re-analyze files that
+    # changed since the last --incremental run
+    python tfsm_coverage_analyzer.py --workers 8 --incremental
+
     # Purge failed files (cleanup for test iteration)
     python tfsm_coverage_analyzer.py --purge-dry-run                # Preview what would be deleted
     python tfsm_coverage_analyzer.py --purge                        # Delete score=0 files
@@ -31,17 +44,26 @@ Usage:
     cat all.ndjson | jq 'select(.ADDRESS == "10.0.0.1")'
 """
 
+import abc
 import argparse
+import hashlib
 import json
 import csv
+import multiprocessing
+import os
+import re
+import shutil
+import socket
 import sqlite3
 import sys
+import tempfile
 import time
-from collections import defaultdict
-from dataclasses import dataclass, asdict, field
+from collections import defaultdict, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, asdict, field, fields
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Any
 import io
 
 try:
@@ -51,6 +73,48 @@ try:
 except ImportError:
     TEXTFSM_AVAILABLE = False
 
+try:
+    from vcollector.validation.template_cache import get_template_cache
+    from vcollector.validation.template_index import get_template_index
+    from vcollector.validation.parse_cache import get_parse_cache
+
+    TEMPLATE_CACHE_AVAILABLE = True
+except ImportError:
+    TEMPLATE_CACHE_AVAILABLE = False
+
+try:
+    from vcollector.storage.parsed_records import load_parsed, parsed_path
+    from vcollector.validation.template_index import filter_terms
+
+    PARSED_RECORDS_AVAILABLE = True
+except ImportError:
+    PARSED_RECORDS_AVAILABLE = False
+
+try:
+    from vcollector.storage.columnar import PYARROW_AVAILABLE, ParquetDatasetWriter
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+try:
+    from vcollector.core.db import connect as _shared_connect
+
+    SHARED_DB_AVAILABLE = True
+except ImportError:
+    SHARED_DB_AVAILABLE = False
+
+
+def db_connect(path, readonly: bool = False, row_factory=None) -> sqlite3.Connection:
+    """
+    Open a database like the collector does (WAL, busy timeout; see
+    vcollector.core.db), or with sqlite3 defaults outside the package.
+    """
+    if SHARED_DB_AVAILABLE:
+        return _shared_connect(path, readonly=readonly, row_factory=row_factory)
+    conn = sqlite3.connect(str(path))
+    if row_factory is not None:
+        conn.row_factory = row_factory
+    return conn
+
 # ============================================================================
 # Configuration
 # ============================================================================
@@ -59,6 +123,7 @@ DEFAULT_VCOLLECTOR_DIR = Path.home() / ".vcollector"
 DEFAULT_COLLECTIONS_DIR = DEFAULT_VCOLLECTOR_DIR / "collections"
 DEFAULT_DCIM_DB = DEFAULT_VCOLLECTOR_DIR / "dcim.db"
 DEFAULT_COLLECTOR_DB = DEFAULT_VCOLLECTOR_DIR / "collector.db"
+DEFAULT_MANIFEST = DEFAULT_VCOLLECTOR_DIR / "coverage_manifest.json"
 
 # Search paths for TextFSM database (in order of preference)
 TFSM_DB_SEARCH_PATHS = [
@@ -78,7 +143,7 @@ def find_tfsm_db() -> Path:
     for path in TFSM_DB_SEARCH_PATHS:
         if path.exists():
             try:
-                conn = sqlite3.connect(str(path))
+                conn = db_connect(path, readonly=True)
                 cursor = conn.cursor()
                 cursor.execute("SELECT COUNT(*) FROM templates")
                 count = cursor.fetchone()[0]
@@ -95,6 +160,26 @@ def find_tfsm_db() -> Path:
 DEFAULT_TFSM_DB = find_tfsm_db()
 
 
+def template_content_hash(template: Any) -> str:
+    """Content hash of a template row (same digest as the template and parse caches)."""
+    return hashlib.sha1((template['textfsm_content'] or '').encode('utf-8')).hexdigest()
+
+
+def templates_fingerprint(tfsm_db: Path) -> str:
+    """Hash of every template's name and content; changes when any template does."""
+    digest = hashlib.sha1()
+    conn = db_connect(tfsm_db, readonly=True)
+    try:
+        rows = conn.execute(
+            "SELECT cli_command, textfsm_content FROM templates ORDER BY cli_command, textfsm_content"
+        )
+        for name, content in rows:
+            digest.update(f"{name}\0{content}\0".encode('utf-8', errors='replace'))
+    finally:
+        conn.close()
+    return digest.hexdigest()
+
+
 # ============================================================================
 # Data Classes
 # ============================================================================
@@ -116,6 +201,9 @@ class FileResult:
     skipped: bool = False  # True if capture type not parseable
     skip_reason: Optional[str] = None
     parsed_records: Optional[List[Dict]] = None  # The actual extracted data
+    from_stored: bool = False  # Records loaded from the runner's .parsed.ndjson
+    content_sha256: Optional[str] = None  # Digest of the file text (parse cache key)
+    template_hash: Optional[str] = None  # Content hash of the matched template
 
     @property
     def score_bucket(self) -> str:
@@ -189,6 +277,29 @@ class AnalysisReport:
     score_distribution: Dict[str, int] = field(default_factory=dict)
     file_results: List[FileResult] = field(default_factory=list)
     errors: List[str] = field(default_factory=list)
+    extracted_files: int = 0
+    extracted_records: int = 0
+
+
+@dataclass
+class RunningScore:
+    """Score average/min/max accumulated one file at a time."""
+    count: int = 0
+    total: float = 0.0
+    min: float = 0.0
+    max: float = 0.0
+
+    def add(self, score: float):
+        if self.count == 0 or score < self.min:
+            self.min = score
+        if self.count == 0 or score > self.max:
+            self.max = score
+        self.count += 1
+        self.total += score
+
+    @property
+    def avg(self) -> float:
+        return self.total / self.count if self.count else 0.0
 
 
 # ============================================================================
@@ -198,15 +309,23 @@ class AnalysisReport:
 class TextFSMAnalyzer:
     """Lightweight TextFSM analyzer for coverage testing."""
 
-    def __init__(self, db_path: str, verbose: bool = False):
+    # Names this analyzer's scoring (and early exit) in the parse cache
+    PARSE_CACHE_SCORER = 'coverage_analyzer'
+    EARLY_EXIT_SCORE = 75
+
+    def __init__(self, db_path: str, verbose: bool = False, use_cache: bool = True):
         self.db_path = db_path
         self.verbose = verbose
         self._conn = None
+        # Compiled templates shared across files (None when run outside the package)
+        self.template_cache = get_template_cache() if TEMPLATE_CACHE_AVAILABLE else None
+        self.template_index = get_template_index(db_path) if TEMPLATE_CACHE_AVAILABLE else None
+        # Results from earlier runs (None = always parse)
+        self.parse_cache = get_parse_cache() if TEMPLATE_CACHE_AVAILABLE and use_cache else None
 
     def _get_connection(self) -> sqlite3.Connection:
         if self._conn is None:
-            self._conn = sqlite3.connect(self.db_path)
-            self._conn.row_factory = sqlite3.Row
+            self._conn = db_connect(self.db_path, readonly=True, row_factory=sqlite3.Row)
         return self._conn
 
     def close(self):
@@ -217,6 +336,9 @@ class TextFSMAnalyzer:
     def get_filtered_templates(self, filter_string: Optional[str] = None) -> List[sqlite3.Row]:
         """Get templates matching filter."""
         conn = self._get_connection()
+        if self.template_index is not None:
+            return self.template_index.fetch(conn, filter_string)
+
         cursor = conn.cursor()
 
         if filter_string:
@@ -243,26 +365,59 @@ class TextFSMAnalyzer:
 
         Returns: (template_name, parsed_records, score)
         """
+        template, records, score = self.best_template(device_output, filter_string)
+        return (template['cli_command'] if template else None), records, score
+
+    def best_template(
+            self,
+            device_output: str,
+            filter_string: Optional[str] = None
+    ) -> Tuple[Optional[Any], List[Dict], float]:
+        """
+        Like analyze_output(), but returns the winning template row.
+
+        Returns: (template_row, parsed_records, score)
+        """
         best_template = None
         best_parsed = []
         best_score = 0.0
 
-        templates = self.get_filtered_templates(filter_string)
+        if self.template_cache is not None:
+            templates = self.template_cache.templates(
+                self.db_path, filter_string,
+                lambda: self.get_filtered_templates(filter_string),
+            )
+        else:
+            templates = self.get_filtered_templates(filter_string)
+
+        if self.parse_cache is not None:
+            return self.parse_cache.best_template(
+                device_output, templates,
+                parse=lambda t: self._parse_template(t, device_output),
+                score=lambda records, t: self._calculate_score(records, t, device_output),
+                scorer=self.PARSE_CACHE_SCORER,
+                early_exit=self.EARLY_EXIT_SCORE,
+            )
 
         for template in templates:
             try:
-                fsm = textfsm.TextFSM(io.StringIO(template['textfsm_content']))
-                parsed = fsm.ParseText(device_output)
-                parsed_dicts = [dict(zip(fsm.header, row)) for row in parsed]
+                if self.template_cache is not None:
+                    if not self.template_cache.may_match(template, device_output):
+                        continue
+                    header, parsed = self.template_cache.parse(template, device_output)
+                else:
+                    fsm = textfsm.TextFSM(io.StringIO(template['textfsm_content']))
+                    header, parsed = fsm.header, fsm.ParseText(device_output)
+                parsed_dicts = [dict(zip(header, row)) for row in parsed]
                 score = self._calculate_score(parsed_dicts, template, device_output)
 
                 if score > best_score:
                     best_score = score
-                    best_template = template['cli_command']
+                    best_template = template
                     best_parsed = parsed_dicts
 
                     # Early exit on high confidence
-                    if score >= 75:
+                    if score >= self.EARLY_EXIT_SCORE:
                         break
 
             except Exception:
@@ -270,6 +425,13 @@ class TextFSMAnalyzer:
 
         return best_template, best_parsed, best_score
 
+    def _parse_template(self, template, device_output: str) -> Optional[List[Dict]]:
+        """Parse with one cached template; None if the prefilter rules it out."""
+        if not self.template_cache.may_match(template, device_output):
+            return None
+        header, parsed = self.template_cache.parse(template, device_output)
+        return [dict(zip(header, row)) for row in parsed]
+
     def _calculate_score(
             self,
             parsed_data: List[Dict],
@@ -362,8 +524,7 @@ class DeviceInfoLookup:
             return
 
         try:
-            conn = sqlite3.connect(self.dcim_db)
-            conn.row_factory = sqlite3.Row
+            conn = db_connect(self.dcim_db, readonly=True, row_factory=sqlite3.Row)
             cursor = conn.cursor()
 
             cursor.execute("""
@@ -400,6 +561,91 @@ class DeviceInfoLookup:
         })
 
 
+# ============================================================================
+# Incremental Manifest
+# ============================================================================
+
+class CoverageManifest:
+    """
+    Per-file results of the previous run, for incremental analysis.
+
+    Each entry is keyed by file path and holds the size, mtime and filter
+    string the file was analyzed with, plus its FileResult (without parsed
+    records). An entry is reused while all three still match. The whole
+    manifest is discarded when the template database content changes.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: Path, collections_dir: Path, templates_hash: str):
+        self.path = path
+        self.collections_dir = str(collections_dir)
+        self.templates_hash = templates_hash
+        self.previous: Dict[str, Dict] = {}
+        self.current: Dict[str, Dict] = {}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"Warning: ignoring unreadable manifest {self.path}: {e}")
+            return
+
+        if data.get('version') != self.VERSION or data.get('collections_dir') != self.collections_dir:
+            return
+        if data.get('templates_hash') != self.templates_hash:
+            print("Template database changed since the last run, analyzing every file")
+            return
+        self.previous = data.get('files', {})
+
+    def lookup(self, filepath: Path, state: Tuple[int, int, str]) -> Optional[FileResult]:
+        """Previous result for filepath if (size, mtime_ns, filter) is unchanged."""
+        entry = self.previous.get(str(filepath))
+        if entry is None or tuple(entry['state']) != state:
+            return None
+        return FileResult(**entry['result'])
+
+    def record(self, filepath: Path, state: Tuple[int, int, str], result: FileResult):
+        self.current[str(filepath)] = {
+            'state': list(state),
+            'result': {f.name: getattr(result, f.name) for f in fields(FileResult) if f.name != 'parsed_records'},
+        }
+
+    def save(self, complete: bool = True):
+        """
+        Write the manifest (atomically).
+
+        Args:
+            complete: This run covered the whole collection; entries of files
+                it did not see are dropped instead of carried over
+        """
+        files = {} if complete else dict(self.previous)
+        files.update(self.current)
+        data = {
+            'version': self.VERSION,
+            'collections_dir': self.collections_dir,
+            'templates_hash': self.templates_hash,
+            'files': files,
+        }
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=str(self.path.parent), prefix=f".{self.path.name}.")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp, self.path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+
 # ============================================================================
 # Coverage Analyzer
 # ============================================================================
@@ -412,12 +658,19 @@ class CoverageAnalyzer:
             collections_dir: Path,
             tfsm_db: Path,
             dcim_db: Path,
-            verbose: bool = False
+            verbose: bool = False,
+            use_stored: bool = True,
+            use_cache: bool = True
     ):
         self.collections_dir = collections_dir
         self.tfsm_db = tfsm_db
+        self.dcim_db = dcim_db
         self.verbose = verbose
-        self.analyzer = TextFSMAnalyzer(str(tfsm_db), verbose)
+        self.use_stored = use_stored and PARSED_RECORDS_AVAILABLE
+        self.use_cache = use_cache
+        self.stored_loaded = 0
+        self.reused = 0  # Files taken unchanged from the incremental manifest
+        self.analyzer = TextFSMAnalyzer(str(tfsm_db), verbose, use_cache=use_cache)
         self.device_lookup = DeviceInfoLookup(str(dcim_db))
 
     def build_filter_string(self, capture_type: str, device_info: Dict) -> str:
@@ -541,7 +794,13 @@ class CoverageAnalyzer:
             )
 
         start = time.perf_counter()
-        template, records, score = self.analyzer.analyze_output(content, filter_string)
+        stored = self.load_stored(filepath, content, filter_string)
+        if stored is not None:
+            template, records, score, template_hash = stored
+        else:
+            row, records, score = self.analyzer.best_template(content, filter_string)
+            template = row['cli_command'] if row else None
+            template_hash = template_content_hash(row) if row else None
         elapsed_ms = (time.perf_counter() - start) * 1000
 
         return FileResult(
@@ -555,15 +814,48 @@ class CoverageAnalyzer:
             score=score,
             record_count=len(records),
             parse_time_ms=elapsed_ms,
-            parsed_records=records if extract and records else None
+            parsed_records=records if extract and records else None,
+            from_stored=stored is not None,
+            content_sha256=hashlib.sha256(content.encode('utf-8', errors='replace')).hexdigest(),
+            template_hash=template_hash
         )
 
+    def load_stored(
+            self,
+            filepath: Path,
+            content: str,
+            filter_string: str
+    ) -> Optional[Tuple[str, List[Dict], float, str]]:
+        """
+        Records the job runner saved for this capture, if still current and
+        parsed by a template this filter would have tried.
+
+        Returns: (template_name, parsed_records, score, template_hash) or None
+        """
+        if not self.use_stored:
+            return None
+
+        stored = load_parsed(filepath, content=content, db_path=self.tfsm_db)
+        if stored is None or not stored.records:
+            return None
+
+        name = stored.template.lower()
+        if not all(term in name for term in filter_terms(filter_string)):
+            return None
+
+        # Score on this analyzer's scale, not the runner's
+        score = self.analyzer._calculate_score(stored.records, {'cli_command': stored.template}, content)
+        return stored.template, stored.records, score, stored.template_hash
+
     def analyze_all(
             self,
             capture_type_filter: Optional[str] = None,
             limit: Optional[int] = None,
             extract: bool = False,
-            min_score_for_extract: float = 50.0
+            min_score_for_extract: float = 50.0,
+            workers: int = 1,
+            manifest_path: Optional[Path] = None,
+            sinks: Optional[List['ExtractionSink']] = None
     ) -> AnalysisReport:
         """Run full analysis.
 
@@ -572,6 +864,14 @@ class CoverageAnalyzer:
             limit: Limit to N files
             extract: If True, store parsed records in results
             min_score_for_extract: Only extract data if score >= this threshold
+            workers: Analyze files in this many processes (results are still
+                aggregated in file order)
+            manifest_path: Incremental mode - reuse results from this manifest
+                for files unchanged since the last run, then update it
+            sinks: Write each result to these as it completes. Parsed
+                records are then dropped from report.file_results, so memory
+                does not grow with the amount of data extracted. The caller
+                closes the sinks.
         """
         start_time = time.time()
 
@@ -600,8 +900,8 @@ class CoverageAnalyzer:
         files_to_analyze = []
 
         for capture_dir in self.collections_dir.iterdir():
-            if not capture_dir.is_dir():
-                continue
+            if not capture_dir.is_dir() or capture_dir.name.startswith('.'):
+                continue  # .store holds capture history, not current captures
 
             capture_type = capture_dir.name
 
@@ -619,20 +919,33 @@ class CoverageAnalyzer:
         print(f"TextFSM DB: {self.tfsm_db} ({self.analyzer.get_template_count()} templates)")
         print("-" * 60)
 
-        scores_sum = 0.0
+        manifest = None
+        if manifest_path is not None:
+            manifest = CoverageManifest(manifest_path, self.collections_dir, templates_fingerprint(self.tfsm_db))
 
-        for idx, (filepath, capture_type) in enumerate(files_to_analyze, 1):
+        scores = RunningScore()
+        ct_scores: Dict[str, RunningScore] = defaultdict(RunningScore)
+        v_scores: Dict[str, RunningScore] = defaultdict(RunningScore)
+        results = self._results(files_to_analyze, extract, min_score_for_extract, workers, manifest)
+
+        for idx, ((filepath, capture_type), result) in enumerate(zip(files_to_analyze, results), 1):
             if self.verbose:
                 print(f"[{idx}/{total}] {capture_type}/{filepath.name}...", end=" ")
             elif idx % 50 == 0 or idx == total:
                 print(f"  Progress: {idx}/{total} ({idx / total * 100:.0f}%)")
 
-            result = self.analyze_file(filepath, capture_type, extract=extract)
-
             # Only keep parsed records if score meets threshold
             if extract and result.parsed_records and result.score < min_score_for_extract:
                 result.parsed_records = None
 
+            if result.parsed_records:
+                report.extracted_files += 1
+                report.extracted_records += result.record_count
+            if sinks:
+                for sink in sinks:
+                    sink.write(result)
+                result.parsed_records = None
+
             report.file_results.append(result)
 
             if self.verbose:
@@ -651,7 +964,9 @@ class CoverageAnalyzer:
                 continue
 
             report.total_records += result.record_count
-            scores_sum += result.score
+            scores.add(result.score)
+            ct_scores[capture_type].add(result.score)
+            v_scores[result.vendor or "unknown"].add(result.score)
 
             if result.score > 0:
                 report.total_matched += 1
@@ -702,32 +1017,125 @@ class CoverageAnalyzer:
         parseable_files = report.total_files - report.score_distribution.get("skipped", 0)
         if parseable_files > 0:
             report.overall_match_rate = report.total_matched / parseable_files * 100
-            report.overall_avg_score = scores_sum / parseable_files
+            report.overall_avg_score = scores.total / parseable_files
 
         for ct_stats in report.by_capture_type.values():
-            parseable = ct_stats.total_files - ct_stats.score_distribution.get("skipped", 0)
-            if parseable > 0:
-                ct_scores = [
-                    r.score for r in report.file_results
-                    if r.capture_type == ct_stats.capture_type and not r.skipped
-                ]
-                if ct_scores:
-                    ct_stats.avg_score = sum(ct_scores) / len(ct_scores)
-                    ct_stats.min_score = min(ct_scores)
-                    ct_stats.max_score = max(ct_scores)
+            ct_score = ct_scores[ct_stats.capture_type]
+            if ct_score.count:
+                ct_stats.avg_score = ct_score.avg
+                ct_stats.min_score = ct_score.min
+                ct_stats.max_score = ct_score.max
 
         for v_stats in report.by_vendor.values():
-            v_scores = [
-                r.score for r in report.file_results
-                if (r.vendor or "unknown") == v_stats.vendor and not r.skipped
-            ]
-            v_stats.avg_score = sum(v_scores) / len(v_scores) if v_scores else 0
+            v_stats.avg_score = v_scores[v_stats.vendor].avg
 
         report.analysis_time_seconds = time.time() - start_time
 
+        if manifest is not None:
+            manifest.save(complete=not capture_type_filter and not limit)
+
         self.analyzer.close()
         return report
 
+    def _results(
+            self,
+            files: List[Tuple[Path, str]],
+            extract: bool,
+            min_score_for_extract: float,
+            workers: int,
+            manifest: Optional[CoverageManifest]
+    ) -> Iterator[FileResult]:
+        """
+        FileResult for each of files, in order.
+
+        Files unchanged since the manifest was written are not analyzed again;
+        with workers > 1 the rest are analyzed in worker processes, a few files
+        ahead of the one being yielded.
+        """
+        plan = []
+        for filepath, capture_type in files:
+            state = previous = None
+            if manifest is not None:
+                try:
+                    st = filepath.stat()
+                    device_info = self.device_lookup.get_device_info(filepath.stem)
+                    state = (st.st_size, st.st_mtime_ns, self.build_filter_string(capture_type, device_info))
+                    previous = manifest.lookup(filepath, state)
+                except OSError:
+                    pass
+            plan.append((filepath, capture_type, state, previous))
+
+        to_analyze = deque(i for i, item in enumerate(plan) if item[3] is None)
+        executor = None
+        if workers > 1 and len(to_analyze) > 1:
+            # spawn: each worker opens its own databases and caches
+            executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_worker_init,
+                initargs=(self.collections_dir, self.tfsm_db, self.dcim_db, self.use_stored, self.use_cache),
+            )
+        in_flight: Dict[int, Future] = {}
+        window = workers * 4
+
+        try:
+            for i, (filepath, capture_type, state, previous) in enumerate(plan):
+                while executor is not None and to_analyze and len(in_flight) < window:
+                    j = to_analyze.popleft()
+                    try:
+                        in_flight[j] = executor.submit(_worker_analyze, plan[j][0], plan[j][1], extract)
+                    except Exception as e:
+                        # Broken pool - analyze the rest in this process
+                        print(f"Warning: worker processes unavailable ({e}), continuing in-process")
+                        executor.shutdown(wait=False, cancel_futures=True)
+                        executor = None
+
+                result = None
+                if previous is not None:
+                    result = self._reuse(previous, extract, min_score_for_extract)
+                elif i in in_flight:
+                    try:
+                        result = in_flight.pop(i).result()
+                    except Exception as e:
+                        print(f"Warning: worker failed on {filepath} ({e}), analyzing in-process")
+                if result is None:
+                    result = self.analyze_file(filepath, capture_type, extract=extract)
+                elif previous is not None:
+                    self.reused += 1
+                if result.from_stored and previous is None:
+                    self.stored_loaded += 1
+
+                if manifest is not None and state is not None:
+                    manifest.record(filepath, state, result)
+                yield result
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+    def _reuse(self, previous: FileResult, extract: bool, min_score_for_extract: float) -> Optional[FileResult]:
+        """
+        A manifest result, with its records looked up again when extracting.
+
+        Returns None if the records are needed but no longer available (the
+        file is analyzed again).
+        """
+        if not extract or not previous.record_count or previous.score < min_score_for_extract:
+            return previous
+
+        records = None
+        parse_cache = self.analyzer.parse_cache
+        if parse_cache is not None and previous.content_sha256 and previous.template_hash:
+            records = parse_cache.records(previous.content_sha256, previous.template_hash)
+        if records is None and previous.from_stored and self.use_stored:
+            stored = load_parsed(previous.filepath, db_path=self.tfsm_db)
+            if stored is not None and stored.template_hash == previous.template_hash:
+                records = stored.records
+        if not records:
+            return None
+
+        previous.parsed_records = records
+        return previous
+
     def print_report(self, report: AnalysisReport):
         """Print formatted console report."""
         print("\n" + "=" * 60)
@@ -751,6 +1159,21 @@ class CoverageAnalyzer:
         print(f"  Total Size:      {report.total_size_bytes / 1024 / 1024:.1f} MB")
         print(f"  Average Score:   {report.overall_avg_score:>8.1f}")
 
+        cache = self.analyzer.template_cache
+        if cache is not None and cache.stats.prefilter_checks:
+            stats = cache.stats
+            print(f"  Prefiltered:     {stats.prefilter_rejects:>8} of {stats.prefilter_checks} "
+                  f"candidates ({stats.rejection_rate:.0%}) rejected without parsing")
+        if self.reused:
+            print(f"  Unchanged:       {self.reused:>8} files reused from the last incremental run")
+        if self.stored_loaded:
+            print(f"  Stored Parses:   {self.stored_loaded:>8} files loaded from saved records (no TextFSM)")
+        parse_cache = self.analyzer.parse_cache
+        if parse_cache is not None and (parse_cache.stats.best_hits or parse_cache.stats.best_misses):
+            stats = parse_cache.stats
+            print(f"  Parse Cache:     {stats.best_hits:>8} files from cache ({stats.hit_rate:.0%}), "
+                  f"{stats.parse_misses} templates tried")
+
         # Score distribution
         print(f"\n{'SCORE DISTRIBUTION':^60}")
         print("-" * 60)
@@ -834,29 +1257,508 @@ class CoverageAnalyzer:
 
 
 # ============================================================================
-# Export Functions
+# Parallel Analysis
 # ============================================================================
 
-def export_json(report: AnalysisReport, output_path: Path):
-    """Export report to JSON."""
+_worker_analyzer: Optional[CoverageAnalyzer] = None
+
+
+def _worker_init(collections_dir: Path, tfsm_db: Path, dcim_db: Path, use_stored: bool, use_cache: bool):
+    """Create this worker's analyzer once; its template and DCIM caches live for the whole run."""
+    global _worker_analyzer
+    _worker_analyzer = CoverageAnalyzer(
+        collections_dir, tfsm_db, dcim_db,
+        use_stored=use_stored,
+        use_cache=use_cache
+    )
+
+
+def _worker_analyze(filepath: Path, capture_type: str, extract: bool) -> FileResult:
+    return _worker_analyzer.analyze_file(filepath, capture_type, extract=extract)
+
+
+# ============================================================================
+# Extraction Sinks
+# ============================================================================
+
+def _convert(obj):
+    """Report objects as plain JSON data."""
+    if hasattr(obj, '__dict__'):
+        return {k: _convert(v) for k, v in obj.__dict__.items()}
+    elif isinstance(obj, dict):
+        return {k: _convert(v) for k, v in obj.items()}
+    elif isinstance(obj, list):
+        return [_convert(i) for i in obj]
+    elif isinstance(obj, Path):
+        return str(obj)
+    return obj
+
+
+def _nested_json(value: Any, depth: int) -> str:
+    """json.dumps(value, indent=2) as it appears `depth` levels into an indented document."""
+    return json.dumps(value, indent=2).replace('\n', '\n' + '  ' * depth)
+
+
+class ExtractionSink(abc.ABC):
+    """
+    Receives each FileResult as soon as it is analyzed.
+
+    Sinks write as they go and keep only running totals, so the analyzer
+    can drop each file's parsed records once every sink has seen them.
+    """
+
+    @abc.abstractmethod
+    def write(self, result: FileResult):
+        """Consume one analyzed file."""
+
+    def close(self, report: AnalysisReport):
+        """Finish output once the whole report is known."""
+
+
+class JsonReportSink(ExtractionSink):
+    """Full JSON report, records included (see export_json())."""
+
+    def __init__(self, output_path: Path):
+        self.output_path = output_path
+        # file_results are spooled next to the report, then spliced in by close()
+        self._part = tempfile.TemporaryFile('w+', dir=str(output_path.parent))
+        self._count = 0
+
+    def write(self, result: FileResult):
+        self._part.write(',\n' if self._count else '')
+        self._part.write('    ' + _nested_json(_convert(result), 2))
+        self._count += 1
+
+    def close(self, report: AnalysisReport):
+        data = _convert(report)
+        data['file_results'] = []
+        head, tail = json.dumps(data, indent=2).split('"file_results": []', 1)
+
+        with open(self.output_path, 'w') as f:
+            f.write(head)
+            if self._count:
+                f.write('"file_results": [\n')
+                self._part.seek(0)
+                shutil.copyfileobj(self._part, f)
+                f.write('\n  ]')
+            else:
+                f.write('"file_results": []')
+            f.write(tail)
+        self._part.close()
+
+        print(f"\nJSON report saved to: {self.output_path}")
+
+
+class JsonExtractionSink(ExtractionSink):
+    """Extracted data as one JSON file per capture type (see export_extracted_json())."""
+
+    def __init__(self, output_dir: Path):
+        self.output_dir = output_dir
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        # capture type -> [spooled "devices" entries, devices, records]
+        self._parts: Dict[str, list] = {}
+
+    def write(self, result: FileResult):
+        if not result.parsed_records:
+            return
+
+        part = self._parts.get(result.capture_type)
+        if part is None:
+            part = self._parts[result.capture_type] = [
+                tempfile.TemporaryFile('w+', dir=str(self.output_dir)), 0, 0
+            ]
+
+        device = {
+            "template": result.template_matched,
+            "score": round(result.score, 2),
+            "vendor": result.vendor,
+            "platform": result.platform,
+            "record_count": result.record_count,
+            "records": result.parsed_records
+        }
+        spool = part[0]
+        spool.write(',\n' if part[1] else '')
+        spool.write(f"    {json.dumps(result.device_name)}: {_nested_json(device, 2)}")
+        part[1] += 1
+        part[2] += result.record_count
+
+    def close(self, report: AnalysisReport):
+        files_written = []
+        for ct, (spool, devices, records) in self._parts.items():
+            header = {
+                "capture_type": ct,
+                "extracted_at": report.generated_at,
+                "total_devices": devices,
+                "total_records": records,
+            }
+            output_file = self.output_dir / f"{ct}.json"
+            with open(output_file, 'w') as f:
+                f.write(json.dumps(header, indent=2)[:-2] + ',\n  "devices": {\n')
+                spool.seek(0)
+                shutil.copyfileobj(spool, f)
+                f.write('\n  }\n}')
+            spool.close()
+            files_written.append((ct, devices, records))
+
+        print(f"\nExtracted data saved to: {self.output_dir}/")
+        print(f"  {'Capture Type':<20} {'Devices':>8} {'Records':>10}")
+        print(f"  {'-' * 42}")
+        for ct, devices, records in sorted(files_written):
+            print(f"  {ct:<20} {devices:>8} {records:>10}")
+
+
+# Record fields worth an index when present (ntc-templates names)
+SQLITE_INDEX_FIELDS = (
+    'ADDRESS', 'IP_ADDRESS', 'MAC', 'MAC_ADDRESS', 'DESTINATION_ADDRESS',
+    'NETWORK', 'NEXTHOP_IP', 'INTERFACE', 'VLAN', 'VLAN_ID',
+    'NEIGHBOR', 'NEIGHBOR_NAME',
+)
+
+_INT_VALUE = re.compile(r'-?(?:0|[1-9][0-9]{0,17})$')
+_MAC_VALUE = re.compile(r'(?:[0-9a-fA-F]{4}\.){2}[0-9a-fA-F]{4}$|(?:[0-9a-fA-F]{2}[:-]){5}[0-9a-fA-F]{2}$')
+
+
+def _to_int(value: str) -> int:
+    # Not int(): that also takes ' 7', '1_000' and '007', which would not round-trip
+    if _INT_VALUE.match(value) is None:
+        raise ValueError(value)
+    return int(value)
+
+
+def _ipv4_to_int(value: str) -> int:
+    try:
+        return int.from_bytes(socket.inet_pton(socket.AF_INET, value), 'big')
+    except OSError:
+        raise ValueError(value) from None
+
 
-    def convert(obj):
-        if hasattr(obj, '__dict__'):
-            return {k: convert(v) for k, v in obj.__dict__.items()}
-        elif isinstance(obj, dict):
-            return {k: convert(v) for k, v in obj.items()}
-        elif isinstance(obj, list):
-            return [convert(i) for i in obj]
-        elif isinstance(obj, Path):
-            return str(obj)
-        return obj
+def _mac_to_int(value: str) -> int:
+    if _MAC_VALUE.match(value) is None:
+        raise ValueError(value)
+    return int(value.replace('.', '').replace(':', '').replace('-', ''), 16)
 
-    data = convert(report)
 
-    with open(output_path, 'w') as f:
-        json.dump(data, f, indent=2)
+class SqliteExtractionSink(ExtractionSink):
+    """
+    Extracted data in SQLite, one table per capture type (see export_extracted_sqlite()).
+
+    Built for bulk loads: rows are buffered per table and inserted with
+    executemany in large transactions, with synchronous=OFF while loading.
+    Indexes on extraction_id, device_name and common key fields
+    (SQLITE_INDEX_FIELDS) are built once the data is in.
+
+    Column types are inferred from the first rows of each field:
+        INTEGER   whole numbers
+        IPV4_INT  dotted IPv4 addresses, stored as 32-bit integers
+        MAC_INT   MAC addresses (any of the usual notations), stored as integers
+        TEXT      anything else ('' for missing values, lists/dicts as JSON)
+    A value that does not fit its column's type is stored as text. Each
+    table gets a "<table>_text" view showing addresses in readable form;
+    to look one up, query the table with the integer so the index is used.
+
+    Every run appends to existing tables under a new extraction_id
+    (a row in extraction_meta); columns are added for new fields.
+    """
+
+    BASE_COLUMNS = ['extraction_id', 'device_name', 'vendor', 'platform', 'template', 'score']
+    SAMPLE_ROWS = 1000      # Rows a table's column types are inferred from
+    BATCH_ROWS = 5000       # Rows buffered per table before an executemany
+    COMMIT_ROWS = 200000    # Rows per transaction
 
-    print(f"\nJSON report saved to: {output_path}")
+    # Declared type -> value converter (raises ValueError for values that don't fit)
+    CONVERTERS = {
+        'INTEGER': _to_int,
+        'IPV4_INT': _ipv4_to_int,
+        'MAC_INT': _mac_to_int,
+    }
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self.conn = db_connect(db_path)
+        # Bulk load: keep the extraction-specific settings on top of the shared ones
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=OFF")
+        self.conn.execute("PRAGMA temp_store=MEMORY")
+        self.conn.execute("PRAGMA cache_size=-65536")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS extraction_meta (
+                id INTEGER PRIMARY KEY,
+                extracted_at TEXT,
+                collections_dir TEXT,
+                tfsm_db TEXT,
+                total_files INTEGER,
+                total_matched INTEGER
+            )
+        """)
+        # Totals are filled in by close()
+        cursor = self.conn.execute(
+            "INSERT INTO extraction_meta (extracted_at) VALUES (?)", (datetime.now().isoformat(),)
+        )
+        self.extraction_id = cursor.lastrowid
+        self._columns: Dict[str, Dict[str, str]] = {}  # table -> record field -> declared type
+        self._pending: Dict[str, List[Tuple[list, Dict]]] = {}  # table -> [(base values, record)]
+        self._counts: Dict[str, int] = {}
+        self._uncommitted = 0
+
+    @staticmethod
+    def _serialize_value(v):
+        # Serialize any complex values (lists, dicts) to JSON strings
+        if v is None:
+            return ''
+        if isinstance(v, (list, dict)):
+            return json.dumps(v)
+        return str(v)
+
+    @classmethod
+    def infer_type(cls, values: List[Any]) -> str:
+        """Declared column type for a field's sample values."""
+        present = [v for v in values if v is not None and v != '']
+        if not present or not all(isinstance(v, str) for v in present):
+            return 'TEXT'
+        for declared in ('INTEGER', 'IPV4_INT', 'MAC_INT'):
+            convert = cls.CONVERTERS[declared]
+            try:
+                for v in present:
+                    convert(v)
+            except ValueError:
+                continue
+            return declared
+        return 'TEXT'
+
+    @classmethod
+    def _column_converter(cls, declared: str) -> Callable[[Any], Any]:
+        """Record value -> stored value for a column of this declared type."""
+        serialize = cls._serialize_value
+        convert = cls.CONVERTERS.get(declared)
+
+        if convert is None:
+            def to_db(v):
+                return v if type(v) is str else serialize(v)
+        else:
+            def to_db(v):
+                if type(v) is not str:
+                    return serialize(v)
+                if not v:
+                    return None
+                try:
+                    return convert(v)
+                except ValueError:
+                    return v
+        return to_db
+
+    def write(self, result: FileResult):
+        if not result.parsed_records:
+            return
+
+        table_name = f"extracted_{result.capture_type.replace('-', '_')}"
+        base = [
+            self.extraction_id, result.device_name, result.vendor,
+            result.platform, result.template_matched, result.score
+        ]
+        pending = self._pending.setdefault(table_name, [])
+        pending.extend((base, record) for record in result.parsed_records)
+
+        limit = self.SAMPLE_ROWS if table_name not in self._columns else self.BATCH_ROWS
+        if len(pending) >= limit:
+            self._flush(table_name)
+
+    def _table_columns(self, table_name: str, rows: List[Tuple[list, Dict]]) -> Dict[str, str]:
+        """Record fields of table_name and their types, creating the table or adding columns as needed."""
+        # Records of one template share their keys, so this is usually a single tuple
+        seen = set()
+        for keys in {tuple(record) for _, record in rows}:
+            seen.update(keys)
+
+        def sample(f: str) -> List[Any]:
+            return [record.get(f) for _, record in rows[:self.SAMPLE_ROWS]]
+
+        columns = self._columns.get(table_name)
+        if columns is None:
+            existing = {
+                row[1]: (row[2] or 'TEXT').upper()
+                for row in self.conn.execute(f'PRAGMA table_info("{table_name}")')
+            }
+            if not existing:
+                field_types = {f: self.infer_type(sample(f)) for f in sorted(seen)}
+                field_defs = ", ".join(f'"{f}" {t}' for f, t in field_types.items())
+                self.conn.execute(f"""
+                    CREATE TABLE "{table_name}" (
+                        id INTEGER PRIMARY KEY,
+                        extraction_id INTEGER,
+                        device_name TEXT,
+                        vendor TEXT,
+                        platform TEXT,
+                        template TEXT,
+                        score REAL,
+                        {field_defs},
+                        FOREIGN KEY (extraction_id) REFERENCES extraction_meta(id)
+                    )
+                """)
+                existing = dict(field_types)
+            columns = self._columns[table_name] = {
+                f: t for f, t in existing.items() if f != 'id' and f not in self.BASE_COLUMNS
+            }
+
+        for f in sorted(set(seen).difference(columns)):
+            columns[f] = self.infer_type(sample(f))
+            self.conn.execute(f'ALTER TABLE "{table_name}" ADD COLUMN "{f}" {columns[f]}')
+        return columns
+
+    def _flush(self, table_name: str):
+        rows = self._pending.pop(table_name, None)
+        if not rows:
+            return
+
+        columns = self._table_columns(table_name, rows)
+        fields = list(columns)
+        convert = [(f, self._column_converter(columns[f])) for f in fields]
+
+        names = self.BASE_COLUMNS + fields
+        self.conn.executemany(
+            f"""INSERT INTO "{table_name}" ({', '.join(f'"{c}"' for c in names)})
+                VALUES ({', '.join(['?'] * len(names))})""",
+            (base + [to_db(record.get(f, '')) for f, to_db in convert] for base, record in rows)
+        )
+        self._counts[table_name] = self._counts.get(table_name, 0) + len(rows)
+
+        self._uncommitted += len(rows)
+        if self._uncommitted >= self.COMMIT_ROWS:
+            self.conn.commit()
+            self._uncommitted = 0
+
+    def _finish_table(self, table_name: str):
+        """Indexes and the readable view for one table."""
+        columns = self._columns[table_name]
+        for column in ['extraction_id', 'device_name'] + [f for f in SQLITE_INDEX_FIELDS if f in columns]:
+            self.conn.execute(
+                f'CREATE INDEX IF NOT EXISTS "idx_{table_name}_{column}" ON "{table_name}" ("{column}")'
+            )
+
+        select = []
+        for column in ['id'] + self.BASE_COLUMNS + list(columns):
+            declared = columns.get(column)
+            if declared == 'IPV4_INT':
+                readable = (f'(("{column}" >> 24) & 255) || \'.\' || (("{column}" >> 16) & 255) || \'.\' || '
+                            f'(("{column}" >> 8) & 255) || \'.\' || ("{column}" & 255)')
+            elif declared == 'MAC_INT':
+                readable = ("printf('%02x:%02x:%02x:%02x:%02x:%02x', " + ', '.join(
+                    f'("{column}" >> {shift}) & 255' for shift in (40, 32, 24, 16, 8, 0)) + ')')
+            else:
+                select.append(f'"{column}"')
+                continue
+            select.append(f'CASE WHEN typeof("{column}") = \'integer\' THEN {readable} '
+                          f'ELSE "{column}" END AS "{column}"')
+
+        self.conn.execute(f'DROP VIEW IF EXISTS "{table_name}_text"')
+        self.conn.execute(
+            f'CREATE VIEW "{table_name}_text" AS SELECT {", ".join(select)} FROM "{table_name}"'
+        )
+
+    def close(self, report: AnalysisReport):
+        for table_name in list(self._pending):
+            self._flush(table_name)
+        self.conn.execute("""
+            UPDATE extraction_meta
+            SET extracted_at = ?, collections_dir = ?, tfsm_db = ?, total_files = ?, total_matched = ?
+            WHERE id = ?
+        """, (report.generated_at, report.collections_dir, report.tfsm_db,
+              report.total_files, report.total_matched, self.extraction_id))
+        self.conn.commit()
+
+        for table_name in self._columns:
+            self._finish_table(table_name)
+        self.conn.commit()
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA optimize")
+        self.conn.close()
+
+        print(f"\nExtracted data saved to: {self.db_path} (extraction_id {self.extraction_id})")
+        print(f"  {'Table':<30} {'Records':>10}")
+        print(f"  {'-' * 42}")
+        for table, count in sorted(self._counts.items()):
+            print(f"  {table:<30} {count:>10}")
+
+
+class NdjsonExtractionSink(ExtractionSink):
+    """Every extracted record as one line of JSON (see export_extracted_ndjson())."""
+
+    def __init__(self, output_path: Path):
+        self.output_path = output_path
+        self._file = open(output_path, 'w')
+        self.records = 0
+
+    def write(self, result: FileResult):
+        if not result.parsed_records:
+            return
+
+        meta = {
+            "device": result.device_name,
+            "capture_type": result.capture_type,
+            "vendor": result.vendor,
+            "platform": result.platform,
+            "template": result.template_matched,
+            "score": round(result.score, 2)
+        }
+        for record in result.parsed_records:
+            self._file.write(json.dumps({"_meta": meta, **record}) + "\n")
+        self.records += result.record_count
+
+    def close(self, report: AnalysisReport):
+        self._file.close()
+        print(f"\nNDJSON export saved to: {self.output_path} ({self.records} records)")
+
+
+class ParquetExtractionSink(ExtractionSink):
+    """
+    Extracted data as a Parquet dataset partitioned by capture type and
+    collection date (the capture file's mtime), see ParquetDatasetWriter.
+    """
+
+    def __init__(self, output_dir: Path):
+        self.output_dir = output_dir
+        self.writer = ParquetDatasetWriter(output_dir)
+
+    def write(self, result: FileResult):
+        if not result.parsed_records:
+            return
+
+        try:
+            collected = datetime.fromtimestamp(os.stat(result.filepath).st_mtime)
+        except OSError:
+            collected = None
+        self.writer.write(
+            result.capture_type, result.parsed_records,
+            device=result.device_name,
+            vendor=result.vendor,
+            platform=result.platform,
+            template=result.template_matched,
+            score=round(result.score, 2),
+            collected=collected
+        )
+
+    def close(self, report: AnalysisReport):
+        partitions = self.writer.close()
+
+        print(f"\nParquet dataset saved to: {self.output_dir}/")
+        print(f"  {'Capture Type':<20} {'Date':<12} {'Files':>6} {'Records':>10}")
+        print(f"  {'-' * 51}")
+        for p in partitions:
+            print(f"  {p.capture_type:<20} {p.date:<12} {len(p.files):>6} {p.rows:>10}")
+
+
+def _export(report: AnalysisReport, sink: ExtractionSink):
+    for result in report.file_results:
+        sink.write(result)
+    sink.close(report)
+
+
+# ============================================================================
+# Export Functions
+# ============================================================================
+
+def export_json(report: AnalysisReport, output_path: Path):
+    """Export report to JSON."""
+    _export(report, JsonReportSink(output_path))
 
 
 def export_csv(report: AnalysisReport, output_path: Path):
@@ -906,49 +1808,7 @@ def export_extracted_json(report: AnalysisReport, output_dir: Path):
         }
     }
     """
-    output_dir.mkdir(parents=True, exist_ok=True)
-
-    # Group by capture type
-    by_type: Dict[str, Dict] = {}
-
-    for result in report.file_results:
-        if not result.parsed_records:
-            continue
-
-        ct = result.capture_type
-        if ct not in by_type:
-            by_type[ct] = {
-                "capture_type": ct,
-                "extracted_at": report.generated_at,
-                "total_devices": 0,
-                "total_records": 0,
-                "devices": {}
-            }
-
-        by_type[ct]["devices"][result.device_name] = {
-            "template": result.template_matched,
-            "score": round(result.score, 2),
-            "vendor": result.vendor,
-            "platform": result.platform,
-            "record_count": result.record_count,
-            "records": result.parsed_records
-        }
-        by_type[ct]["total_devices"] += 1
-        by_type[ct]["total_records"] += result.record_count
-
-    # Write files
-    files_written = []
-    for ct, data in by_type.items():
-        output_file = output_dir / f"{ct}.json"
-        with open(output_file, 'w') as f:
-            json.dump(data, f, indent=2)
-        files_written.append((ct, data["total_devices"], data["total_records"]))
-
-    print(f"\nExtracted data saved to: {output_dir}/")
-    print(f"  {'Capture Type':<20} {'Devices':>8} {'Records':>10}")
-    print(f"  {'-' * 42}")
-    for ct, devices, records in sorted(files_written):
-        print(f"  {ct:<20} {devices:>8} {records:>10}")
+    _export(report, JsonExtractionSink(output_dir))
 
 
 def export_extracted_sqlite(report: AnalysisReport, db_path: Path):
@@ -956,109 +1816,30 @@ def export_extracted_sqlite(report: AnalysisReport, db_path: Path):
 
     Creates tables dynamically based on capture types:
         - extraction_meta (run metadata)
-        - arp (device, template, score, + parsed fields)
-        - routes (device, template, score, + parsed fields)
+        - extracted_arp (device, template, score, + parsed fields)
+        - extracted_routes (device, template, score, + parsed fields)
         - etc.
-    """
-    import sqlite3
-
-    conn = sqlite3.connect(str(db_path))
-    cursor = conn.cursor()
-
-    # Meta table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS extraction_meta (
-            id INTEGER PRIMARY KEY,
-            extracted_at TEXT,
-            collections_dir TEXT,
-            tfsm_db TEXT,
-            total_files INTEGER,
-            total_matched INTEGER
-        )
-    """)
-
-    cursor.execute("""
-        INSERT INTO extraction_meta (extracted_at, collections_dir, tfsm_db, total_files, total_matched)
-        VALUES (?, ?, ?, ?, ?)
-    """, (report.generated_at, report.collections_dir, report.tfsm_db,
-          report.total_files, report.total_matched))
-
-    extraction_id = cursor.lastrowid
-
-    # Group records by capture type and collect all field names
-    by_type: Dict[str, List[Tuple[FileResult, Dict]]] = {}
-    fields_by_type: Dict[str, set] = {}
-
-    for result in report.file_results:
-        if not result.parsed_records:
-            continue
-
-        ct = result.capture_type
-        if ct not in by_type:
-            by_type[ct] = []
-            fields_by_type[ct] = set()
 
-        for record in result.parsed_records:
-            by_type[ct].append((result, record))
-            fields_by_type[ct].update(record.keys())
-
-    # Create tables and insert data
-    tables_created = []
-
-    for ct, records in by_type.items():
-        # Sanitize table name
-        table_name = f"extracted_{ct.replace('-', '_')}"
-        fields = sorted(fields_by_type[ct])
-
-        # Create table with dynamic columns
-        field_defs = ", ".join(f'"{f}" TEXT' for f in fields)
-        cursor.execute(f"""
-            CREATE TABLE IF NOT EXISTS "{table_name}" (
-                id INTEGER PRIMARY KEY,
-                extraction_id INTEGER,
-                device_name TEXT,
-                vendor TEXT,
-                platform TEXT,
-                template TEXT,
-                score REAL,
-                {field_defs},
-                FOREIGN KEY (extraction_id) REFERENCES extraction_meta(id)
-            )
-        """)
-
-        # Insert records
-        for result, record in records:
-            columns = ['extraction_id', 'device_name', 'vendor', 'platform', 'template', 'score'] + fields
-            placeholders = ', '.join(['?'] * len(columns))
-
-            # Serialize any complex values (lists, dicts) to JSON strings
-            def serialize_value(v):
-                if v is None:
-                    return ''
-                if isinstance(v, (list, dict)):
-                    return json.dumps(v)
-                return str(v)
-
-            values = [
-                         extraction_id, result.device_name, result.vendor,
-                         result.platform, result.template_matched, result.score
-                     ] + [serialize_value(record.get(f, '')) for f in fields]
+    Columns are typed (addresses stored as integers, with readable
+    "<table>_text" views) and indexed; each run appends under a new
+    extraction_id. See SqliteExtractionSink.
+    """
+    _export(report, SqliteExtractionSink(db_path))
 
-            cursor.execute(f"""
-                INSERT INTO "{table_name}" ({', '.join(f'"{c}"' for c in columns)})
-                VALUES ({placeholders})
-            """, values)
 
-        tables_created.append((table_name, len(records)))
+def export_extracted_parquet(report: AnalysisReport, output_dir: Path):
+    """Export extracted data as a Parquet dataset.
 
-    conn.commit()
-    conn.close()
+    Creates (Hive partitioning):
+        output_dir/
+            capture_type=arp/date=2025-12-22/part-<run>-0000.parquet
+            capture_type=routes/date=2025-12-22/part-<run>-0000.parquet
+            ...
 
-    print(f"\nExtracted data saved to: {db_path}")
-    print(f"  {'Table':<30} {'Records':>10}")
-    print(f"  {'-' * 42}")
-    for table, count in sorted(tables_created):
-        print(f"  {table:<30} {count:>10}")
+    Query with DuckDB:
+        SELECT * FROM read_parquet('output_dir/*/*/*.parquet', hive_partitioning = true)
+    """
+    _export(report, ParquetExtractionSink(output_dir))
 
 
 def export_extracted_ndjson(report: AnalysisReport, output_path: Path):
@@ -1067,27 +1848,7 @@ def export_extracted_ndjson(report: AnalysisReport, output_path: Path):
     One JSON object per line, queryable with jq:
         cat extracted.ndjson | jq 'select(.capture_type == "arp")'
     """
-    with open(output_path, 'w') as f:
-        for result in report.file_results:
-            if not result.parsed_records:
-                continue
-
-            for record in result.parsed_records:
-                obj = {
-                    "_meta": {
-                        "device": result.device_name,
-                        "capture_type": result.capture_type,
-                        "vendor": result.vendor,
-                        "platform": result.platform,
-                        "template": result.template_matched,
-                        "score": round(result.score, 2)
-                    },
-                    **record
-                }
-                f.write(json.dumps(obj) + "\n")
-
-    total_records = sum(r.record_count for r in report.file_results if r.parsed_records)
-    print(f"\nNDJSON export saved to: {output_path} ({total_records} records)")
+    _export(report, NdjsonExtractionSink(output_path))
 
 
 def purge_failed_files(
@@ -1174,6 +1935,8 @@ def purge_failed_files(
                 try:
                     Path(result.filepath).unlink()
                     deleted_files.append(result.filepath)
+                    if PARSED_RECORDS_AVAILABLE:
+                        parsed_path(result.filepath).unlink(missing_ok=True)
                 except Exception as e:
                     errors.append(f"{result.filepath}: {e}")
 
@@ -1182,7 +1945,7 @@ def purge_failed_files(
             # Clean up database records
             if db_cleanup_available and deleted_files:
                 try:
-                    conn = sqlite3.connect(str(collector_db))
+                    conn = db_connect(collector_db)
                     cursor = conn.cursor()
 
                     # Try matching by filepath first
@@ -1234,7 +1997,7 @@ def purge_failed_files(
             # Preview DB cleanup - match by device_name and capture_type for more reliable matching
             if db_cleanup_available:
                 try:
-                    conn = sqlite3.connect(str(collector_db))
+                    conn = db_connect(collector_db, readonly=True)
                     cursor = conn.cursor()
 
                     # First check what's in captures table
@@ -1295,12 +2058,14 @@ Examples:
   %(prog)s --type arp               # Analyze only ARP captures
   %(prog)s --type config --verbose  # Verbose analysis of configs
   %(prog)s --limit 100              # Quick test with first 100 files
+  %(prog)s --workers 8 --incremental  # Parallel; skip files unchanged since last run
 
   # Extraction
   %(prog)s --extract                      # Extract to ./extracted/*.json
   %(prog)s --extract-dir ./parsed         # Custom output directory
   %(prog)s --extract-db network.db        # SQLite with tables per capture type
   %(prog)s --extract-ndjson all.ndjson    # One JSON object per line
+  %(prog)s --extract-parquet ./dataset    # Parquet dataset for DuckDB/pandas
   %(prog)s --extract --min-score 75       # Only high-confidence matches
 
   # Purge failed files
@@ -1405,6 +2170,12 @@ Examples:
         help="Export all records as newline-delimited JSON"
     )
 
+    parser.add_argument(
+        '--extract-parquet',
+        type=Path,
+        help="Export extracted data as a Parquet dataset partitioned by capture type and date (needs pyarrow)"
+    )
+
     parser.add_argument(
         '--min-score',
         type=float,
@@ -1412,6 +2183,39 @@ Examples:
         help="Minimum score to include in extraction (default: 50)"
     )
 
+    parser.add_argument(
+        '--reparse',
+        action='store_true',
+        help="Ignore records saved by the job runner and parse every file"
+    )
+
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help="Don't use or update the parse result cache (~/.vcollector/parse_cache.db)"
+    )
+
+    # Large collections
+    parser.add_argument(
+        '--workers', '-w',
+        type=int,
+        default=1,
+        help="Analyze files in N processes (default: 1)"
+    )
+
+    parser.add_argument(
+        '--incremental', '-i',
+        action='store_true',
+        help="Only re-analyze files changed since the last --incremental run"
+    )
+
+    parser.add_argument(
+        '--manifest',
+        type=Path,
+        default=DEFAULT_MANIFEST,
+        help=f"Manifest for --incremental (default: {DEFAULT_MANIFEST})"
+    )
+
     # Purge options
     parser.add_argument(
         '--purge',
@@ -1447,22 +2251,52 @@ Examples:
         print("Error: textfsm not installed. Run: pip install textfsm")
         sys.exit(1)
 
+    if args.extract_parquet and not PYARROW_AVAILABLE:
+        print("Error: pyarrow not installed. Run: pip install pyarrow")
+        sys.exit(1)
+
     # Run analysis
     analyzer = CoverageAnalyzer(
         collections_dir=args.collections_dir,
         tfsm_db=args.tfsm_db,
         dcim_db=args.dcim_db,
-        verbose=args.verbose
+        verbose=args.verbose,
+        use_stored=not args.reparse,
+        use_cache=not args.no_cache
     )
 
     # Enable extraction if any extract option is set
-    do_extract = args.extract or args.extract_dir or args.extract_db or args.extract_ndjson
+    do_extract = (args.extract or args.extract_dir or args.extract_db or args.extract_ndjson
+                  or args.extract_parquet)
+
+    # Outputs that include records are written while files are analyzed
+    sinks: List[ExtractionSink] = []
+    if args.json_output:
+        sinks.append(JsonReportSink(args.json_output))
+    if do_extract:
+        if args.extract_dir:
+            sinks.append(JsonExtractionSink(args.extract_dir))
+        elif args.extract and not args.extract_db and not args.extract_ndjson and not args.extract_parquet:
+            # Default to ./extracted/ if just --extract
+            sinks.append(JsonExtractionSink(Path("./extracted")))
+
+        if args.extract_db:
+            sinks.append(SqliteExtractionSink(args.extract_db))
+
+        if args.extract_ndjson:
+            sinks.append(NdjsonExtractionSink(args.extract_ndjson))
+
+        if args.extract_parquet:
+            sinks.append(ParquetExtractionSink(args.extract_parquet))
 
     report = analyzer.analyze_all(
         capture_type_filter=args.capture_type,
         limit=args.limit,
         extract=do_extract,
-        min_score_for_extract=args.min_score
+        min_score_for_extract=args.min_score,
+        workers=args.workers,
+        manifest_path=args.manifest if args.incremental else None,
+        sinks=sinks
     )
 
     # Output
@@ -1473,28 +2307,18 @@ Examples:
             f"\nFiles: {report.total_files}, Matched: {report.total_matched} ({report.overall_match_rate:.1f}%), Avg Score: {report.overall_avg_score:.1f}")
 
     if args.json_output:
-        export_json(report, args.json_output)
+        sinks.pop(0).close(report)
 
     if args.csv_output:
         export_csv(report, args.csv_output)
 
     # Extraction exports
     if do_extract:
-        extracted_count = sum(1 for r in report.file_results if r.parsed_records)
-        total_records = sum(r.record_count for r in report.file_results if r.parsed_records)
-        print(f"\nExtraction: {extracted_count} files, {total_records} records (min_score >= {args.min_score})")
-
-        if args.extract_dir:
-            export_extracted_json(report, args.extract_dir)
-        elif args.extract and not args.extract_db and not args.extract_ndjson:
-            # Default to ./extracted/ if just --extract
-            export_extracted_json(report, Path("./extracted"))
+        print(f"\nExtraction: {report.extracted_files} files, {report.extracted_records} records "
+              f"(min_score >= {args.min_score})")
 
-        if args.extract_db:
-            export_extracted_sqlite(report, args.extract_db)
-
-        if args.extract_ndjson:
-            export_extracted_ndjson(report, args.extract_ndjson)
+    for sink in sinks:
+        sink.close(report)
 
     # Purge failed files if requested
     if args.purge or args.purge_dry_run:
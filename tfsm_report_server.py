@@ -10,6 +10,8 @@ Usage:
     python tfsm_report_server.py --port 9000              # Custom port
     python tfsm_report_server.py --tfsm-db path/to/db     # Custom template DB
     python tfsm_report_server.py --no-browser             # Don't auto-open browser
+    python tfsm_report_server.py --workers 4              # Analyze on 4 processes
+    python tfsm_report_server.py --no-cache               # Re-parse every file
 """
 
 import argparse
@@ -761,12 +763,25 @@ def main():
         help="Minimum score for extraction (default: 50)"
     )
 
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help="Don't use or update the parse result cache"
+    )
+
     parser.add_argument(
         '--no-browser',
         action='store_true',
         help="Don't auto-open browser"
     )
 
+    parser.add_argument(
+        '--workers', '-w',
+        type=int,
+        default=1,
+        help="Analyze files in N processes (default: 1)"
+    )
+
     args = parser.parse_args()
 
     # Find template DB
@@ -788,12 +803,14 @@ def main():
         collections_dir=args.collections_dir,
         tfsm_db=tfsm_db,
         dcim_db=args.dcim_db,
-        verbose=False
+        verbose=False,
+        use_cache=not args.no_cache
     )
 
     report = analyzer.analyze_all(
         extract=True,
-        min_score_for_extract=args.min_score
+        min_score_for_extract=args.min_score,
+        workers=args.workers
     )
 
     print(f"Analysis complete: {report.total_files} files, {report.total_matched} matched")
@@ -16,6 +16,7 @@ from pathlib import Path
 from typing import Optional
 
 from vcollector.core.config import Config, get_config
+from vcollector.core.db import connect
 
 
 def handle_init(args) -> int:
@@ -201,11 +202,9 @@ def _init_dcim_db(base_dir: Path, include_defaults: bool = True):
 
 def _init_collector_db(base_dir: Path):
     """Initialize Collector database with schema."""
-    import sqlite3
-
     db_path = base_dir / "collector.db"
 
-    conn = sqlite3.connect(str(db_path))
+    conn = connect(db_path)
     cursor = conn.cursor()
 
     # Check if already initialized
@@ -268,6 +267,7 @@ def _init_collector_db(base_dir: Path):
         use_textfsm INTEGER DEFAULT 0,
         textfsm_template TEXT,
         validation_min_score INTEGER DEFAULT 0,
+        validation_sample_lines INTEGER DEFAULT 0,
         store_failures INTEGER DEFAULT 1,
         max_workers INTEGER DEFAULT 10,
         timeout_seconds INTEGER DEFAULT 60,
@@ -397,11 +397,9 @@ def _init_collector_db(base_dir: Path):
 
 def _init_tfsm_db(base_dir: Path):
     """Initialize TextFSM templates database."""
-    import sqlite3
-
     db_path = base_dir / "tfsm_templates.db"
 
-    conn = sqlite3.connect(str(db_path))
+    conn = connect(db_path)
     cursor = conn.cursor()
 
     # Check if already initialized
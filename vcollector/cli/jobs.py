@@ -232,6 +232,8 @@ def _print_job_detail(job: Job):
         if job.textfsm_template:
             print(f"  Template: {job.textfsm_template}")
         print(f"  Min score: {job.validation_min_score}")
+        if job.validation_sample_lines:
+            print(f"  Sample lines: {job.validation_sample_lines}")
         print(f"  Store failures: {'yes' if job.store_failures else 'no'}")
         print()
 
@@ -412,6 +414,7 @@ def _export_job_json(job: Job, output_path: Path):
             "use_tfsm": job.use_textfsm,
             "tfsm_filter": job.textfsm_template,
             "min_score": job.validation_min_score,
+            "sample_lines": job.validation_sample_lines,
         },
         "execution": {
             "max_workers": job.max_workers,
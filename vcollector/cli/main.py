@@ -282,6 +282,11 @@ def _setup_run_parser(parser: argparse.ArgumentParser):
         default=4,
         help="Max jobs to run in parallel (default: 4)",
     )
+    parser.add_argument(
+        "--device-major",
+        action="store_true",
+        help="Multiple database jobs: log in once per device and run every job's command in that session"
+    )
     parser.add_argument(
         "--limit",
         type=int,
@@ -308,6 +308,7 @@ def _json_to_job(job_data: dict, file_path: Path) -> Job:
         use_textfsm=validation.get('use_tfsm', False),
         textfsm_template=validation.get('tfsm_filter'),
         validation_min_score=validation.get('min_score', 0),
+        validation_sample_lines=validation.get('sample_lines', 0),
         max_workers=execution.get('max_workers', 10),
         timeout_seconds=execution.get('timeout', 60),
         base_path=storage.get('base_path', '~/.vcollector/collections'),
@@ -491,9 +492,30 @@ def _run_batch_jobs(job_refs: List[JobRef], creds, resolver, args):
         quiet=args.quiet,
     )
 
-    # Run file-based jobs (legacy support)
-    # Note: BatchRunner may need updating to support Job objects directly
-    result = runner.run(file_jobs) if file_jobs else BatchResult()
+    if getattr(args, 'device_major', False) and db_jobs:
+        # Device-major: one login per device for all database jobs
+        from vcollector.jobs.device_major import DeviceMajorRunner
+
+        print("Device-major mode: one session per device for all jobs\n")
+        dm_runner = DeviceMajorRunner(
+            credentials=creds,
+            credential_resolver=resolver,
+            validate=True,
+            debug=args.debug,
+            no_save=args.no_save,
+            force_save=getattr(args, 'force_save', False),
+            limit=args.limit,
+            quiet=args.quiet,
+        )
+        result = dm_runner.run([job.slug for _, job in db_jobs])
+        if file_jobs:
+            # JSON job files have no database slug - run them the usual way
+            print(f"Running {len(file_jobs)} JSON job file(s) job-major\n")
+            result = _merge_batch_results(result, runner.run(file_jobs))
+    else:
+        # Run file-based jobs (legacy support)
+        # Note: BatchRunner may need updating to support Job objects directly
+        result = runner.run(file_jobs) if file_jobs else BatchResult()
 
     # Print summary
     print()
@@ -548,6 +570,24 @@ def _run_batch_jobs(job_refs: List[JobRef], creds, resolver, args):
     return result
 
 
+def _merge_batch_results(first, second):
+    """Combine two BatchResults run one after the other into one."""
+    from vcollector.jobs.batch import BatchResult
+
+    return BatchResult(
+        total_jobs=first.total_jobs + second.total_jobs,
+        successful_jobs=first.successful_jobs + second.successful_jobs,
+        failed_jobs=first.failed_jobs + second.failed_jobs,
+        total_devices=first.total_devices + second.total_devices,
+        total_success=first.total_success + second.total_success,
+        total_failed=first.total_failed + second.total_failed,
+        total_skipped=first.total_skipped + second.total_skipped,
+        total_captures=first.total_captures + second.total_captures,
+        duration_seconds=first.duration_seconds + second.duration_seconds,
+        job_results=first.job_results + second.job_results,
+    )
+
+
 def _print_job_result(result):
     """Print single job result."""
     print(f"Results: {result.success_count} success, "
@@ -13,7 +13,7 @@ v2 Changes:
 import os
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 import yaml
 
@@ -40,6 +40,10 @@ class ExecutionConfig:
     max_workers: int = 12
     timeout: int = 60
     inter_command_delay: float = 1.0
+    prompt_sync: bool = True  # Send next command when the prompt returns
+    slow_platforms: List[str] = field(default_factory=list)  # Keep inter_command_delay sleeps
+    validation_workers: int = 0  # Worker processes for clean/validate (0 = in-process)
+    validation_max_pending: int = 0  # Outputs in flight to workers (0 = 4 per worker)
 
 
 @dataclass
@@ -67,6 +71,8 @@ class Config:
     collections_dir: Path = DEFAULT_COLLECTIONS_DIR
     legacy_jobs_dir: Path = DEFAULT_LEGACY_JOBS_DIR  # For JSON job files (backward compat)
     log_dir: Path = DEFAULT_LOG_DIR
+    save_parsed: bool = False  # Keep validation's parsed records next to each capture
+    capture_history: bool = True  # Deduplicated, compressed capture history in <collections>/.store
 
     # Execution defaults (used when job doesn't specify)
     execution: ExecutionConfig = field(default_factory=ExecutionConfig)
@@ -129,6 +135,12 @@ class Config:
             # Backward compatibility: old key name
             config.legacy_jobs_dir = Path(data["jobs_dir"]).expanduser()
 
+        if "save_parsed" in data:
+            config.save_parsed = bool(data["save_parsed"])
+
+        if "capture_history" in data:
+            config.capture_history = bool(data["capture_history"])
+
         # Execution settings
         if "execution" in data:
             exec_data = data["execution"]
@@ -139,6 +151,10 @@ class Config:
                     "inter_command_delay",
                     exec_data.get("inter_command_time", 1.0)  # Old key name
                 ),
+                prompt_sync=exec_data.get("prompt_sync", True),
+                slow_platforms=exec_data.get("slow_platforms") or [],
+                validation_workers=exec_data.get("validation_workers", 0),
+                validation_max_pending=exec_data.get("validation_max_pending", 0),
             )
 
         # Logging settings
@@ -227,6 +243,14 @@ collections_dir: {self.collections_dir}
 # Legacy JSON job files (for backward compatibility)
 legacy_jobs_dir: {self.legacy_jobs_dir}
 
+# Save validation's parsed records next to each capture
+# (<capture>.parsed.ndjson) so export and reporting tools can skip re-parsing
+save_parsed: false
+
+# Keep every distinct capture compressed in <collections_dir>/.store, with a
+# manifest per run; unchanged output is not rewritten
+capture_history: true
+
 # =============================================================================
 # Default Execution Settings
 # =============================================================================
@@ -235,7 +259,11 @@ legacy_jobs_dir: {self.legacy_jobs_dir}
 execution:
   max_workers: 12          # Concurrent SSH connections per job
   timeout: 60              # SSH timeout in seconds
-  inter_command_delay: 1   # Seconds between commands
+  inter_command_delay: 1   # Seconds between commands (slow platforms only)
+  prompt_sync: true        # Send next command as soon as the prompt returns
+  slow_platforms: []       # Platform names / netmiko types that need the fixed delay
+  validation_workers: 0    # Processes for TextFSM validation (0 = in the collector process)
+  validation_max_pending: 0  # Outputs queued for validation workers (0 = 4 per worker)
 
 # =============================================================================
 # Logging
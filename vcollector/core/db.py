@@ -0,0 +1,198 @@
+"""
+SQLite connections - one place that decides how databases are opened.
+
+Path: vcollector/core/db.py
+
+Plain sqlite3.connect() gives a rollback journal: a writer locks readers
+out for the length of its transaction, and every commit costs two fsyncs.
+With batch jobs writing collector.db while the GUI polls it, that shows up
+as "database is locked" and writers queueing behind each other.
+
+connect() opens every database the same way:
+
+    journal_mode=WAL     readers and one writer run concurrently
+                         (set once per file; it persists in the file)
+    synchronous=NORMAL   one fsync per checkpoint instead of per commit
+    busy_timeout         wait for a lock instead of failing at once
+    mmap_size            read pages through the OS page cache
+    cache_size           per-connection page cache
+    temp_store=MEMORY    sorts and temp indexes stay off disk
+
+readonly=True opens a read-only URI (file:...?mode=ro) with query_only,
+for databases the collector never writes, such as tfsm_templates.db. It
+never creates the file or changes its journal mode.
+
+ThreadLocalConnections keeps one connection per thread for code that
+reads from worker threads (sqlite3 connections are not shareable).
+
+Usage:
+    conn = connect(config.collector_db, row_factory=sqlite3.Row)
+
+    templates = connect(tfsm_db, readonly=True)
+
+    readers = ThreadLocalConnections(tfsm_db, readonly=True)
+    rows = readers.get().execute("SELECT ...").fetchall()   # any thread
+    readers.close_all()
+"""
+
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Set, Union
+
+
+logger = logging.getLogger(__name__)
+
+
+BUSY_TIMEOUT_MS = 30000
+MMAP_SIZE = 256 * 1024 * 1024
+CACHE_SIZE_KB = 16384
+
+PRAGMAS = {
+    'busy_timeout': BUSY_TIMEOUT_MS,
+    'mmap_size': MMAP_SIZE,
+    'cache_size': -CACHE_SIZE_KB,  # Negative = KiB rather than pages
+    'temp_store': 'MEMORY',
+}
+
+_wal_paths: Set[str] = set()
+_wal_lock = threading.Lock()
+
+
+def connect(
+    path: Union[str, Path],
+    readonly: bool = False,
+    row_factory: Optional[Callable] = None,
+    check_same_thread: bool = True,
+    foreign_keys: bool = False,
+) -> sqlite3.Connection:
+    """
+    Open a database with the shared settings.
+
+    Args:
+        path: Database file (or ":memory:").
+        readonly: Open read-only; the file must exist.
+        row_factory: Connection row factory, e.g. sqlite3.Row.
+        check_same_thread: Passed to sqlite3.connect. Set False only when
+            the caller serializes use of the connection itself.
+        foreign_keys: Enforce foreign key constraints.
+
+    Returns:
+        Configured connection.
+    """
+    memory = str(path) == ':memory:'
+    timeout = BUSY_TIMEOUT_MS / 1000
+
+    if readonly and not memory:
+        uri = Path(path).expanduser().resolve().as_uri() + '?mode=ro'
+        conn = sqlite3.connect(uri, uri=True, timeout=timeout, check_same_thread=check_same_thread)
+        conn.execute("PRAGMA query_only = ON")
+    else:
+        conn = sqlite3.connect(str(path), timeout=timeout, check_same_thread=check_same_thread)
+        if not memory:
+            _enable_wal(conn, path)
+            conn.execute("PRAGMA synchronous = NORMAL")
+
+    for name, value in PRAGMAS.items():
+        conn.execute(f"PRAGMA {name} = {value}")
+    if foreign_keys:
+        conn.execute("PRAGMA foreign_keys = ON")
+    if row_factory is not None:
+        conn.row_factory = row_factory
+    return conn
+
+
+def _enable_wal(conn: sqlite3.Connection, path: Union[str, Path]):
+    """Switch a database to WAL (once per file per process)."""
+    key = str(Path(path).expanduser().resolve())
+    with _wal_lock:
+        if key in _wal_paths:
+            return
+    try:
+        mode = conn.execute("PRAGMA journal_mode = WAL").fetchone()[0]
+    except sqlite3.OperationalError as e:
+        # Another connection holds a lock - the next connect() tries again
+        logger.debug(f"Could not enable WAL on {key}: {e}")
+        return
+    if mode.lower() != 'wal':
+        # e.g. a filesystem without shared memory support
+        logger.debug(f"WAL unavailable on {key}, using journal_mode={mode}")
+    with _wal_lock:
+        _wal_paths.add(key)
+
+
+class ThreadLocalConnections:
+    """
+    One connection per thread to a database.
+
+    Connections are opened on first use in each thread and closed together
+    by close_all().
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        readonly: bool = True,
+        row_factory: Optional[Callable] = sqlite3.Row,
+    ):
+        """
+        Initialize per-thread connections.
+
+        Args:
+            path: Database file.
+            readonly: Open read-only URIs (see connect()).
+            row_factory: Row factory for each connection.
+        """
+        self.path = path
+        self.readonly = readonly
+        self.row_factory = row_factory
+        self._local = threading.local()
+        self._connections: Dict[int, sqlite3.Connection] = {}
+        self._lock = threading.Lock()
+
+    def get(self) -> sqlite3.Connection:
+        """This thread's connection, opened on first use."""
+        conn = getattr(self._local, 'connection', None)
+        if conn is None:
+            # check_same_thread=False only so close_all() can close it from another thread
+            conn = connect(self.path, readonly=self.readonly, row_factory=self.row_factory,
+                           check_same_thread=False)
+            self._local.connection = conn
+            with self._lock:
+                self._connections[id(conn)] = conn
+        return conn
+
+    def discard(self):
+        """Close this thread's connection (e.g. after an error left it unusable)."""
+        conn = getattr(self._local, 'connection', None)
+        if conn is not None:
+            del self._local.connection
+            with self._lock:
+                self._connections.pop(id(conn), None)
+            conn.close()
+
+    def close_all(self):
+        """Close every thread's connection."""
+        with self._lock:
+            connections = list(self._connections.values())
+            self._connections.clear()
+        self._local = threading.local()
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                logger.debug(f"Error closing connection to {self.path}: {e}")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._connections)
+
+
+def pragma_summary(conn: sqlite3.Connection) -> Dict[str, Any]:
+    """Effective settings of a connection (for diagnostics)."""
+    return {
+        name: conn.execute(f"PRAGMA {name}").fetchone()[0]
+        for name in ('journal_mode', 'synchronous', 'busy_timeout', 'mmap_size',
+                     'cache_size', 'temp_store', 'query_only')
+    }
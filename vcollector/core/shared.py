@@ -0,0 +1,95 @@
+"""
+Shared state - process-wide instances and the files they persist to.
+
+Path: vcollector/core/shared.py
+
+Several components keep one instance per process (the SSH negotiation
+cache, the template route table, the result writers) and write small state
+files that other processes may read at any moment. ProcessWide creates each
+instance once, under a lock, and can close them all at interpreter exit.
+write_atomic() / write_text() replace a file via a temp file and rename, so
+readers never see a partial file.
+
+Usage:
+    _caches = ProcessWide(NegotiationCache)
+    cache = _caches.get()
+
+    _writers = ProcessWide(ResultWriter, close=ResultWriter.close)
+    writer = _writers.get(collector_db, dcim_db)   # One per distinct key
+
+    write_text(path, json.dumps(records))
+"""
+
+import atexit
+import os
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, Generic, List, Optional, Tuple, TypeVar, Union
+
+
+T = TypeVar('T')
+
+
+def write_atomic(path: Union[str, Path], data: bytes):
+    """
+    Replace path with data via a temp file and rename.
+
+    The temp file is created with default permissions (subject to umask),
+    like a plain open(), not mkstemp's 0600.
+    """
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+    fd = os.open(str(tmp), os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0), 0o666)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def write_text(path: Union[str, Path], text: str):
+    """Write text with write_atomic(), creating parent directories."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    write_atomic(path, text.encode('utf-8'))
+
+
+class ProcessWide(Generic[T]):
+    """
+    Lazily created process-wide instances, one per distinct key.
+
+    get(*key) calls factory(*key) the first time a key is seen. With close
+    given, every instance created is passed to it at interpreter exit.
+    """
+
+    def __init__(self, factory: Callable[..., T], close: Optional[Callable[[T], Any]] = None):
+        self.factory = factory
+        self.close = close
+        self._instances: Dict[Tuple, T] = {}
+        self._lock = threading.Lock()
+
+    def get(self, *key) -> T:
+        """The instance for key, created on first use."""
+        with self._lock:
+            instance = self._instances.get(key)
+            if instance is None:
+                if self.close is not None and not self._instances:
+                    atexit.register(self.close_all)
+                instance = self._instances[key] = self.factory(*key)
+            return instance
+
+    def instances(self) -> List[T]:
+        """Instances created so far."""
+        with self._lock:
+            return list(self._instances.values())
+
+    def close_all(self):
+        """Pass every instance to close (registered with atexit when close is set)."""
+        for instance in self.instances():
+            self.close(instance)
@@ -1,7 +1,5 @@
 import sqlite3
-import textfsm
 from typing import Dict, List, Tuple, Optional
-import io
 import time
 import click
 from multiprocessing import Process, Queue
@@ -10,44 +8,49 @@ import sys
 import threading
 from contextlib import contextmanager
 
+from vcollector.core.db import ThreadLocalConnections
+from vcollector.validation.template_cache import TemplateCache, get_template_cache
+from vcollector.validation.template_index import get_template_index
+from vcollector.validation.parse_cache import ParseResultCache
+
 
 class ThreadSafeConnection:
-    """Thread-local storage for SQLite connections"""
+    """Thread-local, read-only connections to the templates database"""
 
     def __init__(self, db_path: str, verbose: bool = False):
         self.db_path = db_path
         self.verbose = verbose
-        self._local = threading.local()
+        self._connections = ThreadLocalConnections(db_path, readonly=True)
 
     @contextmanager
     def get_connection(self):
         """Get a thread-local connection"""
-        if not hasattr(self._local, 'connection'):
-            self._local.connection = sqlite3.connect(self.db_path)
-            self._local.connection.row_factory = sqlite3.Row
-            if self.verbose:
-                click.echo(f"Created new connection in thread {threading.get_ident()}")
-
+        if self.verbose and len(self._connections) == 0:
+            click.echo(f"Created new connection in thread {threading.get_ident()}")
         try:
-            yield self._local.connection
-        except Exception as e:
-            if hasattr(self._local, 'connection'):
-                self._local.connection.close()
-                delattr(self._local, 'connection')
-            raise e
+            yield self._connections.get()
+        except Exception:
+            self._connections.discard()
+            raise
 
     def close_all(self):
-        """Close connection if it exists for current thread"""
-        if hasattr(self._local, 'connection'):
-            self._local.connection.close()
-            delattr(self._local, 'connection')
+        """Close every thread's connection"""
+        self._connections.close_all()
 
 
 class TextFSMAutoEngine:
-    def __init__(self, db_path: str, verbose: bool = False):
+    # Names this engine's scoring in the parse cache
+    PARSE_CACHE_SCORER = 'tfsm_fire'
+
+    def __init__(self, db_path: str, verbose: bool = False,
+                 template_cache: Optional[TemplateCache] = None,
+                 parse_cache: Optional[ParseResultCache] = None):
         self.db_path = db_path
         self.verbose = verbose
         self.connection_manager = ThreadSafeConnection(db_path, verbose)
+        self.template_cache = template_cache or get_template_cache()
+        self.template_index = get_template_index(db_path)
+        self.parse_cache = parse_cache  # None = always parse (see get_parse_cache)
 
     def _calculate_template_score(
             self,
@@ -152,12 +155,26 @@ class TextFSMAutoEngine:
 
         # Get filtered templates using thread-safe connection
         with self.connection_manager.get_connection() as conn:
-            templates = self.get_filtered_templates(conn, filter_string)
+            templates = self.template_cache.templates(
+                self.db_path, filter_string,
+                lambda: self.get_filtered_templates(conn, filter_string),
+            )
             total_templates = len(templates)
 
             if self.verbose:
                 click.echo(f"Found {total_templates} matching templates for filter: {filter_string}")
 
+            if self.parse_cache is not None:
+                template, records, score = self.parse_cache.best_template(
+                    device_output, templates,
+                    parse=lambda t: self._parse_template(t, device_output),
+                    score=lambda records, t: self._calculate_template_score(records, t, device_output),
+                    scorer=self.PARSE_CACHE_SCORER,
+                )
+                if template is None:
+                    return best_template, best_parsed_output, best_score
+                return template['cli_command'], records, score
+
             # Try each template
             for idx, template in enumerate(templates, 1):
                 if self.verbose:
@@ -165,9 +182,9 @@ class TextFSMAutoEngine:
                     click.echo(f"\nTemplate {idx}/{total_templates} ({percentage:.1f}%): {template['cli_command']}")
 
                 try:
-                    textfsm_template = textfsm.TextFSM(io.StringIO(template['textfsm_content']))
-                    parsed = textfsm_template.ParseText(device_output)
-                    parsed_dicts = [dict(zip(textfsm_template.header, row)) for row in parsed]
+                    parsed_dicts = self._parse_template(template, device_output)
+                    if parsed_dicts is None:
+                        continue
                     score = self._calculate_template_score(parsed_dicts, template, device_output)
 
                     if self.verbose:
@@ -187,21 +204,18 @@ class TextFSMAutoEngine:
 
         return best_template, best_parsed_output, best_score
 
+    def _parse_template(self, template, device_output: str) -> Optional[List[Dict]]:
+        """Parse with one template; None if the prefilter rules it out."""
+        if not self.template_cache.may_match(template, device_output):
+            if self.verbose:
+                click.echo(" -> Skipped (prefilter)")
+            return None
+        header, parsed = self.template_cache.parse(template, device_output)
+        return [dict(zip(header, row)) for row in parsed]
+
     def get_filtered_templates(self, connection: sqlite3.Connection, filter_string: Optional[str] = None):
         """Get filtered templates from database using provided connection."""
-        cursor = connection.cursor()
-        if filter_string:
-            filter_terms = filter_string.replace('-', '_').split('_')
-            query = "SELECT * FROM templates WHERE 1=1"
-            params = []
-            for term in filter_terms:
-                if term and len(term) > 2:
-                    query += " AND cli_command LIKE ?"
-                    params.append(f"%{term}%")
-            cursor.execute(query, params)
-        else:
-            cursor.execute("SELECT * FROM templates")
-        return cursor.fetchall()
+        return self.template_index.fetch(connection, filter_string)
 
     def __del__(self):
         """Clean up connections on deletion"""
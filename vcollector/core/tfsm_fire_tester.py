@@ -13,6 +13,7 @@ Author: Scott Peterman
 License: MIT
 """
 
+import os
 import sys
 import json
 import sqlite3
@@ -74,6 +75,24 @@ except ImportError:
             except ImportError:
                 pass
 
+# On-disk parse results from earlier runs (--no-cache or VCOLLECTOR_NO_PARSE_CACHE=1 to bypass)
+try:
+    from vcollector.validation.parse_cache import DISABLE_ENV as PARSE_CACHE_DISABLE_ENV, get_parse_cache
+except ImportError:
+    PARSE_CACHE_DISABLE_ENV = 'VCOLLECTOR_NO_PARSE_CACHE'
+
+    def get_parse_cache():
+        return None
+
+# Shared connection settings (WAL, busy timeout) - see vcollector.core.db
+try:
+    from vcollector.core.db import connect as db_connect
+except ImportError:
+    def db_connect(path, readonly=False, row_factory=None):
+        conn = sqlite3.connect(str(path))
+        conn.row_factory = row_factory
+        return conn
+
 # =============================================================================
 # NTC TEMPLATES GITHUB DOWNLOAD
 # =============================================================================
@@ -154,7 +173,7 @@ class NTCDownloadWorker(QThread):
                 return
 
             # Connect to database
-            conn = sqlite3.connect(self.db_path)
+            conn = db_connect(self.db_path)
             print(f"db_path: {self.db_path}")
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS templates (
@@ -871,7 +890,11 @@ class TemplateTestWorker(QThread):
             return
 
         try:
-            engine = TextFSMAutoEngine(self.db_path, verbose=self.verbose)
+            parse_cache = get_parse_cache()
+            if parse_cache is not None:
+                engine = TextFSMAutoEngine(self.db_path, verbose=self.verbose, parse_cache=parse_cache)
+            else:
+                engine = TextFSMAutoEngine(self.db_path, verbose=self.verbose)
 
             with engine.connection_manager.get_connection() as conn:
                 all_templates = engine.get_filtered_templates(conn, self.filter_string)
@@ -1518,7 +1541,7 @@ Start
         )
         if file_path:
             try:
-                conn = sqlite3.connect(file_path)
+                conn = db_connect(file_path)
                 conn.execute("""
                     CREATE TABLE IF NOT EXISTS templates (
                         id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -1569,9 +1592,7 @@ Start
             return None
 
         try:
-            conn = sqlite3.connect(str(db_path))
-            conn.row_factory = sqlite3.Row
-            return conn
+            return db_connect(db_path, row_factory=sqlite3.Row)
         except Exception as e:
             tb = traceback.format_exc()
             print(f"[DB Connection Error] {db_path}\n{tb}", file=sys.stderr)
@@ -2360,6 +2381,10 @@ usa-leaf-1          Eth5           120        R               GigabitEthernet0/0
 # =============================================================================
 
 def main():
+    if '--no-cache' in sys.argv:
+        sys.argv.remove('--no-cache')
+        os.environ[PARSE_CACHE_DISABLE_ENV] = '1'
+
     app = QApplication(sys.argv)
     app.setStyle('Fusion')
 
@@ -16,8 +16,13 @@ from pathlib import Path
 from typing import Optional
 from datetime import datetime
 
+from vcollector.core.db import connect
 
-SCHEMA_VERSION = 2
+
+SCHEMA_VERSION = 3
+
+# Learned prompt cache columns on dcim_device (v3)
+PROMPT_CACHE_COLUMNS = ('cached_prompt', 'cached_prompt_pattern', 'prompt_cached_at')
 
 SCHEMA_SQL = """
 -- ============================================================================
@@ -164,6 +169,11 @@ CREATE TABLE IF NOT EXISTS dcim_device (
     credential_tested_at TEXT,              -- Last credential test timestamp
     credential_test_result TEXT DEFAULT 'untested',  -- 'untested', 'success', 'failed'
     
+    -- Learned prompt cache (v3) - cleared on rename
+    cached_prompt TEXT,                     -- Last detected CLI prompt
+    cached_prompt_pattern TEXT,             -- Regex matching the prompt and its mode variants
+    prompt_cached_at TEXT,
+    
     -- Metadata
     description TEXT,
     comments TEXT,
@@ -343,9 +353,7 @@ class DCIMDatabase:
     def conn(self) -> sqlite3.Connection:
         """Get database connection, creating if needed."""
         if self._conn is None:
-            self._conn = sqlite3.connect(str(self.db_path))
-            self._conn.row_factory = sqlite3.Row
-            self._conn.execute("PRAGMA foreign_keys = ON")
+            self._conn = connect(self.db_path, row_factory=sqlite3.Row, foreign_keys=True)
         return self._conn
 
     def close(self):
@@ -395,6 +403,16 @@ class DCIMDatabase:
                 (2,)
             )
             self.conn.commit()
+            current_version = 2
+
+        if current_version < 3:
+            # Run V3 migration - add learned prompt cache columns
+            self._run_migration_v3(cursor)
+            cursor.execute(
+                "INSERT INTO schema_version (version) VALUES (?)",
+                (3,)
+            )
+            self.conn.commit()
 
         return False
 
@@ -450,6 +468,19 @@ class DCIMDatabase:
             LEFT JOIN dcim_device_role r ON d.role_id = r.id
         """)
 
+    def _run_migration_v3(self, cursor: sqlite3.Cursor):
+        """
+        Run V3 migration - add learned prompt cache columns.
+
+        Called automatically by init_schema() when upgrading from v2.
+        """
+        cursor.execute("PRAGMA table_info(dcim_device)")
+        existing_columns = {row[1] for row in cursor.fetchall()}
+
+        for column in PROMPT_CACHE_COLUMNS:
+            if column not in existing_columns:
+                cursor.execute(f"ALTER TABLE dcim_device ADD COLUMN {column} TEXT")
+
     def _init_default_data(self, cursor: sqlite3.Cursor):
         """Insert default manufacturers, platforms, and roles."""
 
@@ -26,6 +26,8 @@ from pathlib import Path
 from typing import Optional, List, Dict, Any, Union
 from enum import Enum
 
+from vcollector.core.db import connect
+
 
 class DeviceStatus(str, Enum):
     """Device operational status - matches NetBox choices."""
@@ -172,14 +174,13 @@ class DCIMRepository:
 
         self.db_path = Path(db_path)
         self._conn: Optional[sqlite3.Connection] = None
+        self._prompt_cache_ready = False
 
     @property
     def conn(self) -> sqlite3.Connection:
         """Get database connection."""
         if self._conn is None:
-            self._conn = sqlite3.connect(str(self.db_path))
-            self._conn.row_factory = sqlite3.Row
-            self._conn.execute("PRAGMA foreign_keys = ON")
+            self._conn = connect(self.db_path, row_factory=sqlite3.Row, foreign_keys=True)
         return self._conn
 
     def close(self):
@@ -667,10 +668,23 @@ class DCIMRepository:
         return self.conn.execute(query, params).fetchone()[0]
 
     def update_device(self, device_id: int, **kwargs) -> bool:
-        """Update a device."""
+        """
+        Update a device.
+
+        Renaming a device clears its learned prompt cache, since the prompt
+        normally carries the hostname.
+        """
         if not kwargs:
             return False
 
+        if 'name' in kwargs:
+            row = self.conn.execute(
+                "SELECT name FROM dcim_device WHERE id = ?", (device_id,)
+            ).fetchone()
+            if row and row['name'] != kwargs['name']:
+                self._ensure_prompt_cache()
+                kwargs.update(cached_prompt=None, cached_prompt_pattern=None, prompt_cached_at=None)
+
         kwargs['updated_at'] = self._now()
 
         set_clause = ', '.join([f"{k} = ?" for k in kwargs.keys()])
@@ -683,6 +697,79 @@ class DCIMRepository:
         self.conn.commit()
         return cursor.rowcount > 0
 
+    # =========================================================================
+    # Learned Prompt Cache
+    # =========================================================================
+
+    def _ensure_prompt_cache(self):
+        """Add the prompt cache columns to databases created before v3."""
+        if self._prompt_cache_ready:
+            return
+
+        from vcollector.dcim.db_schema import PROMPT_CACHE_COLUMNS
+
+        existing = {row[1] for row in self.conn.execute("PRAGMA table_info(dcim_device)")}
+        missing = [c for c in PROMPT_CACHE_COLUMNS if c not in existing]
+        for column in missing:
+            self.conn.execute(f"ALTER TABLE dcim_device ADD COLUMN {column} TEXT")
+        if missing:
+            self.conn.commit()
+
+        self._prompt_cache_ready = True
+
+    def get_device_prompts(self, device_ids: List[int]) -> Dict[int, Dict[str, Optional[str]]]:
+        """
+        Get learned prompts for a set of devices.
+
+        Args:
+            device_ids: Device IDs to look up
+
+        Returns:
+            Dict of device_id -> {'prompt': str, 'pattern': str or None}
+            for devices with a cached prompt
+        """
+        self._ensure_prompt_cache()
+
+        prompts = {}
+        ids = list(device_ids)
+        for i in range(0, len(ids), 500):  # Stay under SQLite's variable limit
+            chunk = ids[i:i + 500]
+            placeholders = ', '.join('?' for _ in chunk)
+            rows = self.conn.execute(
+                f"""SELECT id, cached_prompt, cached_prompt_pattern FROM dcim_device
+                    WHERE id IN ({placeholders}) AND cached_prompt IS NOT NULL""",
+                chunk
+            ).fetchall()
+            for row in rows:
+                prompts[row['id']] = {
+                    'prompt': row['cached_prompt'],
+                    'pattern': row['cached_prompt_pattern'],
+                }
+
+        return prompts
+
+    def set_device_prompt(self, device_id: int, prompt: str,
+                          pattern: Optional[str] = None) -> bool:
+        """
+        Store the learned prompt for a device.
+
+        Does not touch updated_at - the prompt cache is collection state,
+        not an edit to the device.
+        """
+        self._ensure_prompt_cache()
+        cursor = self.conn.execute(
+            """UPDATE dcim_device
+               SET cached_prompt = ?, cached_prompt_pattern = ?, prompt_cached_at = ?
+               WHERE id = ?""",
+            (prompt, pattern, self._now() if prompt else None, device_id)
+        )
+        self.conn.commit()
+        return cursor.rowcount > 0
+
+    def clear_device_prompt(self, device_id: int) -> bool:
+        """Forget the learned prompt for a device."""
+        return self.set_device_prompt(device_id, None)
+
     def update_device_last_collected(self, device_id: int) -> bool:
         """Update device's last_collected_at timestamp."""
         return self.update_device(device_id, last_collected_at=self._now())
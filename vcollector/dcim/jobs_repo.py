@@ -33,6 +33,8 @@ from pathlib import Path
 from typing import Optional, List, Dict, Any
 from enum import Enum
 
+from vcollector.core.db import connect
+
 
 class CaptureType(str, Enum):
     """Common capture types for jobs."""
@@ -100,6 +102,7 @@ class Job:
     use_textfsm: bool = False
     textfsm_template: Optional[str] = None
     validation_min_score: int = 0
+    validation_sample_lines: int = 0  # Score candidates on a sample of larger outputs (0 = whole output)
     store_failures: bool = True
 
     # Execution
@@ -153,6 +156,12 @@ class JobHistory:
     vendor: Optional[str] = None
 
 
+# Columns added to jobs after the original schema: name -> column definition
+JOB_COLUMN_MIGRATIONS = {
+    'validation_sample_lines': 'INTEGER DEFAULT 0',
+}
+
+
 class JobsRepository:
     """
     Data access layer for jobs and job history.
@@ -175,11 +184,21 @@ class JobsRepository:
     def conn(self) -> sqlite3.Connection:
         """Get database connection."""
         if self._conn is None:
-            self._conn = sqlite3.connect(str(self.db_path))
-            self._conn.row_factory = sqlite3.Row
-            self._conn.execute("PRAGMA foreign_keys = ON")
+            self._conn = connect(self.db_path, row_factory=sqlite3.Row, foreign_keys=True)
+            self._ensure_columns()
         return self._conn
 
+    def _ensure_columns(self):
+        """Add columns missing from jobs tables created by older versions."""
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        if not existing:
+            return  # No jobs table yet - created by vcollector init
+        missing = [c for c in JOB_COLUMN_MIGRATIONS if c not in existing]
+        for column in missing:
+            self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {JOB_COLUMN_MIGRATIONS[column]}")
+        if missing:
+            self._conn.commit()
+
     def close(self):
         """Close database connection."""
         if self._conn:
@@ -228,7 +247,7 @@ class JobsRepository:
             'device_filter_site_id', 'device_filter_role_id', 'device_filter_name_pattern',
             'device_filter_status', 'paging_disable_command', 'output_directory',
             'filename_pattern', 'use_textfsm', 'textfsm_template', 'validation_min_score',
-            'store_failures', 'max_workers', 'timeout_seconds', 'inter_command_delay',
+            'validation_sample_lines', 'store_failures', 'max_workers', 'timeout_seconds', 'inter_command_delay',
             'base_path', 'schedule_enabled', 'schedule_cron', 'is_enabled',
             'legacy_job_id', 'legacy_job_file'
         ]
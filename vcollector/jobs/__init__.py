@@ -2,5 +2,6 @@
 
 from vcollector.jobs.runner import JobRunner
 from vcollector.jobs.batch import BatchRunner
+from vcollector.jobs.device_major import DeviceMajorRunner
 
-__all__ = ["JobRunner", "BatchRunner"]
+__all__ = ["JobRunner", "BatchRunner", "DeviceMajorRunner"]
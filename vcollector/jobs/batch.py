@@ -14,6 +14,7 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from vcollector.vault.models import SSHCredentials
 from vcollector.jobs.runner import JobRunner, JobResult
+from vcollector.ssh.session_pool import SSHSessionPool
 
 
 # Thread-safe print
@@ -50,7 +51,9 @@ class BatchRunner:
     Execute multiple jobs concurrently.
     
     Each job runs in its own thread, with device-level concurrency
-    handled by the SSHExecutorPool within each job.
+    handled by the SSHExecutorPool within each job. Authenticated SSH
+    sessions are shared across the jobs of a run (reuse_sessions), so a
+    device matched by several jobs is logged into once.
     
     Usage:
         runner = BatchRunner(
@@ -78,6 +81,9 @@ class BatchRunner:
         force_save: bool = False,
         limit: Optional[int] = None,
         quiet: bool = False,
+        reuse_sessions: bool = True,
+        session_idle_timeout: float = 120.0,
+        session_max_age: float = 1800.0,
     ):
         """
         Initialize batch runner.
@@ -92,6 +98,9 @@ class BatchRunner:
             force_save: Save output even if validation fails.
             limit: Limit devices per job.
             quiet: Minimal output.
+            reuse_sessions: Keep SSH sessions open across jobs in a run.
+            session_idle_timeout: Close pooled sessions idle this long (seconds).
+            session_max_age: Close pooled sessions older than this (seconds).
         """
         self.credentials = credentials
         self.max_concurrent_jobs = max_concurrent_jobs
@@ -102,6 +111,10 @@ class BatchRunner:
         self.force_save = force_save
         self.limit = limit
         self.quiet = quiet
+        self.reuse_sessions = reuse_sessions
+        self.session_idle_timeout = session_idle_timeout
+        self.session_max_age = session_max_age
+        self._session_pool: Optional[SSHSessionPool] = None
 
     def run(
         self,
@@ -122,31 +135,42 @@ class BatchRunner:
         total_jobs = len(job_files)
         job_results: List[JobResult] = []
 
-        with ThreadPoolExecutor(max_workers=self.max_concurrent_jobs) as executor:
-            futures = {
-                executor.submit(self._run_single_job, jf): jf
-                for jf in job_files
-            }
-
-            completed = 0
-
-            for future in as_completed(futures):
-                job_file = futures[future]
-                completed += 1
-
-                try:
-                    result = future.result()
-                except Exception as e:
-                    result = JobResult(
-                        job_file=str(job_file),
-                        job_id=job_file.stem,
-                        error=str(e),
-                    )
-
-                job_results.append(result)
-
-                if progress_callback:
-                    progress_callback(completed, total_jobs, result)
+        if self.reuse_sessions:
+            self._session_pool = SSHSessionPool(
+                idle_timeout=self.session_idle_timeout,
+                max_age=self.session_max_age,
+            )
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_concurrent_jobs) as executor:
+                futures = {
+                    executor.submit(self._run_single_job, jf): jf
+                    for jf in job_files
+                }
+
+                completed = 0
+
+                for future in as_completed(futures):
+                    job_file = futures[future]
+                    completed += 1
+
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = JobResult(
+                            job_file=str(job_file),
+                            job_id=job_file.stem,
+                            error=str(e),
+                        )
+
+                    job_results.append(result)
+
+                    if progress_callback:
+                        progress_callback(completed, total_jobs, result)
+        finally:
+            if self._session_pool:
+                self._session_pool.close()
+                self._session_pool = None
 
         # Calculate aggregates
         duration_seconds = (datetime.now() - start_time).total_seconds()
@@ -184,6 +208,7 @@ class BatchRunner:
             force_save=self.force_save,
             limit=self.limit,
             quiet=self.quiet,
+            session_pool=self._session_pool,
         )
 
         return runner.run(job_file)
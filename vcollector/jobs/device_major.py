@@ -0,0 +1,463 @@
+"""
+Device-Major Batch Runner - One login per device for a whole batch.
+
+Path: vcollector/jobs/device_major.py
+
+Regroups the jobs of a batch by device: each device gets one SSH session
+in which every matching job's command runs in turn. Paging is disabled
+once per session (per distinct paging-disable command), and each job's
+output is captured separately, then cleaned, validated and saved through
+the normal JobRunner path, with a job_history record per job.
+
+Usage:
+    runner = DeviceMajorRunner(credentials=creds, credential_resolver=resolver)
+    batch = BatchLoader().load_batch("nightly-inventory.yaml")
+    result = runner.run(batch.valid_jobs)
+    print(f"Jobs: {result.successful_jobs}/{result.total_jobs}")
+"""
+
+import logging
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional, List, Dict, Any, Callable, Tuple
+
+from vcollector.vault.models import SSHCredentials
+from vcollector.vault.resolver import CredentialResolver
+from vcollector.ssh.executor import (
+    SSHExecutorPool,
+    ExecutorOptions,
+    ExecutionResult,
+    SSHErrorCategory,
+    BatchExecutionSummary,
+)
+from vcollector.ssh.session_pool import SSHSessionPool
+from vcollector.ssh.negotiation_cache import get_negotiation_cache
+from vcollector.validation.template_routes import get_template_routes
+from vcollector.jobs.runner import JobRunner, JobResult, _JobTally
+from vcollector.jobs.batch import BatchResult
+
+
+logger = logging.getLogger(__name__)
+
+
+# Failures that will repeat for every job on the device - don't reconnect
+DEVICE_LEVEL_FAILURES = (
+    SSHErrorCategory.AUTH_FAILURE,
+    SSHErrorCategory.DNS_FAILURE,
+    SSHErrorCategory.KEY_EXCHANGE_FAILURE,
+    SSHErrorCategory.CONNECTION_REFUSED,
+    SSHErrorCategory.CONNECTION_TIMEOUT,
+)
+
+
+@dataclass
+class PlannedJob:
+    """A batch job with its matched devices and execution settings."""
+    job: Any  # Job dataclass from JobsRepository
+    job_dict: Dict[str, Any]
+    devices: List[Dict[str, Any]]
+    main_command: Optional[str]
+    paging_disable: Optional[str]
+    executor: Optional[SSHExecutorPool] = None
+    history_id: Optional[int] = None
+    start_time: datetime = field(default_factory=datetime.now)
+    tally: _JobTally = field(default_factory=_JobTally)  # Processed as each device finishes
+    processed: int = 0  # Devices that ran this job's command
+    summary: BatchExecutionSummary = field(default_factory=BatchExecutionSummary)
+
+
+@dataclass
+class DevicePlan:
+    """All (job index, device index) steps for one device, in batch order."""
+    host: str
+    device_name: str
+    steps: List[Tuple[int, int]] = field(default_factory=list)
+    credentials: Optional[SSHCredentials] = None  # Per-device credential, if assigned
+    credential_name: Optional[str] = None
+
+
+class DeviceMajorRunner:
+    """
+    Execute a batch of database jobs device by device.
+
+    Flow:
+    1. Load each job and query its matching devices
+    2. Group (job, device) pairs by device host
+    3. Per device (concurrently): one session, each job's command in turn
+    4. Per job: clean, validate and save through JobRunner, record history
+
+    Job-level settings (timeout, inter_command_delay, validation filter,
+    storage) still apply per job.
+    """
+
+    def __init__(
+        self,
+        credentials: SSHCredentials,
+        credential_resolver: Optional[CredentialResolver] = None,
+        validate: bool = True,
+        tfsm_db_path: Optional[str] = None,
+        debug: bool = False,
+        no_save: bool = False,
+        force_save: bool = False,
+        limit: Optional[int] = None,
+        quiet: bool = False,
+        record_history: bool = True,
+        max_workers: Optional[int] = None,
+    ):
+        """
+        Initialize device-major runner.
+
+        Args:
+            credentials: SSH credentials from vault (default/fallback).
+            credential_resolver: Unlocked resolver for per-device credential lookup.
+            validate: Enable TextFSM validation.
+            tfsm_db_path: Path to TextFSM templates database.
+            debug: Enable debug output.
+            no_save: Don't save output files.
+            force_save: Save output even if validation fails.
+            limit: Limit devices per job.
+            quiet: Minimal output.
+            record_history: Record each job in job_history.
+            max_workers: Concurrent devices (default: largest job max_workers).
+        """
+        self.credentials = credentials
+        self.max_workers = max_workers
+        self.debug = debug
+
+        # JobRunner supplies device queries, credentials, validation and saving
+        self.runner = JobRunner(
+            credentials=credentials,
+            validate=validate,
+            tfsm_db_path=tfsm_db_path,
+            debug=debug,
+            no_save=no_save,
+            force_save=force_save,
+            limit=limit,
+            quiet=quiet,
+            record_history=record_history,
+            credential_resolver=credential_resolver,
+        )
+
+    def plan(self, job_slugs: List[str]) -> Tuple[List[PlannedJob], List[DevicePlan], List[JobResult]]:
+        """
+        Load jobs and group their devices.
+
+        Returns:
+            Tuple of (planned jobs, per-device plans, JobResults for jobs
+            that could not be planned).
+        """
+        planned: List[PlannedJob] = []
+        errors: List[JobResult] = []
+        by_host: Dict[str, DevicePlan] = {}
+
+        for slug in job_slugs:
+            job = self.runner.jobs_repo.get_job(slug=slug)
+            if not job:
+                errors.append(JobResult(job_file="database", job_id=slug, error=f"Job not found: {slug}"))
+                continue
+            if not job.is_enabled:
+                errors.append(JobResult(job_file="database", job_id=slug, error=f"Job is disabled: {job.name}"))
+                continue
+
+            job_dict = self.runner._job_to_dict(job)
+            try:
+                devices = self.runner._get_devices(job_dict)
+            except Exception as e:
+                errors.append(JobResult(
+                    job_file=f"database:{job.id}",
+                    job_id=job.slug,
+                    error=f"Device query failed: {e}",
+                ))
+                continue
+
+            if self.runner.limit:
+                devices = devices[:self.runner.limit]
+
+            job_index = len(planned)
+            planned.append(PlannedJob(
+                job=job,
+                job_dict=job_dict,
+                devices=devices,
+                main_command=job_dict['commands'].get('command'),
+                paging_disable=job_dict['commands'].get('paging_disable'),
+            ))
+
+            for device_index, device in enumerate(devices):
+                host = device['primary_ip4']
+                if host not in by_host:
+                    device_creds, cred_name = self.runner._get_device_credentials(device)
+                    by_host[host] = DevicePlan(
+                        host=host,
+                        device_name=device.get('normalized_name') or device.get('name') or host,
+                        credentials=device_creds,
+                        credential_name=cred_name,
+                    )
+                by_host[host].steps.append((job_index, device_index))
+
+        device_plans = list(by_host.values())
+        total_steps = sum(len(p.steps) for p in device_plans)
+        logger.info(f"Device-major plan: {len(planned)} jobs, {len(device_plans)} devices, "
+                    f"{total_steps} captures ({total_steps - len(device_plans)} logins saved)")
+
+        return planned, device_plans, errors
+
+    def run(
+        self,
+        job_slugs: List[str],
+        progress_callback: Optional[Callable[[int, int, ExecutionResult], None]] = None,
+        job_callback: Optional[Callable[[str, JobResult], None]] = None,
+        should_cancel: Optional[Callable[[], bool]] = None,
+    ) -> BatchResult:
+        """
+        Run jobs device by device.
+
+        Args:
+            job_slugs: Job slugs, e.g. BatchDefinition.valid_jobs.
+            progress_callback: Optional callback(completed, total, result) per capture.
+            job_callback: Optional callback(job_slug, JobResult) as each job is finalized.
+            should_cancel: Optional callable checked before each device's next
+                command; once it returns True no further commands are started.
+                Jobs that never ran are reported as cancelled; in jobs that
+                did run, the devices left over count as skipped.
+
+        Returns:
+            BatchResult with per-job results.
+        """
+        start_time = datetime.now()
+        planned, device_plans, job_results = self.plan(job_slugs)
+
+        session_pool = SSHSessionPool()
+        try:
+            self._start_jobs(planned, session_pool)
+            self._execute(planned, device_plans, progress_callback, should_cancel)
+        finally:
+            session_pool.close()
+            negotiation_cache = get_negotiation_cache()
+            negotiation_cache.save()
+            logger.info(str(negotiation_cache.stats))
+            get_template_routes().save()
+
+        cancelled = bool(should_cancel and should_cancel())
+        if cancelled:
+            logger.info(f"Device-major batch cancelled: "
+                        f"{sum(1 for pj in planned if pj.devices and not pj.processed)} job(s) not started")
+
+        for pj in planned:
+            result = self._finish_job(pj, cancelled)
+            job_results.append(result)
+            if job_callback:
+                try:
+                    job_callback(pj.job.slug, result)
+                except Exception as cb_error:
+                    logger.warning(f"Job callback error: {cb_error}")
+
+        duration_seconds = (datetime.now() - start_time).total_seconds()
+        successful_jobs = sum(1 for r in job_results if r.success)
+
+        return BatchResult(
+            total_jobs=len(job_results),
+            successful_jobs=successful_jobs,
+            failed_jobs=len(job_results) - successful_jobs,
+            total_devices=sum(r.total_devices for r in job_results),
+            total_success=sum(r.success_count for r in job_results),
+            total_failed=sum(r.failed_count for r in job_results),
+            total_skipped=sum(r.skipped_count for r in job_results),
+            total_captures=sum(len(r.saved_files) for r in job_results),
+            duration_seconds=duration_seconds,
+            job_results=job_results,
+        )
+
+    def _start_jobs(self, planned: List[PlannedJob], session_pool: SSHSessionPool):
+        """Create history records and per-job executors sharing one session pool."""
+        for pj in planned:
+            pj.start_time = datetime.now()
+
+            if self.runner.record_history:
+                try:
+                    pj.history_id = self.runner.jobs_repo.create_job_history(
+                        job_id=pj.job.slug,
+                        job_file=f"database:{pj.job.id}",
+                    )
+                except Exception as hist_err:
+                    logger.warning(f"[{pj.job.slug}] Failed to create job history: {hist_err}")
+
+            exec_config = pj.job_dict.get('execution', {})
+            pj.executor = SSHExecutorPool(
+                credentials=self.credentials,
+                options=ExecutorOptions(
+                    timeout=exec_config.get('timeout', 60),
+                    inter_command_time=exec_config.get('inter_command_time', 1),
+                    prompt_sync=self.runner.config.execution.prompt_sync,
+                    debug=self.debug,
+                    capture_traceback=self.runner.capture_traceback,
+                ),
+                max_workers=1,
+                session_pool=session_pool,
+            )
+
+    def _execute(
+        self,
+        planned: List[PlannedJob],
+        device_plans: List[DevicePlan],
+        progress_callback: Optional[Callable] = None,
+        should_cancel: Optional[Callable[[], bool]] = None,
+    ):
+        """Run every device's steps concurrently, one device per worker."""
+        total = sum(len(p.steps) for p in device_plans)
+        if not total:
+            return
+
+        max_workers = self.max_workers or max(
+            pj.job_dict.get('execution', {}).get('max_workers', 12) for pj in planned
+        )
+        completed = 0
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(self._run_device, planned, plan, should_cancel): plan
+                for plan in device_plans
+            }
+
+            for future in as_completed(futures):
+                plan = futures[future]
+                try:
+                    step_results = future.result()
+                except Exception as e:
+                    logger.error(f"{plan.device_name}: device worker error: {e}", exc_info=self.debug)
+                    step_results = [
+                        (job_index, device_index, ExecutionResult(
+                            host=plan.host,
+                            success=False,
+                            error=f"Executor error: {e}",
+                            error_category=SSHErrorCategory.UNKNOWN,
+                        ))
+                        for job_index, device_index in plan.steps
+                    ]
+
+                for job_index, device_index, result in step_results:
+                    completed += 1
+                    if progress_callback:
+                        try:
+                            progress_callback(completed, total, result)
+                        except Exception as cb_error:
+                            logger.warning(f"Progress callback error: {cb_error}")
+                    self._process_step(planned[job_index], device_index, result)
+
+    def _process_step(self, pj: PlannedJob, device_index: int, result: ExecutionResult):
+        """Clean, validate and save one capture as soon as its device finishes."""
+        device = pj.devices[device_index]
+        pj.processed += 1
+        pj.summary.add_result(result)
+        self.runner._update_device_prompt(device, result)
+        try:
+            self.runner._process_device(pj.job_dict, device_index, device, result,
+                                        pj.main_command, pj.history_id, pj.tally)
+        except Exception as e:
+            self.runner._processing_failed(pj.job_dict, device_index, device, result.host, e, pj.tally)
+        result.output = ""
+
+    def _run_device(self, planned: List[PlannedJob], plan: DevicePlan,
+                    should_cancel: Optional[Callable[[], bool]] = None) -> List[Tuple[int, int, ExecutionResult]]:
+        """Run each job's command for one device over a single pooled session."""
+        step_results = []
+        device_failure: Optional[ExecutionResult] = None
+
+        for job_index, device_index in plan.steps:
+            if should_cancel and should_cancel():
+                logger.debug(f"{plan.device_name}: cancelled, skipping "
+                             f"{len(plan.steps) - len(step_results)} job(s)")
+                break
+
+            pj = planned[job_index]
+
+            if device_failure:
+                # Same credentials, same host - a login failure will not change
+                step_results.append((job_index, device_index, ExecutionResult(
+                    host=plan.host,
+                    success=False,
+                    error=device_failure.error,
+                    error_category=device_failure.error_category,
+                    credential_name=device_failure.credential_name,
+                )))
+                continue
+
+            device = pj.devices[device_index]
+            extra_data = dict(device)
+            if plan.credentials:
+                extra_data['credentials'] = plan.credentials
+                extra_data['credential_name'] = plan.credential_name
+            if pj.paging_disable:
+                extra_data['setup_command'] = pj.paging_disable
+            extra_data['slow_device'] = self.runner._is_slow_device(device)
+
+            result = pj.executor.execute_single(plan.host, pj.main_command or '', extra_data)
+            step_results.append((job_index, device_index, result))
+
+            if not result.success and result.error_category in DEVICE_LEVEL_FAILURES:
+                device_failure = result
+                logger.debug(f"{plan.device_name}: {result.error_category.value}, "
+                             f"skipping remaining {len(plan.steps) - len(step_results)} job(s)")
+
+        return step_results
+
+    def _finish_job(self, pj: PlannedJob, cancelled: bool = False) -> JobResult:
+        """Build one job's result from its processed captures and close its history record."""
+        job_source = f"database:{pj.job.id}"
+
+        try:
+            if cancelled and pj.devices and not pj.processed:
+                result = JobResult(
+                    job_file=job_source,
+                    job_id=pj.job.slug,
+                    total_devices=len(pj.devices),
+                    duration_ms=self.runner._elapsed_ms(pj.start_time),
+                    error="Cancelled before any device ran",
+                    history_id=pj.history_id,
+                )
+            elif not pj.devices:
+                result = JobResult(
+                    job_file=job_source,
+                    job_id=pj.job.slug,
+                    total_devices=0,
+                    duration_ms=self.runner._elapsed_ms(pj.start_time),
+                    error="No devices match filter",
+                    history_id=pj.history_id,
+                )
+            else:
+                result = self.runner._build_job_result(
+                    job=pj.job_dict,
+                    job_source=job_source,
+                    devices=pj.devices,
+                    tally=pj.tally,
+                    start_time=pj.start_time,
+                    history_id=pj.history_id,
+                    execution_summary=pj.summary,
+                )
+
+                not_run = len(pj.devices) - pj.processed
+                if cancelled and not_run > 0:
+                    # Devices the cancel stopped count as skipped, and the job is not a success
+                    result.skipped_count += not_run
+                    result.error = f"Cancelled after {pj.processed}/{len(pj.devices)} devices"
+
+                try:
+                    status = 'success' if result.success else ('partial' if result.success_count > 0 else 'failed')
+                    self.runner.result_writer.job_last_run(pj.job.id, status)
+                except Exception as update_err:
+                    logger.warning(f"[{pj.job.slug}] Failed to update job last_run: {update_err}")
+
+        except Exception as e:
+            logger.error(f"[{pj.job.slug}] Job processing failed: {e}", exc_info=True)
+            result = JobResult(
+                job_file=job_source,
+                job_id=pj.job.slug,
+                duration_ms=self.runner._elapsed_ms(pj.start_time),
+                error=f"Job execution failed: {e}",
+                error_traceback=traceback.format_exc() if self.runner.capture_traceback else None,
+                history_id=pj.history_id,
+            )
+
+        self.runner._complete_history(pj.history_id, result)
+        return result
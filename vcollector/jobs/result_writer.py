@@ -0,0 +1,308 @@
+"""
+Result Writer - batch job bookkeeping writes into periodic transactions.
+
+Path: vcollector/jobs/result_writer.py
+
+Every saved device used to cost a fresh connection to collector.db, one
+INSERT and a commit (an fsync), and job history / last_run / device
+last_collected updates each committed on their own. On large jobs that is
+thousands of tiny transactions, all competing for the database lock with
+the GUI reading the same file.
+
+ResultWriter queues those writes (bounded, so a stalled database slows the
+job down instead of growing memory) and a single writer thread applies
+them in batches: one transaction per database every batch_rows writes or
+flush_interval seconds, whichever comes first. flush() waits until
+everything queued before it is committed - runners call it when a job
+completes, so history and captures are on disk before results are shown.
+
+Write failures are logged and dropped, as before: the capture files are
+already saved and bookkeeping must not fail a job.
+
+Usage:
+    writer = get_result_writer()
+    writer.record_capture(device_id, device_name, "arp", filepath, size, history_id)
+    writer.device_collected(device_id)
+    writer.complete_history(history_id, total, ok, failed, "success")
+    writer.flush()
+    print(writer.depth)
+"""
+
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from vcollector.core.db import connect
+from vcollector.core.shared import ProcessWide
+
+
+logger = logging.getLogger(__name__)
+
+
+COLLECTOR = 'collector'
+DCIM = 'dcim'
+
+_INSERT_CAPTURE = """
+    INSERT INTO captures (
+        device_id, device_name, capture_type, filepath,
+        file_size, captured_at, job_history_id
+    ) VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+_COMPLETE_HISTORY = """
+    UPDATE job_history
+    SET completed_at = ?, total_devices = ?, success_count = ?, failed_count = ?,
+        status = ?, error_message = ?
+    WHERE id = ?
+"""
+_JOB_LAST_RUN = "UPDATE jobs SET last_run_at = ?, last_run_status = ?, updated_at = ? WHERE id = ?"
+_DEVICE_COLLECTED = "UPDATE dcim_device SET last_collected_at = ?, updated_at = ? WHERE id = ?"
+
+
+@dataclass
+class ResultWriterStats:
+    """Counters for the result writer."""
+    written: int = 0   # Rows committed
+    batches: int = 0   # Transactions committed (per database)
+    failed: int = 0    # Rows dropped after a write error
+
+    def __repr__(self) -> str:
+        return f"ResultWriterStats(written={self.written}, batches={self.batches}, failed={self.failed})"
+
+
+class _Flush:
+    """Queue marker: set once everything queued before it is committed."""
+
+    def __init__(self):
+        self.done = threading.Event()
+
+
+_Write = Tuple[str, str, tuple]  # (database, sql, params)
+
+
+class ResultWriter:
+    """
+    Background writer for captures, job history and device bookkeeping.
+
+    Thread-safe: any number of runners (e.g. BatchRunner's job threads)
+    can share one writer.
+    """
+
+    def __init__(
+        self,
+        collector_db: Union[str, Path],
+        dcim_db: Union[str, Path],
+        max_queue: int = 10000,
+        batch_rows: int = 500,
+        flush_interval: float = 1.0,
+    ):
+        """
+        Initialize result writer.
+
+        Args:
+            collector_db: Path to collector.db (captures, job_history, jobs).
+            dcim_db: Path to dcim.db (dcim_device).
+            max_queue: Writes queued before callers block.
+            batch_rows: Writes per transaction.
+            flush_interval: Seconds a queued write may wait for its batch.
+        """
+        self.paths = {COLLECTOR: Path(collector_db), DCIM: Path(dcim_db)}
+        self.batch_rows = batch_rows
+        self.flush_interval = flush_interval
+        self.stats = ResultWriterStats()
+
+        self._queue: 'queue.Queue[Union[_Write, _Flush, None]]' = queue.Queue(maxsize=max_queue)
+        self._connections: Dict[str, sqlite3.Connection] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    @property
+    def depth(self) -> int:
+        """Writes waiting in the queue."""
+        return self._queue.qsize()
+
+    # =========================================================================
+    # Queueing
+    # =========================================================================
+
+    def record_capture(
+        self,
+        device_id: Optional[int],
+        device_name: Optional[str],
+        capture_type: str,
+        filepath: Union[str, Path],
+        file_size: int,
+        job_history_id: Optional[int] = None,
+    ):
+        """Queue a row for the captures table."""
+        self._put(COLLECTOR, _INSERT_CAPTURE, (
+            device_id, device_name, capture_type, str(filepath),
+            file_size, datetime.now().isoformat(), job_history_id,
+        ))
+
+    def complete_history(
+        self,
+        history_id: int,
+        total_devices: int,
+        success_count: int,
+        failed_count: int,
+        status: str = 'success',
+        error_message: Optional[str] = None,
+    ):
+        """Queue marking a job history entry complete."""
+        self._put(COLLECTOR, _COMPLETE_HISTORY, (
+            self._now(), total_devices, success_count, failed_count,
+            status, error_message, history_id,
+        ))
+
+    def job_last_run(self, job_id: int, status: str):
+        """Queue a job's last run timestamp and status."""
+        now = self._now()
+        self._put(COLLECTOR, _JOB_LAST_RUN, (now, status, now, job_id))
+
+    def device_collected(self, device_id: int):
+        """Queue a device's last_collected_at timestamp."""
+        now = self._now()
+        self._put(DCIM, _DEVICE_COLLECTED, (now, now, device_id))
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every write queued so far is committed.
+
+        Writes queued by other threads meanwhile are not waited for.
+
+        Returns:
+            False if timeout expired first.
+        """
+        if self._thread is None:
+            return True
+        marker = _Flush()
+        self._queue.put(marker)
+        return marker.done.wait(timeout)
+
+    def close(self):
+        """Commit queued writes and stop the writer thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+            self._closed = True
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+    @staticmethod
+    def _now() -> str:
+        return datetime.now().isoformat(sep=' ', timespec='seconds')
+
+    def _put(self, database: str, sql: str, params: tuple):
+        if self._thread is None:
+            self._start()
+        self._queue.put((database, sql, params))
+
+    def _start(self):
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("ResultWriter is closed")
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="result-writer", daemon=True)
+                self._thread.start()
+
+    # =========================================================================
+    # Writer thread
+    # =========================================================================
+
+    def _run(self):
+        pending: List[_Write] = []
+        markers: List[_Flush] = []
+        deadline = None
+        stop = False
+
+        while not stop:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = False  # Interval elapsed
+
+            if item is None:
+                stop = True
+            elif isinstance(item, _Flush):
+                markers.append(item)
+            elif item is not False:
+                pending.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+
+            if stop or markers or item is False or len(pending) >= self.batch_rows:
+                self._write(pending)
+                pending, deadline = [], None
+                for marker in markers:
+                    marker.done.set()
+                markers = []
+
+        for connection in self._connections.values():
+            connection.close()
+        self._connections.clear()
+
+    def _write(self, writes: List[_Write]):
+        """Commit writes, one transaction per database."""
+        by_database: Dict[str, Dict[str, List[tuple]]] = {}
+        for database, sql, params in writes:
+            by_database.setdefault(database, {}).setdefault(sql, []).append(params)
+
+        for database, statements in by_database.items():
+            rows = sum(len(p) for p in statements.values())
+            try:
+                conn = self._connection(database)
+                with conn:
+                    for sql, params in statements.items():
+                        conn.executemany(sql, params)
+                self.stats.written += rows
+                self.stats.batches += 1
+            except Exception as e:
+                logger.warning(f"Batch write to {self.paths[database].name} failed ({e}), retrying row by row")
+                self._write_rows(database, statements)
+
+    def _write_rows(self, database: str, statements: Dict[str, List[tuple]]):
+        """Apply writes one by one so a single bad row only loses itself."""
+        for sql, params in statements.items():
+            for row in params:
+                try:
+                    conn = self._connection(database)
+                    with conn:
+                        conn.execute(sql, row)
+                    self.stats.written += 1
+                except Exception as e:
+                    self.stats.failed += 1
+                    logger.warning(f"Failed to write to {self.paths[database].name}: {e}")
+
+    def _connection(self, database: str) -> sqlite3.Connection:
+        conn = self._connections.get(database)
+        if conn is None:
+            conn = connect(self.paths[database])
+            self._connections[database] = conn
+        return conn
+
+
+_default_writers = ProcessWide(ResultWriter, close=ResultWriter.close)
+
+
+def get_result_writer(collector_db: Optional[Path] = None, dcim_db: Optional[Path] = None) -> ResultWriter:
+    """
+    Get the process-wide result writer for a pair of databases.
+
+    Defaults to the configured collector_db and dcim_db. Queued writes are
+    committed at interpreter exit.
+    """
+    if collector_db is None or dcim_db is None:
+        from vcollector.core.config import get_config
+        config = get_config()
+        collector_db = collector_db or config.collector_db
+        dcim_db = dcim_db or config.dcim_db
+
+    return _default_writers.get(Path(collector_db), Path(dcim_db))
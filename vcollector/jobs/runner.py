@@ -16,8 +16,8 @@ Enhanced with comprehensive error trapping and logging.
 
 import json
 import logging
-import re
 import sqlite3
+import threading
 import traceback
 from dataclasses import dataclass, field
 from datetime import datetime
@@ -25,6 +25,7 @@ from pathlib import Path
 from typing import Optional, List, Dict, Any, Callable, Union, Tuple
 
 from vcollector.core.config import get_config
+from vcollector.core.db import connect
 from vcollector.vault.models import SSHCredentials
 from vcollector.vault.resolver import CredentialResolver
 from vcollector.ssh.executor import (
@@ -34,6 +35,12 @@ from vcollector.ssh.executor import (
     SSHErrorCategory,
     BatchExecutionSummary,
 )
+from vcollector.ssh.session_pool import SSHSessionPool
+from vcollector.jobs.result_writer import ResultWriter, get_result_writer
+from vcollector.storage.capture_store import CaptureRun, CaptureStore, write_atomic
+from vcollector.storage.parsed_records import discard_parsed, save_parsed
+from vcollector.validation.postprocess import PostProcessPool, clean_output
+from vcollector.validation.template_routes import TemplateRouteStats, get_template_routes
 
 
 # Module logger
@@ -61,7 +68,7 @@ class JobResult:
     job_id: str
     success_count: int = 0
     failed_count: int = 0
-    skipped_count: int = 0  # Failed validation
+    skipped_count: int = 0  # Failed validation, or not run (batch cancelled)
     total_devices: int = 0
     duration_ms: float = 0
     error: Optional[str] = None
@@ -71,6 +78,7 @@ class JobResult:
     device_errors: List[DeviceError] = field(default_factory=list)  # NEW: Detailed device failures
     history_id: Optional[int] = None  # job_history record ID
     execution_summary: Optional[BatchExecutionSummary] = None  # NEW: Executor summary
+    template_routing: Optional[TemplateRouteStats] = None  # Learned template route hits/misses
 
     @property
     def success(self) -> bool:
@@ -121,6 +129,24 @@ class JobResult:
         return "\n".join(lines) if lines else "No errors"
 
 
+@dataclass
+class _JobTally:
+    """Running per-job totals, filled in one device at a time."""
+    success_count: int = 0
+    failed_count: int = 0
+    skipped_count: int = 0
+    # (device index, item) - devices complete out of order
+    saved_files: List[Tuple[int, tuple]] = field(default_factory=list)
+    validation_failures: List[Tuple[int, tuple]] = field(default_factory=list)
+    device_errors: List[Tuple[int, DeviceError]] = field(default_factory=list)
+    routing: TemplateRouteStats = field(default_factory=TemplateRouteStats)
+
+    @staticmethod
+    def ordered(items: List[Tuple[int, Any]]) -> list:
+        """Items in device order, as the batch path reported them."""
+        return [item for _, item in sorted(items, key=lambda pair: pair[0])]
+
+
 @dataclass
 class DeviceResult:
     """Result for a single device."""
@@ -144,8 +170,10 @@ class JobRunner:
     2. Query matching devices from dcim.db
     3. Execute SSH commands concurrently
     4. Validate output using TextFSM (if enabled)
-    5. Save only validated output (score > 0)
-    6. Record execution in job_history
+    5. Save only validated output (score > 0) - through the capture store,
+       which keeps compressed history and skips unchanged output
+    6. Record captures and job_history (batched by the ResultWriter,
+       committed when the job completes)
 
     Usage:
         runner = JobRunner(
@@ -177,6 +205,7 @@ class JobRunner:
         record_history: bool = True,
         capture_traceback: bool = True,  # NEW: Capture full tracebacks
         credential_resolver: Optional[CredentialResolver] = None,  # For per-device credentials
+        session_pool: Optional[SSHSessionPool] = None,  # Shared SSH sessions (batch runs)
     ):
         """
         Initialize job runner.
@@ -193,6 +222,9 @@ class JobRunner:
             record_history: Record execution in job_history table.
             capture_traceback: Capture full tracebacks for errors.
             credential_resolver: Unlocked resolver for per-device credential lookup.
+            session_pool: Optional SSHSessionPool shared across jobs so each
+                          device is logged into once per batch. Owned (and
+                          closed) by the caller.
         """
         self.credentials = credentials
         self.validate = validate
@@ -205,11 +237,16 @@ class JobRunner:
         self.record_history = record_history
         self.capture_traceback = capture_traceback
         self.credential_resolver = credential_resolver
+        self.session_pool = session_pool
 
         self.config = get_config()
         self._validation_engine = None
+        self._template_routes = None
         self._jobs_repo = None
         self._dcim_repo = None
+        self._result_writer = None
+        self._capture_runs: Dict[Tuple[str, Path], CaptureRun] = {}  # (job_id, collections dir) -> run
+        self._capture_runs_lock = threading.Lock()
         self._credential_cache: Dict[int, Tuple[SSHCredentials, str]] = {}  # Cache: id -> (SSHCredentials, name)
 
         # Configure logging based on debug flag
@@ -268,6 +305,13 @@ class JobRunner:
                 raise
         return self._dcim_repo
 
+    @property
+    def result_writer(self) -> ResultWriter:
+        """Shared writer for captures, history and device bookkeeping."""
+        if self._result_writer is None:
+            self._result_writer = get_result_writer(self.config.collector_db, self.config.dcim_db)
+        return self._result_writer
+
     def _get_device_credentials(self, device: Dict[str, Any]) -> Tuple[Optional[SSHCredentials], Optional[str]]:
         """
         Get credentials for a specific device.
@@ -471,6 +515,7 @@ class JobRunner:
                 'use_tfsm': job.use_textfsm,
                 'tfsm_filter': job.textfsm_template,
                 'min_score': job.validation_min_score,
+                'sample_lines': job.validation_sample_lines,
                 'store_failures': job.store_failures,
             },
             'execution': {
@@ -549,20 +594,13 @@ class JobRunner:
 
             logger.info(f"[{job_id}] Found {len(devices)} devices")
 
-            # Build command string from job
+            # Paging disable is a per-session setup command: the executor sends it
+            # ahead of the command on new sessions only, not on reused ones
             commands_config = job_dict['commands']
-            command_parts = []
-
             paging_disable = commands_config.get('paging_disable')
-            if paging_disable:
-                command_parts.append(paging_disable)
-
             main_command = commands_config.get('command')
-            if main_command:
-                command_parts.append(main_command)
-
-            command_string = ','.join(command_parts)
-            logger.debug(f"[{job_id}] Command string: {command_string}")
+            command_string = main_command or ''
+            logger.debug(f"[{job_id}] Command: {command_string} (setup: {paging_disable})")
 
             # Build execution targets with per-device credentials
             targets = []
@@ -575,6 +613,9 @@ class JobRunner:
                     extra_data['credentials'] = device_creds
                     extra_data['credential_name'] = cred_name
 
+                if paging_disable:
+                    extra_data['setup_command'] = paging_disable
+                extra_data['slow_device'] = self._is_slow_device(d)
                 targets.append((d['primary_ip4'], command_string, extra_data))
 
             # Execute SSH commands
@@ -582,6 +623,7 @@ class JobRunner:
             options = ExecutorOptions(
                 timeout=exec_config.get('timeout', 60),
                 inter_command_time=exec_config.get('inter_command_time', 1),
+                prompt_sync=self.config.execution.prompt_sync,
                 debug=self.debug,
                 capture_traceback=self.capture_traceback,
             )
@@ -590,19 +632,72 @@ class JobRunner:
                 credentials=self.credentials,
                 options=options,
                 max_workers=exec_config.get('max_workers', 12),
+                session_pool=self.session_pool,
             )
 
-            logger.info(f"[{job_id}] Executing SSH commands on {len(targets)} devices...")
-            ssh_results, exec_summary = pool.execute_batch(targets, progress_callback)
+            # Clean, validate and save each device as it completes, then drop
+            # its output - SSH I/O overlaps with processing and memory stays
+            # bounded by one output per worker rather than the whole fleet
+            tally = _JobTally()
+            postprocess = self._start_postprocess(job_id, len(devices))
+
+            # Errors are contained per device: execute_batch lets callback
+            # exceptions through, which would abort the job and lose its tally
+            def store(context, pp):
+                index, device, host, route = context
+                try:
+                    if pp.error:
+                        logger.warning(f"[{job_id}] {device.get('name')}: validation error: {pp.error}")
+                    elif pp.validation is not None:
+                        self._learn_route(device, pp.filter_string, route, pp.validation, tally)
+                    self._store_device(job_dict, index, device, host, pp.cleaned_output,
+                                       pp.validation, pp.filter_string, history_id, tally,
+                                       records=pp.validation.records if pp.validation else None)
+                except Exception as e:
+                    self._processing_failed(job_dict, index, device, host, e, tally)
+
+            def on_result(index: int, ssh_result: ExecutionResult):
+                device = devices[index]
+                try:
+                    self._update_device_prompt(device, ssh_result)
+                    if postprocess is None:
+                        self._process_device(job_dict, index, device, ssh_result, main_command, history_id, tally)
+                    elif self._record_failure(job_dict, index, device, ssh_result, tally):
+                        # Clean + validate in a worker process; save when it comes back
+                        filter_str = self._validation_filter(job_dict, device)
+                        route = self._template_route(job_dict, device, filter_str)
+                        postprocess.submit((index, device, ssh_result.host, route), ssh_result.output,
+                                           main_command, filter_str, route, self._sample_lines(job_dict),
+                                           self.config.save_parsed)
+                except Exception as e:
+                    self._processing_failed(job_dict, index, device, ssh_result.host, e, tally)
+                finally:
+                    ssh_result.output = ""
+
+                if postprocess is not None:
+                    for context, pp in postprocess.drain(block=postprocess.full):
+                        store(context, pp)
 
-            # Process results with validation
-            result = self._process_results(
+            logger.info(f"[{job_id}] Executing SSH commands on {len(targets)} devices...")
+            try:
+                _, exec_summary = pool.execute_batch(targets, progress_callback, result_callback=on_result)
+                if postprocess:
+                    for context, pp in postprocess.drain(wait_all=True):
+                        store(context, pp)
+                    logger.debug(f"[{job_id}] Post-processed {postprocess.processed} captures in "
+                                 f"{postprocess.workers} worker(s), {postprocess.fallbacks} in-process")
+            finally:
+                if postprocess:
+                    postprocess.close()
+                if self._template_routes is not None:
+                    self._template_routes.save()
+
+            result = self._build_job_result(
                 job=job_dict,
                 job_source=job_source,
                 devices=devices,
-                ssh_results=ssh_results,
+                tally=tally,
                 start_time=start_time,
-                main_command=main_command,
                 history_id=history_id,
                 execution_summary=exec_summary,
             )
@@ -611,7 +706,7 @@ class JobRunner:
             if db_job:
                 try:
                     status = 'success' if result.success else ('partial' if result.success_count > 0 else 'failed')
-                    self.jobs_repo.update_job_last_run(db_job.id, status)
+                    self.result_writer.job_last_run(db_job.id, status)
                 except Exception as update_err:
                     logger.warning(f"[{job_id}] Failed to update job last_run: {update_err}")
 
@@ -636,21 +731,25 @@ class JobRunner:
             return result
 
     def _complete_history(self, history_id: Optional[int], result: JobResult):
-        """Complete the job history record."""
-        if not self.record_history or not history_id:
-            return
-
+        """Complete the job history record and commit the job's queued writes."""
+        if self.record_history and history_id:
+            self._queue_history(history_id, result)
+        self._close_capture_runs(result.job_id)
+        self._flush_writes(result.job_id)
+
+    def _queue_history(self, history_id: int, result: JobResult):
+        """Queue the job history completion."""
         try:
             # Calculate total failures (SSH errors + validation skips)
             total_failed = result.failed_count + result.skipped_count
 
             # Determine status based on success/failure mix
-            if result.error:
-                # Job-level error (no devices matched, etc)
-                status = 'failed'
-            elif result.success_count == 0:
-                # No successes at all
+            if result.success_count == 0:
+                # No successes at all (or a job-level error such as no devices matched)
                 status = 'failed'
+            elif result.error:
+                # Stopped part-way (e.g. cancelled) after some devices succeeded
+                status = 'partial'
             elif total_failed == 0:
                 # All devices succeeded
                 status = 'success'
@@ -658,7 +757,7 @@ class JobRunner:
                 # Some succeeded, some failed
                 status = 'partial'
 
-            self.jobs_repo.complete_job_history(
+            self.result_writer.complete_history(
                 history_id=history_id,
                 total_devices=result.total_devices,
                 success_count=result.success_count,
@@ -673,6 +772,14 @@ class JobRunner:
             if self.debug:
                 logger.debug(f"History update traceback:\n{traceback.format_exc()}")
 
+    def _flush_writes(self, job_id: str):
+        """Wait until this job's captures and history are committed."""
+        writer = self._result_writer
+        if writer is None:
+            return
+        writer.flush()
+        logger.debug(f"[{job_id}] Result writes committed ({writer.stats}, queue depth {writer.depth})")
+
     def _load_job_file(self, job_file: Path) -> Dict[str, Any]:
         """Load and validate job definition from JSON file."""
         logger.debug(f"Loading job file: {job_file}")
@@ -687,6 +794,50 @@ class JobRunner:
         logger.debug(f"Job loaded: capture_type={job.get('capture_type')}")
         return job
 
+    def _is_slow_device(self, device: Dict[str, Any]) -> bool:
+        """
+        Check whether a device needs fixed inter-command sleeps.
+
+        Slow devices are flagged in their metadata ('slow_device') or by
+        platform via execution.slow_platforms in config.yaml.
+        """
+        if device.get('slow_device'):
+            return True
+
+        slow_platforms = {p.lower() for p in self.config.execution.slow_platforms}
+        if not slow_platforms:
+            return False
+
+        return any(
+            (device.get(key) or '').lower() in slow_platforms
+            for key in ('platform_name', 'netmiko_device_type')
+        )
+
+    def _update_device_prompt(self, device: Dict[str, Any], ssh_result: ExecutionResult) -> bool:
+        """
+        Store a device's newly detected prompt in dcim.db.
+
+        Only devices that came from dcim.db carry the 'cached_prompt' key.
+        Verified prompts and the '#' fallback from failed detection are left alone.
+
+        Returns:
+            True if a new prompt was stored
+        """
+        if 'cached_prompt' not in device or not ssh_result.success:
+            return False
+        prompt = ssh_result.prompt_detected
+        if not prompt or prompt == '#' or ssh_result.prompt_cache_hit:
+            return False
+        if prompt == device.get('cached_prompt'):
+            return False
+        try:
+            self.dcim_repo.set_device_prompt(device['id'], prompt, ssh_result.prompt_pattern)
+            device['cached_prompt'] = prompt
+            return True
+        except Exception as e:
+            logger.debug(f"Failed to cache prompt for {device.get('name')}: {e}")
+            return False
+
     def _get_devices(self, job: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
         Query devices from dcim.db based on job filter.
@@ -773,6 +924,7 @@ class JobRunner:
 
             result.append({
                 'id': d.id,
+                'dcim_id': d.id,  # Marks a dcim.db device (assets.db rows have no dcim_id)
                 'name': d.name,
                 'normalized_name': d.name,  # Use name directly
                 'primary_ip4': d.primary_ip4,
@@ -789,6 +941,18 @@ class JobRunner:
         if skipped_no_ip:
             logger.debug(f"Skipped {skipped_no_ip} devices without primary IP")
 
+        # Attach learned prompts so the executor can skip prompt discovery
+        try:
+            prompts = self.dcim_repo.get_device_prompts([d['id'] for d in result])
+        except Exception as e:
+            logger.debug(f"Prompt cache unavailable: {e}")
+            prompts = {}
+
+        for d in result:
+            cached = prompts.get(d['id'], {})
+            d['cached_prompt'] = cached.get('prompt')
+            d['cached_prompt_pattern'] = cached.get('pattern')
+
         return result
 
     def _get_devices_from_assets(self, job: Dict[str, Any]) -> List[Dict[str, Any]]:
@@ -803,8 +967,7 @@ class JobRunner:
 
         logger.debug(f"Querying legacy assets.db: {assets_db}")
 
-        conn = sqlite3.connect(assets_db)
-        conn.row_factory = sqlite3.Row
+        conn = connect(assets_db, readonly=True, row_factory=sqlite3.Row)
         cursor = conn.cursor()
 
         try:
@@ -884,58 +1047,8 @@ class JobRunner:
             conn.close()
 
     def _clean_output(self, raw_output: str, command: Optional[str] = None) -> str:
-        """
-        Clean raw CLI output for TextFSM parsing.
-
-        Strips everything up to and including the command echo line,
-        and removes trailing prompts.
-
-        Args:
-            raw_output: Raw output from SSH session
-            command: The command that was run (e.g., "show ip arp")
-
-        Returns:
-            Cleaned output suitable for TextFSM parsing
-        """
-        lines = raw_output.split('\n')
-
-        # Find the line containing the command echo
-        if command:
-            # Get the actual show/display command
-            cmd_parts = [c.strip() for c in command.split(',') if c.strip()]
-            main_cmd = None
-            for part in cmd_parts:
-                if part.lower().startswith(('show ', 'display ', 'get ')):
-                    main_cmd = part
-                    break
-
-            if main_cmd:
-                # Find line containing this command (case-insensitive)
-                cmd_pattern = re.escape(main_cmd)
-                start_idx = 0
-                for i, line in enumerate(lines):
-                    if re.search(cmd_pattern, line, re.IGNORECASE):
-                        start_idx = i + 1  # Start after the command line
-                        break
-
-                # Get lines after command, before trailing prompts
-                cleaned_lines = []
-                prompt_pattern = r'^[\w\-\.]+[\#\>\$\)]\s*$'
-
-                for line in lines[start_idx:]:
-                    # Skip trailing prompts
-                    if re.match(prompt_pattern, line.strip()):
-                        continue
-                    cleaned_lines.append(line)
-
-                # Remove trailing empty lines
-                while cleaned_lines and not cleaned_lines[-1].strip():
-                    cleaned_lines.pop()
-
-                return '\n'.join(cleaned_lines)
-
-        # Fallback: return as-is if we can't find the command
-        return raw_output
+        """Clean raw CLI output for TextFSM parsing (see postprocess.clean_output)."""
+        return clean_output(raw_output, command)
 
     def _record_capture(
             self,
@@ -945,190 +1058,345 @@ class JobRunner:
             capture_type: str,
             job_history_id: Optional[int] = None,
     ) -> None:
-        """Record a capture to the captures table in collector.db."""
+        """Queue a capture for the captures table in collector.db."""
         try:
-            collector_db = self.config.collector_db
-
-            conn = sqlite3.connect(str(collector_db))
-            cursor = conn.cursor()
-
-            cursor.execute("""
-                INSERT INTO captures (
-                    device_id, device_name, capture_type, filepath, 
-                    file_size, captured_at, job_history_id
-                ) VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (
-                device.get('id'),
-                device.get('normalized_name') or device.get('name'),
-                capture_type,
-                str(filepath),
-                file_size,
-                datetime.now().isoformat(),
-                job_history_id,
-            ))
-
-            conn.commit()
-            conn.close()
-
+            self.result_writer.record_capture(
+                device_id=device.get('id'),
+                device_name=device.get('normalized_name') or device.get('name'),
+                capture_type=capture_type,
+                filepath=filepath,
+                file_size=file_size,
+                job_history_id=job_history_id,
+            )
             logger.debug(f"Recorded capture: {filepath}")
 
         except Exception as e:
             logger.warning(f"Failed to record capture to database: {e}")
             # Don't fail the job if DB record fails - file is already saved
 
-    def _process_results(
+    def _process_device(
+        self,
+        job: Dict[str, Any],
+        index: int,
+        device: Dict[str, Any],
+        ssh_result: ExecutionResult,
+        main_command: Optional[str],
+        history_id: Optional[int],
+        tally: '_JobTally',
+    ):
+        """
+        Clean, validate, save and record one device's result into tally.
+
+        Called as each device completes, so only one device's output needs
+        to be held at a time.
+        """
+        if not self._record_failure(job, index, device, ssh_result, tally):
+            return
+
+        output = ssh_result.output
+
+        # Clean output for validation (strip command echo and prompts)
+        cleaned_output = self._clean_output(output, main_command)
+
+        job_id = job.get('job_id', 'unknown')
+        device_name = device.get('normalized_name') or device.get('name')
+        logger.debug(f"[{job_id}] {device_name}: raw={len(output)} chars, cleaned={len(cleaned_output)} chars")
+
+        # Validate output (if enabled and not skipped for this job)
+        validation_result = None
+        records = None
+        filter_str = self._validation_filter(job, device)
+        if filter_str is not None:
+            logger.debug(f"[{job_id}] {device_name}: validation filter='{filter_str}'")
+            route = self._template_route(job, device, filter_str)
+            preferred, accept_score = route or (None, None)
+            try:
+                validation_result = self.validation_engine.validate(
+                    cleaned_output, filter_str,
+                    preferred_template=preferred, accept_score=accept_score,
+                    sample_lines=self._sample_lines(job),
+                )
+                self._learn_route(device, filter_str, route, validation_result, tally)
+                if self.config.save_parsed and validation_result.is_valid:
+                    records = self.validation_engine.full_records(validation_result, cleaned_output, filter_str)
+            except Exception as val_err:
+                logger.warning(f"[{job_id}] {device_name}: validation error: {val_err}")
+                if self.debug:
+                    logger.debug(f"Validation traceback:\n{traceback.format_exc()}")
+                # Continue without validation rather than failing
+
+        self._store_device(job, index, device, ssh_result.host, cleaned_output,
+                           validation_result, filter_str, history_id, tally, records=records)
+
+    def _start_postprocess(self, job_id: str, device_count: int) -> Optional[PostProcessPool]:
+        """
+        Start the worker-process validation stage if configured.
+
+        Enabled by execution.validation_workers in config.yaml; only worth it
+        when validation is on and there is more than one device.
+        """
+        workers = self.config.execution.validation_workers
+        if workers <= 0 or device_count < 2 or not self.validate or not self.validation_engine:
+            return None
+
+        try:
+            return PostProcessPool(
+                db_path=self.validation_engine.db_path,
+                workers=min(workers, device_count),
+                max_pending=self.config.execution.validation_max_pending or None,
+                min_score=self.validation_engine.min_score,
+            )
+        except Exception as e:
+            logger.warning(f"[{job_id}] Post-process pool unavailable, validating in-process: {e}")
+            return None
+
+    def _record_failure(
+        self,
+        job: Dict[str, Any],
+        index: int,
+        device: Dict[str, Any],
+        ssh_result: ExecutionResult,
+        tally: '_JobTally',
+    ) -> bool:
+        """Tally an SSH failure. Returns True if the result has output to process."""
+        if ssh_result.success:
+            return True
+
+        job_id = job.get('job_id', 'unknown')
+        device_name = device.get('normalized_name') or device.get('name')
+
+        tally.failed_count += 1
+        # NEW: Capture detailed error information
+        tally.device_errors.append((index, DeviceError(
+            device_name=device_name,
+            host=ssh_result.host,
+            error=ssh_result.error or "Unknown error",
+            category=ssh_result.error_category,
+            traceback=ssh_result.error_traceback,
+            duration_ms=ssh_result.duration_ms,
+        )))
+        logger.debug(f"[{job_id}] {device_name}: SSH failed - {ssh_result.error_category.value}: {ssh_result.error}")
+        return False
+
+    def _processing_failed(
+        self,
+        job: Dict[str, Any],
+        index: int,
+        device: Dict[str, Any],
+        host: str,
+        error: Exception,
+        tally: '_JobTally',
+    ):
+        """Count a device whose output could not be processed as failed; the job carries on."""
+        job_id = job.get('job_id', 'unknown')
+        device_name = device.get('normalized_name') or device.get('name')
+        logger.error(f"[{job_id}] {device_name}: processing failed: {error}", exc_info=self.debug)
+
+        tally.failed_count += 1
+        tally.device_errors.append((index, DeviceError(
+            device_name=device_name,
+            host=host,
+            error=f"Processing failed: {error}",
+            traceback=traceback.format_exc() if self.capture_traceback else None,
+        )))
+
+    def _validation_filter(self, job: Dict[str, Any], device: Dict[str, Any]) -> Optional[str]:
+        """
+        Template filter for a device's output, or None if validation is off.
+
+        Uses the job's tfsm_filter, else builds one from vendor + capture type.
+        """
+        validation_config = job.get('validation', {})
+        if validation_config.get('skip', False) or not validation_config.get('use_tfsm', True):
+            return None
+        if not self.validate or not self.validation_engine:
+            return None
+
+        # Build filter string from job or device info
+        filter_str = validation_config.get('tfsm_filter')
+        if not filter_str:
+            # Auto-build filter from vendor + capture type
+            vendor = device.get('vendor_name', '').lower().replace(' ', '_')
+            # Simplify common vendor names for template matching
+            vendor_map = {
+                'cisco_systems': 'cisco_ios',
+                'cisco_systems,_inc.': 'cisco_ios',
+                'arista_networks': 'arista_eos',
+                'juniper_networks': 'juniper_junos',
+            }
+            vendor = vendor_map.get(vendor, vendor)
+            filter_str = f"{vendor}_{job.get('capture_type', 'unknown')}"
+
+        return filter_str
+
+    @staticmethod
+    def _sample_lines(job: Dict[str, Any]) -> int:
+        """Lines to validate long outputs on (job validation.sample_lines, 0 = all)."""
+        return int(job.get('validation', {}).get('sample_lines') or 0)
+
+    def _template_route(self, job: Dict[str, Any], device: Dict[str, Any],
+                        filter_str: Optional[str]) -> Optional[Tuple[str, float]]:
+        """
+        Learned (template, accept_score) to try first for a device, or None.
+
+        The template is the last full-sweep winner for the device's platform
+        and filter; it is accepted if it reaches the job's min_score.
+        """
+        if filter_str is None or not self.validation_engine:
+            return None
+
+        if self._template_routes is None:
+            self._template_routes = get_template_routes()
+        # Drops every route if tfsm_templates.db changed since they were learned
+        self._template_routes.bind(self.validation_engine.db_path)
+
+        preferred = self._template_routes.get(self._route_platform(device), filter_str)
+        if not preferred:
+            return None
+        min_score = job.get('validation', {}).get('min_score') or 0
+        return preferred, float(min_score)
+
+    def _learn_route(self, device: Dict[str, Any], filter_str: Optional[str],
+                     route: Optional[Tuple[str, float]], validation_result, tally: '_JobTally'):
+        """Count the route outcome and remember the winner of a full sweep."""
+        if filter_str is None or validation_result is None or self._template_routes is None:
+            return
+
+        if validation_result.routed:
+            tally.routing.hits += 1
+            return
+
+        if route is None:
+            tally.routing.misses += 1
+        else:
+            tally.routing.rejects += 1
+
+        if validation_result.is_valid and validation_result.template:
+            self._template_routes.record(self._route_platform(device), filter_str,
+                                         validation_result.template)
+
+    @staticmethod
+    def _route_platform(device: Dict[str, Any]) -> str:
+        """Platform part of a template route key."""
+        return (device.get('platform_name') or device.get('netmiko_device_type')
+                or device.get('vendor_name') or '')
+
+    def _store_device(
+        self,
+        job: Dict[str, Any],
+        index: int,
+        device: Dict[str, Any],
+        host: str,
+        cleaned_output: str,
+        validation_result,
+        filter_str: Optional[str],
+        history_id: Optional[int],
+        tally: '_JobTally',
+        records: Optional[List[Dict]] = None,
+    ):
+        """
+        Apply the validation outcome, then save and record the capture.
+
+        records are all parsed records of valid output, saved alongside the
+        capture when save_parsed is configured.
+        """
+        job_id = job.get('job_id', 'unknown')
+        capture_type = job.get('capture_type', 'unknown')
+        device_name = device.get('normalized_name') or device.get('name')
+        validation_failed = False
+
+        if validation_result is not None:
+            logger.debug(f"[{job_id}] {device_name}: template='{validation_result.template}', "
+                      f"score={validation_result.score:.2f}, "
+                      f"records={validation_result.record_count}"
+                      f"{' (sampled)' if validation_result.sampled else ''}")
+
+            if not validation_result.is_valid:
+                validation_failed = True
+                tally.validation_failures.append((index, (
+                    device_name,
+                    host,
+                    validation_result.score,
+                    validation_result.error or f"Score below threshold (filter={filter_str})",
+                )))
+
+                if self.force_save:
+                    logger.debug(f"[{job_id}] {device_name}: validation failed but force_save enabled "
+                              f"(score={validation_result.score:.2f})")
+                else:
+                    tally.skipped_count += 1
+                    logger.debug(f"[{job_id}] {device_name}: skipped - validation failed "
+                              f"(score={validation_result.score:.2f})")
+                    return
+
+            if not validation_failed:
+                logger.debug(f"[{job_id}] {device_name}: validated OK "
+                          f"(template={validation_result.template}, "
+                          f"score={validation_result.score:.2f})")
+
+        # Save output (use cleaned output for consistency with validation)
+        if not self.no_save:
+            try:
+                filepath = self._save_output(device, cleaned_output, job)
+                if self.config.save_parsed:
+                    self._save_parsed(filepath, cleaned_output, validation_result, records)
+                self._record_capture(
+                    device=device,
+                    filepath=filepath,
+                    file_size=len(cleaned_output),
+                    capture_type=capture_type,
+                    job_history_id=history_id,
+                )
+                # Get the score (0 if validation was skipped)
+                score = validation_result.score if validation_result else 0.0
+                tally.saved_files.append((index, (
+                    device_name,
+                    str(filepath),
+                    len(cleaned_output),
+                    score,
+                )))
+            except Exception as save_err:
+                logger.error(f"[{job_id}] {device_name}: failed to save output: {save_err}")
+                if self.debug:
+                    logger.debug(f"Save error traceback:\n{traceback.format_exc()}")
+
+        tally.success_count += 1
+        self._record_collected(device)
+
+    def _record_collected(self, device: Dict[str, Any]):
+        """Queue the device's last_collected_at update (dcim.db devices only)."""
+        dcim_id = device.get('dcim_id')
+        if not dcim_id:
+            return
+        try:
+            self.result_writer.device_collected(dcim_id)
+        except Exception as e:
+            logger.debug(f"Failed to record collection for {device.get('name')}: {e}")
+
+    def _build_job_result(
         self,
         job: Dict[str, Any],
         job_source: str,
         devices: List[Dict],
-        ssh_results: List[ExecutionResult],
+        tally: '_JobTally',
         start_time: datetime,
-        main_command: Optional[str] = None,
         history_id: Optional[int] = None,
         execution_summary: Optional[BatchExecutionSummary] = None,
     ) -> JobResult:
-        """Process SSH results, validate, and save."""
+        """Log the job summary and build its JobResult from the device tally."""
         job_id = job.get('job_id', Path(job_source).stem if '/' in job_source else job_source)
-        capture_type = job.get('capture_type', 'unknown')
-        output_dir = job['commands'].get('output_directory', capture_type)
-
-        # Get validation filter from job
-        validation_config = job.get('validation', {})
-        validation_filter = validation_config.get('tfsm_filter')
-        skip_validation = validation_config.get('skip', False)
-        use_tfsm = validation_config.get('use_tfsm', True)
-
-        success_count = 0
-        failed_count = 0
-        skipped_count = 0
-        saved_files = []
-        validation_failures = []
-        device_errors = []  # NEW: Track detailed device errors
-
-        for i, ssh_result in enumerate(ssh_results):
-            device = devices[i]
-            device_name = device.get('normalized_name') or device.get('name')
-
-            if not ssh_result.success:
-                failed_count += 1
-                # NEW: Capture detailed error information
-                device_errors.append(DeviceError(
-                    device_name=device_name,
-                    host=ssh_result.host,
-                    error=ssh_result.error or "Unknown error",
-                    category=ssh_result.error_category,
-                    traceback=ssh_result.error_traceback,
-                    duration_ms=ssh_result.duration_ms,
-                ))
-                logger.debug(f"[{job_id}] {device_name}: SSH failed - {ssh_result.error_category.value}: {ssh_result.error}")
-                continue
-
-            output = ssh_result.output
-
-            # Clean output for validation (strip command echo and prompts)
-            cleaned_output = self._clean_output(output, main_command)
-
-            logger.debug(f"[{job_id}] {device_name}: raw={len(output)} chars, cleaned={len(cleaned_output)} chars")
-
-            # Track validation result for scoring
-            validation_result = None
-            validation_failed = False
-
-            # Validate output (if enabled and not skipped for this job)
-            if self.validate and use_tfsm and not skip_validation and self.validation_engine:
-                # Build filter string from job or device info
-                filter_str = validation_filter
-                if not filter_str:
-                    # Auto-build filter from vendor + capture type
-                    vendor = device.get('vendor_name', '').lower().replace(' ', '_')
-                    # Simplify common vendor names for template matching
-                    vendor_map = {
-                        'cisco_systems': 'cisco_ios',
-                        'cisco_systems,_inc.': 'cisco_ios',
-                        'arista_networks': 'arista_eos',
-                        'juniper_networks': 'juniper_junos',
-                    }
-                    vendor = vendor_map.get(vendor, vendor)
-                    filter_str = f"{vendor}_{capture_type}"
-
-                logger.debug(f"[{job_id}] {device_name}: validation filter='{filter_str}'")
-
-                try:
-                    validation_result = self.validation_engine.validate(cleaned_output, filter_str)
-
-                    logger.debug(f"[{job_id}] {device_name}: template='{validation_result.template}', "
-                              f"score={validation_result.score:.2f}, "
-                              f"records={validation_result.record_count}")
-
-                    if not validation_result.is_valid:
-                        validation_failed = True
-                        validation_failures.append((
-                            device_name,
-                            ssh_result.host,
-                            validation_result.score,
-                            validation_result.error or f"Score below threshold (filter={filter_str})",
-                        ))
-
-                        if self.force_save:
-                            logger.debug(f"[{job_id}] {device_name}: validation failed but force_save enabled "
-                                      f"(score={validation_result.score:.2f})")
-                        else:
-                            skipped_count += 1
-                            logger.debug(f"[{job_id}] {device_name}: skipped - validation failed "
-                                      f"(score={validation_result.score:.2f})")
-                            continue
-
-                    if not validation_failed:
-                        logger.debug(f"[{job_id}] {device_name}: validated OK "
-                                  f"(template={validation_result.template}, "
-                                  f"score={validation_result.score:.2f})")
-
-                except Exception as val_err:
-                    logger.warning(f"[{job_id}] {device_name}: validation error: {val_err}")
-                    if self.debug:
-                        logger.debug(f"Validation traceback:\n{traceback.format_exc()}")
-                    # Continue without validation rather than failing
-
-            # Save output (use cleaned output for consistency with validation)
-            if not self.no_save:
-                try:
-                    filepath = self._save_output(device, cleaned_output, job)
-                    self._record_capture(
-                        device=device,
-                        filepath=filepath,
-                        file_size=len(cleaned_output),
-                        capture_type=job.get('capture_type', 'unknown'),
-                        job_history_id=history_id,
-                    )
-                    # Get the score (0 if validation was skipped or failed)
-                    score = 0.0
-                    if validation_result and not validation_failed:
-                        score = validation_result.score
-                    elif validation_result and validation_failed:
-                        score = validation_result.score  # Still record the score even on failure
-                    saved_files.append((
-                        device_name,
-                        str(filepath),
-                        len(cleaned_output),
-                        score,
-                    ))
-                except Exception as save_err:
-                    logger.error(f"[{job_id}] {device_name}: failed to save output: {save_err}")
-                    if self.debug:
-                        logger.debug(f"Save error traceback:\n{traceback.format_exc()}")
-
-            success_count += 1
-
         duration_ms = self._elapsed_ms(start_time)
 
         # Log summary
-        status = "✓" if failed_count == 0 and skipped_count == 0 else "✗"
+        status = "✓" if tally.failed_count == 0 and tally.skipped_count == 0 else "✗"
         logger.info(f"[{job_id}] {status} Complete: "
-              f"{success_count}/{len(devices)} success, "
-              f"{skipped_count} skipped (validation), "
-              f"{failed_count} failed "
+              f"{tally.success_count}/{len(devices)} success, "
+              f"{tally.skipped_count} skipped (validation), "
+              f"{tally.failed_count} failed "
               f"in {duration_ms:.0f}ms")
 
+        device_errors = tally.ordered(tally.device_errors)
+
         # Log error breakdown if there were failures
         if device_errors:
             error_summary = {}
@@ -1137,19 +1405,26 @@ class JobRunner:
                 error_summary[cat] = error_summary.get(cat, 0) + 1
             logger.info(f"[{job_id}] Error breakdown: {error_summary}")
 
+        if tally.routing.lookups:
+            logger.debug(f"[{job_id}] {tally.routing}")
+        if self._validation_engine is not None:
+            # Process-wide; includes the prefilter rejection rate
+            logger.debug(f"[{job_id}] {self._validation_engine.template_cache.stats}")
+
         return JobResult(
             job_file=job_source,
             job_id=str(job_id),
-            success_count=success_count,
-            failed_count=failed_count,
-            skipped_count=skipped_count,
+            success_count=tally.success_count,
+            failed_count=tally.failed_count,
+            skipped_count=tally.skipped_count,
             total_devices=len(devices),
             duration_ms=duration_ms,
-            saved_files=saved_files,
-            validation_failures=validation_failures,
+            saved_files=tally.ordered(tally.saved_files),
+            validation_failures=tally.ordered(tally.validation_failures),
             device_errors=device_errors,
             history_id=history_id,
             execution_summary=execution_summary,
+            template_routing=tally.routing if tally.routing.lookups else None,
         )
 
     def _save_output(
@@ -1184,12 +1459,50 @@ class JobRunner:
         )
 
         filepath = collections_dir / filename
-        filepath.write_text(output)
-
-        logger.debug(f"Saved: {filepath}")
+        if self.config.capture_history:
+            stored = self._capture_run(job, collections_base).save(filepath, output)
+            logger.debug(f"Saved: {filepath}{'' if stored.changed else ' (unchanged)'}")
+        else:
+            write_atomic(filepath, output.encode('utf-8'))
+            logger.debug(f"Saved: {filepath}")
 
         return filepath
 
+    def _capture_run(self, job: Dict[str, Any], collections_base: Path) -> CaptureRun:
+        """This job's capture store run for a collections directory, started on first save."""
+        key = (str(job.get('job_id', 'unknown')), collections_base)
+        with self._capture_runs_lock:
+            run = self._capture_runs.get(key)
+            if run is None:
+                run = self._capture_runs[key] = CaptureStore(collections_base).begin_run(key[0])
+            return run
+
+    def _close_capture_runs(self, job_id: str):
+        """Write the capture manifests of a finished job."""
+        with self._capture_runs_lock:
+            keys = [key for key in self._capture_runs if key[0] == str(job_id)]
+            runs = [self._capture_runs.pop(key) for key in keys]
+
+        for run in runs:
+            try:
+                run.close()
+                logger.info(f"[{job_id}] Captures: {run.saved} saved, {run.saved - run.changed} unchanged, "
+                            f"{run.bytes_written / 1024:.0f} KB written")
+            except Exception as e:
+                logger.warning(f"[{job_id}] Failed to write capture manifest: {e}")
+
+    def _save_parsed(self, filepath: Path, output: str, validation_result,
+                     records: Optional[List[Dict]]):
+        """Save parsed records next to a capture, or drop stale ones it no longer matches."""
+        try:
+            if records and validation_result.is_valid and validation_result.template_hash:
+                save_parsed(filepath, output, validation_result.template,
+                            validation_result.template_hash, validation_result.score, records)
+            else:
+                discard_parsed(filepath)
+        except Exception as e:
+            logger.warning(f"Failed to save parsed records for {filepath}: {e}")
+
     def _elapsed_ms(self, start_time: datetime) -> float:
         """Calculate elapsed milliseconds."""
         return (datetime.now() - start_time).total_seconds() * 1000
@@ -2,6 +2,8 @@
 
 from vcollector.ssh.client import SSHClient, SSHClientOptions
 from vcollector.ssh.executor import SSHExecutorPool, ExecutorOptions, ExecutionResult
+from vcollector.ssh.session_pool import SSHSessionPool
+from vcollector.ssh.negotiation_cache import NegotiationCache, get_negotiation_cache
 
 __all__ = [
     "SSHClient",
@@ -9,4 +11,7 @@ __all__ = [
     "SSHExecutorPool",
     "ExecutorOptions", 
     "ExecutionResult",
+    "SSHSessionPool",
+    "NegotiationCache",
+    "get_negotiation_cache",
 ]
@@ -6,13 +6,25 @@ Removes: SSH keys, routing/proxy, direct exec mode
 """
 import sys
 import time
+import codecs
 import re
 import logging
 import os
+import selectors
 import paramiko
 from io import StringIO
 from datetime import datetime
 
+from vcollector.ssh.negotiation_cache import PROFILES, PROFILE_RESTRICTED
+
+
+# Single comprehensive regex to remove all ANSI sequences and control chars
+# This catches \u001b[1;24r, \u001b[24;1H, \u001b[2K, \u001b[?25h, etc.
+ANSI_PATTERN = re.compile(r'\x1b\[[0-9;?]*[a-zA-Z]|\x1b[()][AB012]|\x07|[\x00-\x08\x0B\x0C\x0E-\x1F]')
+
+# An escape sequence that has started but not yet terminated (end of a chunk)
+ANSI_PARTIAL_PATTERN = re.compile(r'\x1b(?:\[[0-9;?]*|[()])?\Z')
+
 
 def filter_ansi_sequences(text):
     """
@@ -27,10 +39,108 @@ def filter_ansi_sequences(text):
     if not text:
         return text
 
-    # Single comprehensive regex to remove all ANSI sequences and control chars
-    # This catches \u001b[1;24r, \u001b[24;1H, \u001b[2K, \u001b[?25h, etc.
-    ansi_pattern = r'\x1b\[[0-9;?]*[a-zA-Z]|\x1b[()][AB012]|\x07|[\x00-\x08\x0B\x0C\x0E-\x1F]'
-    return re.sub(ansi_pattern, '', text)
+    return ANSI_PATTERN.sub('', text)
+
+
+class AnsiStreamFilter:
+    """
+    Stateful ANSI filter and UTF-8 decoder for a stream of shell chunks.
+
+    Multibyte characters and escape sequences that straddle a chunk boundary
+    are held back and completed by the next chunk instead of being corrupted.
+    One instance per shell session.
+    """
+
+    # Longest partial escape sequence held back before giving up on it
+    MAX_PARTIAL = 32
+
+    def __init__(self, encoding='utf-8'):
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+        self._pending = ""
+        self.removed_chars = 0
+
+    def feed(self, data):
+        """
+        Decode and filter the next chunk of raw shell output.
+
+        Args:
+            data (bytes): Raw bytes from the channel
+
+        Returns:
+            str: Filtered text that is complete so far
+        """
+        text = self._pending + self._decoder.decode(data)
+        self._pending = ""
+
+        esc = text.rfind('\x1b', max(len(text) - self.MAX_PARTIAL, 0))
+        if esc >= 0 and ANSI_PARTIAL_PATTERN.match(text, esc):
+            self._pending = text[esc:]
+            text = text[:esc]
+
+        return self._filter(text)
+
+    def flush(self):
+        """Return anything still held back (end of stream)."""
+        text = self._pending + self._decoder.decode(b'', final=True)
+        self._pending = ""
+        return self._filter(text)
+
+    def _filter(self, text):
+        filtered = ANSI_PATTERN.sub('', text)
+        self.removed_chars += len(text) - len(filtered)
+        return filtered
+
+
+class PromptMatcher:
+    """
+    Streaming prompt counter for shell output.
+
+    Scans only each new chunk plus a small overlap window carried over from
+    the previous chunk, so counting is linear in the size of the output.
+    The compiled pattern also matches config-mode variants of the prompt,
+    e.g. 'router1#' matches 'router1(config)#' and 'router1(config-if)#'.
+    """
+
+    MAX_MODE_LEN = 64
+
+    def __init__(self, prompt):
+        self.prompt = prompt
+        self.pattern = self.compile_prompt(prompt)
+        self.window = len(prompt) + self.MAX_MODE_LEN + 2
+        self.count = 0
+        self._tail = ""
+
+    @classmethod
+    def compile_prompt(cls, prompt):
+        """Build a regex matching the prompt and its (mode) variants."""
+        match = re.match(r'^(.*?)(?:\([^()]*\))?([#>$%])\s*$', prompt)
+        if not match or not match.group(1):
+            return re.compile(re.escape(prompt))
+
+        base, terminator = match.groups()
+        mode = r'(?:\([^()\r\n]{0,%d}\))?' % cls.MAX_MODE_LEN
+        return re.compile(re.escape(base) + mode + re.escape(terminator))
+
+    def feed(self, chunk):
+        """
+        Count prompts in a new chunk of output.
+
+        Args:
+            chunk (str): Newly received (filtered) text
+
+        Returns:
+            int: Number of new prompt occurrences found
+        """
+        if not chunk:
+            return 0
+
+        text = self._tail + chunk
+        overlap = len(self._tail)
+        found = sum(1 for m in self.pattern.finditer(text) if m.end() > overlap)
+
+        self._tail = text[-self.window:]
+        self.count += found
+        return found
 
 
 class SSHClientOptions:
@@ -40,7 +150,9 @@ class SSHClientOptions:
                  key_file=None, key_password=None, key_content=None,
                  expect_prompt=None, prompt=None, prompt_count=3, timeout=30,
                  shell_timeout=5, inter_command_time=1, log_file=None, debug=False,
-                 expect_prompt_timeout=60, legacy_mode=False, invoke_shell=True):
+                 expect_prompt_timeout=60, legacy_mode=False, invoke_shell=True,
+                 prompt_quiet_time=0.3, prompt_detect_timeout=6, prompt_sync=True,
+                 slow_device=False, negotiation_cache=None):
 
         # Connection parameters
         self.host = host
@@ -75,10 +187,23 @@ class SSHClientOptions:
         self.inter_command_time = inter_command_time
         self.expect_prompt_timeout = expect_prompt_timeout
 
+        # Prompt detection: return once output has been quiet for prompt_quiet_time
+        # seconds and ends on a prompt-like line, never waiting past prompt_detect_timeout
+        self.prompt_quiet_time = prompt_quiet_time
+        self.prompt_detect_timeout = prompt_detect_timeout
+
+        # Prompt-synchronized sending: send each sub-command once the previous
+        # one's prompt is back. Slow devices fall back to inter_command_time sleeps.
+        self.prompt_sync = prompt_sync
+        self.slow_device = slow_device
+
         # Logging
         self.log_file = log_file
         self.debug = debug
 
+        # Per-host record of the algorithm profile / auth method that last worked
+        self.negotiation_cache = negotiation_cache
+
         # Legacy support options
         self.legacy_mode = legacy_mode
         self.legacy_algorithms = True  # Enable by default for compatibility
@@ -91,6 +216,8 @@ class SSHClientOptions:
             self.shell_timeout = max(self.shell_timeout, 3)
             self.inter_command_time = max(self.inter_command_time, 0.5)
             self.expect_prompt_timeout = max(self.expect_prompt_timeout, 10000)
+            self.prompt_quiet_time = max(self.prompt_quiet_time, 1.0)
+            self.slow_device = True
             self.legacy_prompt_detection = True
 
         # Default callbacks
@@ -227,6 +354,12 @@ class SSHClient:
     - Trailing comma handling (empty commands = extra newlines)
     """
 
+    # Common prompt ending characters
+    _PROMPT_ENDINGS = ('#', '>', '$', '%', ':', '~]', ']', '}', ')', '|')
+
+    # Read size for draining the channel (paramiko's window is 2MB)
+    RECV_SIZE = 65536
+
     def __init__(self, options):
         """
         Initialize SSHClient with an SSHClientOptions object
@@ -240,6 +373,12 @@ class SSHClient:
         self._output_buffer = StringIO()
         self._prompt_detected = False
         self._pkey = None  # Will hold loaded paramiko key object
+        self._selector = None  # Lazily registered on the shell channel
+        self._ansi_filter = AnsiStreamFilter()  # Carries partial sequences across reads
+
+        # Receive metrics (raw bytes off the channel, time spent waiting for and reading them)
+        self._rx_bytes = 0
+        self._rx_seconds = 0.0
 
         # Validate required options
         if not options.host:
@@ -371,17 +510,102 @@ class SSHClient:
                          f"Make sure it's a valid RSA, ECDSA, or Ed25519 key. "
                          f"Last error: {str(last_exception)}")
 
-    def _recv_filtered(self, size=4096):
-        """Receive data from shell with ANSI filtering applied immediately"""
+    @property
+    def bytes_per_second(self):
+        """
+        Receive throughput for this session.
+
+        Raw bytes divided by the time spent waiting for and reading data,
+        including the device's response time; waits that timed out with
+        no data are not counted.
+        """
+        if self._rx_seconds <= 0:
+            return 0.0
+        return self._rx_bytes / self._rx_seconds
+
+    def receive_stats(self):
+        """Return per-session receive metrics as a dict"""
+        return {
+            'bytes': self._rx_bytes,
+            'seconds': self._rx_seconds,
+            'bytes_per_second': self.bytes_per_second,
+        }
+
+    def _wait_readable(self, timeout):
+        """
+        Block until the shell channel has data or timeout seconds elapse.
+
+        Uses the channel's fileno via selectors instead of polling
+        recv_ready(). Falls back to a short sleep if the channel cannot be
+        registered with a selector.
+
+        Returns:
+            bool: True if data is ready to read
+        """
+        if self._shell.recv_ready():
+            return True
+        if timeout <= 0:
+            return False
+
+        try:
+            if self._selector is None:
+                # Cache the selector only once registration has worked
+                selector = selectors.DefaultSelector()
+                try:
+                    selector.register(self._shell, selectors.EVENT_READ)
+                except BaseException:
+                    selector.close()
+                    raise
+                self._selector = selector
+            self._selector.select(timeout)
+        except (OSError, ValueError, TypeError, AttributeError, NotImplementedError):
+            time.sleep(min(timeout, 0.01))
+
+        return self._shell.recv_ready()
+
+    def _receive(self, timeout):
+        """
+        Wait up to timeout seconds for data, then drain everything available.
+
+        Returns:
+            str: Filtered data received ("" on timeout)
+        """
+        # Session throughput: time from the start of the wait, so the device's
+        # response time counts. Waits that end with no data (quiet periods,
+        # settle checks) are idle time and are left out.
+        start_time = time.time()
+        if not self._wait_readable(timeout):
+            return ""
+        try:
+            return self._recv_filtered()
+        finally:
+            self._rx_seconds += time.time() - start_time
+
+    def _channel_closed(self):
+        """Check whether the shell channel closed with nothing left to read"""
+        return bool(getattr(self._shell, 'closed', False)) and not self._shell.recv_ready()
+
+    def _recv_filtered(self, size=RECV_SIZE):
+        """Drain all data currently available on the shell with ANSI filtering applied immediately"""
         if not self._shell or not self._shell.recv_ready():
             return ""
 
         try:
-            raw_data = self._shell.recv(size).decode('utf-8', errors='replace')
-            filtered_data = filter_ansi_sequences(raw_data)
+            chunks = []
+            while self._shell.recv_ready():
+                chunk = self._shell.recv(size)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+
+            raw_bytes = b''.join(chunks)
+            self._rx_bytes += len(raw_bytes)
 
-            if self._options.debug and len(raw_data) != len(filtered_data):
-                chars_filtered = len(raw_data) - len(filtered_data)
+            removed_before = self._ansi_filter.removed_chars
+            filtered_data = self._ansi_filter.feed(raw_bytes)
+
+            if self._options.debug and self._ansi_filter.removed_chars != removed_before:
+                chars_filtered = self._ansi_filter.removed_chars - removed_before
                 self._log_with_timestamp(f"Filtered {chars_filtered} ANSI characters")
 
             return filtered_data
@@ -400,7 +624,14 @@ class SSHClient:
         self._log_message(timestamped_message)
 
     def find_prompt(self, attempt_count=5, timeout=5):
-        """Auto-detect command prompt with ANSI filtering"""
+        """
+        Auto-detect command prompt with ANSI filtering
+
+        Sends a newline and returns as soon as the output settles on a
+        prompt-like line (no new data for prompt_quiet_time seconds), instead
+        of sleeping for a fixed interval. Each attempt is capped by
+        prompt_detect_timeout (first attempt) or timeout (retries).
+        """
         if not self._shell:
             raise RuntimeError("Shell not initialized")
 
@@ -408,7 +639,6 @@ class SSHClient:
 
         # Clear buffer
         self._output_buffer = StringIO()
-        buffer = ""
 
         # Clear pending data
         while self._shell.recv_ready():
@@ -417,20 +647,8 @@ class SSHClient:
         # Send newline to trigger prompt
         self._log_with_timestamp("Sending single newline to trigger prompt")
         self._shell.send("\n")
-        time.sleep(3)
 
-        # Collect filtered output
-        buffer = ""
-        start_time = time.time()
-
-        while time.time() - start_time < 3:
-            if self._shell.recv_ready():
-                filtered_data = self._recv_filtered()
-                if filtered_data:
-                    buffer += filtered_data
-                    self._output_buffer.write(filtered_data)
-            else:
-                time.sleep(0.1)
+        buffer = self._read_until_quiet(self._options.prompt_quiet_time, self._options.prompt_detect_timeout)
 
         # Extract prompt from filtered buffer
         prompt = self._extract_clean_prompt(buffer)
@@ -442,24 +660,8 @@ class SSHClient:
         for i in range(attempt_count):
             self._log_with_timestamp(f"Prompt detection attempt {i + 1}/{attempt_count}")
 
-            buffer = ""
             self._shell.send("\n")
-
-            start_time = time.time()
-            while time.time() - start_time < timeout:
-                if self._shell.recv_ready():
-                    filtered_data = self._recv_filtered()
-                    if filtered_data:
-                        buffer += filtered_data
-                        self._output_buffer.write(filtered_data)
-                        self._options.output_callback(filtered_data)
-                else:
-                    if buffer:
-                        prompt = self._extract_clean_prompt(buffer)
-                        if prompt:
-                            self._log_with_timestamp(f"Detected prompt: '{prompt}'", True)
-                            return prompt
-                    time.sleep(0.1)
+            buffer = self._read_until_quiet(self._options.prompt_quiet_time, timeout, echo=True)
 
             if buffer:
                 prompt = self._extract_clean_prompt(buffer)
@@ -471,6 +673,125 @@ class SSHClient:
         self._log_with_timestamp("Could not detect prompt, using default '#'")
         return '#'
 
+    def verify_prompt(self, prompt, pattern=None, settle_time=0.05):
+        """
+        Check a previously learned prompt with a single newline.
+
+        Cheaper than find_prompt: returns as soon as the output ends on a line
+        matching the cached prompt (and stays quiet for settle_time), rather
+        than waiting out prompt_quiet_time and guessing the prompt.
+
+        Args:
+            prompt: Cached prompt string
+            pattern: Cached prompt regex (defaults to PromptMatcher.compile_prompt)
+            settle_time: Seconds of silence required after the prompt is seen
+
+        Returns:
+            bool: True if the device answered with the cached prompt
+        """
+        if not self._shell:
+            raise RuntimeError("Shell not initialized")
+
+        try:
+            regex = re.compile(pattern) if pattern else PromptMatcher.compile_prompt(prompt)
+        except re.error:
+            regex = PromptMatcher.compile_prompt(prompt)
+
+        self._output_buffer = StringIO()
+        while self._shell.recv_ready():
+            self._recv_filtered()
+
+        self._shell.send("\n")
+
+        buffer = ""
+        deadline = time.time() + self._options.prompt_detect_timeout
+        matched = False
+        other_prompt = False  # Settled on a prompt-like line that isn't ours
+
+        while True:
+            remaining = deadline - time.time()
+            if remaining <= 0 or self._channel_closed():
+                break
+
+            if matched:
+                wait = min(remaining, settle_time)
+            elif other_prompt:
+                wait = min(remaining, self._options.prompt_quiet_time)
+            else:
+                wait = remaining
+
+            filtered_data = self._receive(wait)
+            if filtered_data:
+                buffer += filtered_data
+                lines = [line.strip() for line in buffer.split('\n') if line.strip()]
+                matched = bool(lines) and regex.fullmatch(lines[-1]) is not None
+                other_prompt = not matched and self._ends_with_prompt_line(buffer)
+            elif matched or other_prompt:
+                break
+
+        self._log_with_timestamp(
+            "Cached prompt '{}' {}".format(prompt, "verified" if matched else "did not match"), True)
+        return matched
+
+    def _read_until_quiet(self, quiet_time, max_wait, echo=False):
+        """
+        Read filtered shell output until it settles on a prompt-like line.
+
+        Returns once no data has arrived for quiet_time seconds and the last
+        non-empty line looks like a prompt, or when max_wait seconds elapse.
+
+        Args:
+            quiet_time: Seconds of silence required before returning.
+            max_wait: Hard cap on total wait in seconds.
+            echo: Pass received data to output_callback.
+
+        Returns:
+            str: Filtered output collected during the wait.
+        """
+        buffer = ""
+        start_time = time.time()
+        deadline = start_time + max_wait
+        last_data_time = start_time
+
+        while True:
+            now = time.time()
+            if now >= deadline:
+                self._log_with_timestamp(f"Prompt wait hit hard cap ({max_wait}s)")
+                break
+
+            quiet_left = quiet_time - (now - last_data_time)
+            if buffer and quiet_left <= 0 and self._ends_with_prompt_line(buffer):
+                self._log_with_timestamp(
+                    "Output settled after {:.0f}ms".format((now - start_time) * 1000))
+                break
+
+            if self._channel_closed():
+                self._log_with_timestamp("Channel closed while waiting for prompt")
+                break
+
+            # Only a quiet period can end the wait early; otherwise block for new data
+            wait = deadline - now
+            if buffer and quiet_left > 0:
+                wait = min(wait, quiet_left)
+
+            filtered_data = self._receive(wait)
+            if filtered_data:
+                buffer += filtered_data
+                self._output_buffer.write(filtered_data)
+                if echo:
+                    self._options.output_callback(filtered_data)
+                last_data_time = time.time()
+
+        return buffer
+
+    def _ends_with_prompt_line(self, buffer):
+        """Check whether the last non-empty line of buffer looks like a prompt."""
+        for line in reversed(buffer.split('\n')):
+            line = line.strip()
+            if line:
+                return any(line.endswith(char) for char in self._PROMPT_ENDINGS)
+        return False
+
     def _extract_clean_prompt(self, buffer):
         """
         Extract a clean prompt from buffer, handling cases where the prompt is repeated.
@@ -602,8 +923,8 @@ class SSHClient:
         commands = command.split(',')
         result = self._execute_shell_commands(commands)
 
-        # Wait between commands if specified
-        if self._options.inter_command_time > 0:
+        # Wait between commands if specified (not needed once the prompt paces sending)
+        if self._options.inter_command_time > 0 and not self._prompt_synchronized():
             self._log_with_timestamp(
                 "SSHClient Message: Waiting between commands: {}s".format(self._options.inter_command_time))
             time.sleep(self._options.inter_command_time)
@@ -694,6 +1015,11 @@ class SSHClient:
             has_commands = True
 
             if has_commands:
+                matcher = PromptMatcher(self._options.expect_prompt) if self._options.expect_prompt else None
+                timeout_ms = self._options.expect_prompt_timeout
+                timeout_time = time.time() + timeout_ms / 1000
+                prompt_sync = self._prompt_synchronized()
+
                 # Process each command
                 for i, cmd in enumerate(commands):
                     # if not cmd.strip() or cmd.strip() == "\\n":
@@ -708,53 +1034,35 @@ class SSHClient:
                         self._log_with_timestamp("Sending command {}/{}: '{}'".format(i + 1, len(commands), cmd))
                         self._shell.send(cmd + '\n')
 
-                    # Wait between commands
-                    if self._options.inter_command_time > 0 and i < len(commands) - 1:
+                    if i == len(commands) - 1:
+                        continue
+
+                    if prompt_sync:
+                        # Send the next command as soon as this one's prompt is back. If it
+                        # doesn't show within shell_timeout, fall back to timed sending.
+                        sync_deadline = min(timeout_time, time.time() + self._options.shell_timeout)
+                        if self._read_until_prompts(matcher, i + 1, sync_deadline):
+                            continue
+                        self._log_with_timestamp(
+                            "Prompt not seen after sub-command {}/{}, falling back to inter_command_time".format(
+                                i + 1, len(commands)), True)
+                        prompt_sync = False
+
+                    if self._options.inter_command_time > 0:
+                        # Wait between commands (slow devices / no prompt to sync on)
                         self._log_with_timestamp(
                             "Waiting between sub-commands: {}s".format(self._options.inter_command_time))
                         time.sleep(self._options.inter_command_time)
 
                 # PROMPT COUNTING WITH ANSI FILTERING
-                if self._options.expect_prompt:
+                if matcher:
                     expected_prompts = self._options.prompt_count
-                    found_prompts = 0
-                    accumulated_buffer = ""
 
                     self._log_with_timestamp("Monitoring for EXACTLY {} occurrences of: '{}'".format(
-                        expected_prompts, self._options.expect_prompt))
-
-                    timeout_ms = self._options.expect_prompt_timeout
-                    timeout_time = time.time() + timeout_ms / 1000
-
-                    while found_prompts < expected_prompts and time.time() < timeout_time:
-                        if self._shell.recv_ready():
-                            try:
-                                # Use the filtered receive method
-                                filtered_data = self._recv_filtered()
-                                if filtered_data:
-                                    accumulated_buffer += filtered_data
-                                    self._output_buffer.write(filtered_data)
-                                    self._options.output_callback(filtered_data)
-
-                                    # Count prompts in filtered buffer
-                                    current_count = accumulated_buffer.count(self._options.expect_prompt)
-
-                                    if current_count > found_prompts:
-                                        found_prompts = current_count
-                                        self._log_with_timestamp(
-                                            "PROMPT DETECTED: {}/{}".format(found_prompts, expected_prompts))
-
-                                        if found_prompts >= expected_prompts:
-                                            self._log_with_timestamp(
-                                                "TARGET REACHED: {} prompts detected. STOPPING NOW.".format(
-                                                    found_prompts))
-                                            break
-
-                            except Exception as e:
-                                self._log_with_timestamp("Error reading output: {}".format(str(e)))
-                                continue
-                        else:
-                            time.sleep(0.01)
+                        expected_prompts, matcher.pattern.pattern))
+
+                    self._read_until_prompts(matcher, expected_prompts, timeout_time)
+                    found_prompts = matcher.count
 
                     # Final status
                     if found_prompts >= expected_prompts:
@@ -788,11 +1096,82 @@ class SSHClient:
             self._log_message(error_message)
             self._options.error_callback(error_message)
 
+        # Reading is done: release whatever the filter still holds back
+        remainder = self._ansi_filter.flush()
+        if remainder:
+            self._output_buffer.write(remainder)
+            self._options.output_callback(remainder)
+
         total_time = time.time() - start_time
         self._log_with_timestamp("Total shell command execution time: {:.2f}ms".format(total_time * 1000))
 
         return self._output_buffer.getvalue()
 
+    def _prompt_synchronized(self):
+        """
+        Whether sub-commands are paced by the prompt rather than inter_command_time.
+
+        Needs an expect prompt to sync on; slow devices (and legacy mode) keep
+        the fixed sleep between sub-commands.
+        """
+        return bool(self._options.prompt_sync and self._options.expect_prompt
+                    and not self._options.slow_device)
+
+    def _read_until_prompts(self, matcher, target, deadline):
+        """
+        Read into the output buffer until matcher has counted target prompts.
+
+        Returns:
+            True if target was reached before the deadline or channel close
+        """
+        while matcher.count < target:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return False
+
+            if self._channel_closed():
+                self._log_with_timestamp("Channel closed before all prompts were seen", True)
+                return False
+
+            try:
+                # Block on the channel, then drain everything available
+                filtered_data = self._receive(remaining)
+                if filtered_data:
+                    self._output_buffer.write(filtered_data)
+                    self._options.output_callback(filtered_data)
+
+                    # Count prompts in the new chunk only
+                    if matcher.feed(filtered_data):
+                        self._log_with_timestamp(
+                            "PROMPT DETECTED: {}/{}".format(matcher.count, target))
+
+            except Exception as e:
+                self._log_with_timestamp("Error reading output: {}".format(str(e)))
+                continue
+
+        self._log_with_timestamp("TARGET REACHED: {} prompts detected. STOPPING NOW.".format(matcher.count))
+        return True
+
+    def is_alive(self):
+        """Check that the transport is active and the shell channel is still open"""
+        try:
+            transport = self._ssh_client.get_transport() if self._ssh_client else None
+            if not transport or not transport.is_active():
+                return False
+            if not self._shell or self._shell.closed or self._shell.exit_status_ready():
+                return False
+            return True
+        except Exception:
+            return False
+
+    def discard_pending(self):
+        """Read and drop any output still waiting on the shell (e.g. before reuse)"""
+        if not self._shell:
+            return
+        while self._shell.recv_ready():
+            self._recv_filtered()
+        self._output_buffer = StringIO()
+
     def set_expect_prompt(self, prompt_string):
         """Set the expected prompt string"""
         if prompt_string:
@@ -812,7 +1191,7 @@ class SSHClient:
             if self._options.legacy_mode:
                 LegacySSHClientEnhancements.configure_legacy_algorithms(self._ssh_client)
 
-            # Build connection parameters
+            # Build connection parameters (algorithm profile is applied per attempt)
             connect_params = {
                 'hostname': self._options.host,
                 'port': self._options.port,
@@ -820,8 +1199,6 @@ class SSHClient:
                 'timeout': self._options.timeout,
                 'allow_agent': False,
                 'look_for_keys': False,
-                'disabled_algorithms': {'pubkeys': ['rsa-sha2-512', 'rsa-sha2-256']}
-
             }
 
             # Add authentication method
@@ -848,12 +1225,7 @@ class SSHClient:
                 raise ValueError("No authentication method available")
 
             # Make connection
-            try:
-                self._ssh_client.connect(**connect_params)
-            except Exception as e:
-                self._log_with_timestamp("Retrying with SHA2 RSA algorithms enabled...")
-                connect_params.pop('disabled_algorithms', None)  # Remove the restriction
-                self._ssh_client.connect(**connect_params)
+            self._connect_with_profiles(connect_params)
 
             self._log_with_timestamp(
                 f"Connected to {self._options.host}:{self._options.port}", True)
@@ -875,11 +1247,67 @@ class SSHClient:
             self._log_with_timestamp(f"Connection error: {str(e)}", True)
             raise
 
+    def _connect_with_profiles(self, connect_params):
+        """
+        Connect, trying algorithm profiles until one works.
+
+        Without a negotiation cache this is the original behaviour: rsa-sha2
+        disabled first, then paramiko defaults. With a cache, the profile (and
+        password-only auth, when a key is also configured) that last worked
+        for this host is tried first, and the outcome is recorded.
+        """
+        host, port = self._options.host, self._options.port
+        cache = self._options.negotiation_cache
+        record = cache.get(host, port) if cache else None
+        profiles = cache.profile_order(host, port) if cache else PROFILES
+
+        # Key + password configured and the password is what got us in last time
+        skip_key = bool(record and record.get('auth') == 'password'
+                        and 'pkey' in connect_params and connect_params.get('password'))
+
+        last_error = None
+        for attempt, profile in enumerate(profiles, 1):
+            params = dict(connect_params)
+            if profile == PROFILE_RESTRICTED:
+                params['disabled_algorithms'] = {'pubkeys': ['rsa-sha2-512', 'rsa-sha2-256']}
+            elif attempt > 1:
+                self._log_with_timestamp("Retrying with SHA2 RSA algorithms enabled...")
+
+            try:
+                if skip_key:
+                    try:
+                        self._ssh_client.connect(**{k: v for k, v in params.items() if k != 'pkey'})
+                        break
+                    except paramiko.AuthenticationException:
+                        self._log_with_timestamp("Cached password auth failed, retrying with key")
+                        cache.record_auth_fallback(host, port)
+                        skip_key = False
+
+                self._ssh_client.connect(**params)
+                break
+            except Exception as e:
+                last_error = e
+                self._log_with_timestamp(f"Connect with '{profile}' algorithm profile failed: {e}")
+        else:
+            if cache and record:
+                cache.forget(host, port)
+            raise last_error
+
+        if cache:
+            transport = self._ssh_client.get_transport()
+            auth_handler = getattr(transport, 'auth_handler', None)
+            cache.record_success(host, port, profile, getattr(auth_handler, 'auth_method', None),
+                                 attempts=attempt, cached=record is not None)
+
     def disconnect(self):
         """Disconnect from device"""
         self._log_with_timestamp("Disconnecting from device")
 
         try:
+            if self._selector:
+                self._selector.close()
+                self._selector = None
+
             if self._shell:
                 self._shell.close()
                 self._shell = None
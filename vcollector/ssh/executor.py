@@ -20,7 +20,9 @@ from typing import Optional, List, Callable, Tuple, Any, Dict
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from vcollector.vault.models import SSHCredentials
-from vcollector.ssh.client import SSHClient, SSHClientOptions
+from vcollector.ssh.client import PromptMatcher, SSHClient, SSHClientOptions
+from vcollector.ssh.negotiation_cache import get_negotiation_cache
+from vcollector.ssh.session_pool import SSHSessionPool
 
 
 # Module logger - configure at application level
@@ -106,6 +108,10 @@ class ExecutorOptions:
     inter_command_time: float = 1.0
     expect_prompt_timeout: int = 30000
     prompt_count: int = 3
+    prompt_quiet_time: float = 0.3  # Seconds of silence before accepting a prompt
+    prompt_detect_timeout: float = 6.0  # Hard cap on initial prompt detection
+    prompt_sync: bool = True  # Send sub-commands on prompt; inter_command_time only for slow devices
+    cache_negotiation: bool = True  # Start from the algorithm profile / auth that last worked per host
     debug: bool = False
     legacy_mode: bool = False
     # New options for enhanced error handling
@@ -130,6 +136,9 @@ class ExecutionResult:
     retry_count: int = 0
     disconnect_error: Optional[str] = None  # Capture disconnect errors separately
     credential_name: Optional[str] = None  # Which credential was used (for per-device creds)
+    bytes_per_second: float = 0  # Session receive throughput (see SSHClient.bytes_per_second)
+    prompt_pattern: Optional[str] = None  # Regex for prompt_detected (for the prompt cache)
+    prompt_cache_hit: Optional[bool] = None  # None = no cached prompt offered
 
     def __repr__(self) -> str:
         if self.success:
@@ -195,6 +204,7 @@ class SSHExecutorPool:
         credentials: SSHCredentials,
         options: Optional[ExecutorOptions] = None,
         max_workers: int = 12,
+        session_pool: Optional[SSHSessionPool] = None,
     ):
         """
         Initialize executor pool.
@@ -203,10 +213,14 @@ class SSHExecutorPool:
             credentials: SSH credentials from vault.
             options: Execution options (timeouts, etc.).
             max_workers: Maximum concurrent connections.
+            session_pool: Optional SSHSessionPool to lease sessions from and
+                          return them to, instead of connecting per device.
         """
         self.credentials = credentials
         self.options = options or ExecutorOptions()
         self.max_workers = max_workers
+        self.session_pool = session_pool
+        self.negotiation_cache = get_negotiation_cache() if self.options.cache_negotiation else None
 
         # Configure module logger based on options
         if self.options.debug:
@@ -218,6 +232,7 @@ class SSHExecutorPool:
         self,
         targets: List[Tuple[str, str, Any]],
         progress_callback: Optional[Callable[[int, int, ExecutionResult], None]] = None,
+        result_callback: Optional[Callable[[int, ExecutionResult], None]] = None,
     ) -> Tuple[List[ExecutionResult], BatchExecutionSummary]:
         """
         Execute commands against multiple devices concurrently.
@@ -228,6 +243,11 @@ class SSHExecutorPool:
                 - command: Comma-separated commands to execute
                 - extra_data: Optional dict with device metadata
             progress_callback: Optional callback(completed, total, result).
+            result_callback: Optional callback(target_index, result), called in
+                the calling thread as each device completes (after
+                progress_callback), while other devices are still running.
+                Exceptions propagate. The callback may clear result.output
+                once it has consumed it.
 
         Returns:
             Tuple of (List of ExecutionResult in same order as targets, BatchExecutionSummary).
@@ -297,11 +317,18 @@ class SSHExecutorPool:
                     except Exception as cb_error:
                         logger.warning(f"Progress callback error: {cb_error}")
 
+                if result_callback:
+                    result_callback(idx, result)
+
         # Finalize summary
         summary.duration_ms = (time.time() - batch_start) * 1000
 
         logger.info(str(summary))
 
+        if self.negotiation_cache:
+            self.negotiation_cache.save()
+            logger.debug(str(self.negotiation_cache.stats))
+
         # Log error breakdown if there were failures
         if summary.errors_by_category:
             logger.info("Error breakdown:")
@@ -370,15 +397,23 @@ class SSHExecutorPool:
             host: Device IP/hostname.
             command: Comma-separated commands.
             extra_data: Optional device metadata. May include 'credentials' key
-                       for per-device credential override.
+                       for per-device credential override, and 'setup_command'
+                       (e.g. paging disable) to send once per session ahead of
+                       command. 'slow_device' keeps inter_command_time sleeps
+                       instead of prompt-synchronized sending. 'cached_prompt'
+                       (and 'cached_prompt_pattern') is verified with one
+                       newline instead of running full prompt detection.
 
         Returns:
             ExecutionResult with output or error.
         """
         start_time = time.time()
         client = None
+        session = None  # Pooled session, if a session pool is in use
+        succeeded = False
         disconnect_error = None
         credential_name = None  # Track which credential was used
+        prompt_cache_hit = None
 
         logger.debug(f"{host}: Starting SSH connection")
 
@@ -402,23 +437,56 @@ class SSHExecutorPool:
                 inter_command_time=self.options.inter_command_time,
                 expect_prompt_timeout=self.options.expect_prompt_timeout,
                 prompt_count=self.options.prompt_count,
+                prompt_quiet_time=self.options.prompt_quiet_time,
+                prompt_detect_timeout=self.options.prompt_detect_timeout,
+                prompt_sync=self.options.prompt_sync,
+                negotiation_cache=self.negotiation_cache,
+                slow_device=bool(extra_data and extra_data.get('slow_device')),
                 debug=self.options.debug,
                 legacy_mode=self.options.legacy_mode,
             )
 
-            # Create client and connect
-            logger.debug(f"{host}: Creating SSH client")
-            client = SSHClient(ssh_options)
+            # Lease an already-authenticated session if the pool has one
+            if self.session_pool:
+                session = self.session_pool.acquire(host, creds)
+
+            if session:
+                client = session.client
+                client._options = ssh_options
+                detected_prompt = session.prompt
+                client.set_expect_prompt(detected_prompt)
+                logger.debug(f"{host}: Using pooled session, prompt {detected_prompt!r}")
+            else:
+                # Create client and connect
+                logger.debug(f"{host}: Creating SSH client")
+                client = SSHClient(ssh_options)
+
+                logger.debug(f"{host}: Connecting...")
+                client.connect()
+                logger.debug(f"{host}: Connected successfully")
+
+                # Verify the learned prompt if we have one, else auto-detect
+                cached_prompt = extra_data.get('cached_prompt') if extra_data else None
+                if cached_prompt:
+                    prompt_cache_hit = client.verify_prompt(
+                        cached_prompt, extra_data.get('cached_prompt_pattern'))
+
+                if prompt_cache_hit:
+                    detected_prompt = cached_prompt
+                    logger.debug(f"{host}: Cached prompt verified: {detected_prompt!r}")
+                else:
+                    logger.debug(f"{host}: Detecting prompt...")
+                    detected_prompt = client.find_prompt()
+                    logger.debug(f"{host}: Prompt detected: {detected_prompt!r}")
+                client.set_expect_prompt(detected_prompt)
 
-            logger.debug(f"{host}: Connecting...")
-            client.connect()
-            logger.debug(f"{host}: Connected successfully")
+                if self.session_pool:
+                    session = self.session_pool.register(host, creds, client, detected_prompt)
 
-            # Auto-detect prompt
-            logger.debug(f"{host}: Detecting prompt...")
-            detected_prompt = client.find_prompt()
-            client.set_expect_prompt(detected_prompt)
-            logger.debug(f"{host}: Prompt detected: {detected_prompt!r}")
+            # Session setup (paging disable) only needs sending once per session
+            setup_command = extra_data.get('setup_command') if extra_data else None
+            if setup_command and not (session and setup_command in session.setup_done):
+                command = f"{setup_command},{command}"
 
             # Calculate prompt count based on commands
             commands = command.split(',')
@@ -430,7 +498,12 @@ class SSHExecutorPool:
             output = client.execute_command(command)
 
             duration_ms = (time.time() - start_time) * 1000
-            logger.debug(f"{host}: Execution complete ({duration_ms:.0f}ms, {len(output)} bytes)")
+            rx_rate = client.bytes_per_second
+            succeeded = True
+            if session and setup_command:
+                session.setup_done.add(setup_command)
+            logger.debug(f"{host}: Execution complete ({duration_ms:.0f}ms, {len(output)} bytes, "
+                         f"{rx_rate / 1024:.1f} KB/s)")
 
             return ExecutionResult(
                 host=host,
@@ -440,6 +513,9 @@ class SSHExecutorPool:
                 prompt_detected=detected_prompt,
                 error_category=SSHErrorCategory.SUCCESS,
                 credential_name=credential_name,
+                bytes_per_second=rx_rate,
+                prompt_pattern=PromptMatcher.compile_prompt(detected_prompt).pattern,
+                prompt_cache_hit=prompt_cache_hit,
             )
 
         except Exception as e:
@@ -460,7 +536,13 @@ class SSHExecutorPool:
             )
 
         finally:
-            if client:
+            if session:
+                # Keep healthy sessions for the next job; drop any that errored
+                if succeeded:
+                    self.session_pool.release(session)
+                else:
+                    self.session_pool.discard(session)
+            elif client:
                 try:
                     logger.debug(f"{host}: Disconnecting...")
                     client.disconnect()
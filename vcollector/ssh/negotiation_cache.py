@@ -0,0 +1,186 @@
+"""
+SSH Negotiation Cache - Remember what each host accepted.
+
+Path: vcollector/ssh/negotiation_cache.py
+
+SSHClient.connect tries two algorithm profiles in turn: rsa-sha2 host key /
+pubkey algorithms disabled first, then paramiko's defaults. Devices that
+always need the second profile pay a failed TCP + KEX round trip on every
+run. This cache records, per host:port, which profile and auth method last
+succeeded so the next connect starts there. A host is only re-probed when
+its cached configuration fails.
+
+Records are kept in ~/.vcollector/ssh_negotiation.json and written
+atomically on save().
+
+Usage:
+    cache = get_negotiation_cache()
+    options = SSHClientOptions(host=..., negotiation_cache=cache)
+    SSHClient(options).connect()
+    cache.save()
+    print(cache.stats)
+"""
+
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+from vcollector.core.shared import ProcessWide, write_text
+
+
+logger = logging.getLogger(__name__)
+
+
+# Connection profiles, in default probe order
+PROFILE_RESTRICTED = "no-rsa-sha2"  # disabled_algorithms pubkeys rsa-sha2-512/256
+PROFILE_DEFAULT = "default"         # paramiko defaults
+PROFILES = (PROFILE_RESTRICTED, PROFILE_DEFAULT)
+
+
+@dataclass
+class NegotiationStats:
+    """Counters for negotiation cache use."""
+    hits: int = 0        # Cached profile worked first time
+    misses: int = 0      # No record - probed in default order
+    fallbacks: int = 0   # First profile tried failed, another succeeded
+    reprobes: int = 0    # Cached record failed and was dropped
+    auth_fallbacks: int = 0  # Cached auth method failed, full auth retried
+
+    def __repr__(self) -> str:
+        return (f"NegotiationStats(hits={self.hits}, misses={self.misses}, "
+                f"fallbacks={self.fallbacks}, reprobes={self.reprobes}, "
+                f"auth_fallbacks={self.auth_fallbacks})")
+
+
+class NegotiationCache:
+    """
+    Persistent per-host record of the SSH profile and auth method that worked.
+
+    Thread-safe; shared by all clients in a process.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Initialize negotiation cache.
+
+        Args:
+            path: JSON file to persist records in. If None, uses default location.
+        """
+        if path is None:
+            path = Path.home() / ".vcollector" / "ssh_negotiation.json"
+
+        self.path = Path(path)
+        self.stats = NegotiationStats()
+        self._records: Optional[Dict[str, dict]] = None
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(host: str, port: int) -> str:
+        return f"{host}:{port}"
+
+    def _load(self) -> Dict[str, dict]:
+        """Load records from disk on first use (caller holds the lock)."""
+        if self._records is None:
+            self._records = {}
+            try:
+                if self.path.exists():
+                    data = json.loads(self.path.read_text())
+                    if isinstance(data, dict):
+                        self._records = data
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable negotiation cache {self.path}: {e}")
+        return self._records
+
+    def get(self, host: str, port: int = 22) -> Optional[dict]:
+        """
+        Get the last working configuration for a host.
+
+        Returns:
+            Dict with 'profile' and 'auth' keys, or None if the host is unknown.
+        """
+        with self._lock:
+            record = self._load().get(self._key(host, port))
+            return dict(record) if record else None
+
+    def profile_order(self, host: str, port: int = 22) -> tuple:
+        """Profiles to try for host, cached profile first."""
+        record = self.get(host, port)
+        if not record or record.get('profile') not in PROFILES:
+            return PROFILES
+        cached = record['profile']
+        return (cached,) + tuple(p for p in PROFILES if p != cached)
+
+    def record_success(self, host: str, port: int, profile: str,
+                       auth: Optional[str], attempts: int, cached: bool):
+        """
+        Record a successful connect.
+
+        Args:
+            host: Device host
+            port: SSH port
+            profile: Profile that connected
+            auth: Auth method that succeeded ('publickey', 'password'), if known
+            attempts: Number of profiles tried (1 = first try)
+            cached: Whether the first profile tried came from this cache
+        """
+        with self._lock:
+            if cached and attempts == 1:
+                self.stats.hits += 1
+            elif not cached:
+                self.stats.misses += 1
+            if attempts > 1:
+                self.stats.fallbacks += 1
+                if cached:
+                    self.stats.reprobes += 1
+
+            records = self._load()
+            key = self._key(host, port)
+            old = records.get(key) or {}
+            if old.get('profile') != profile or (auth and old.get('auth') != auth):
+                records[key] = {
+                    'profile': profile,
+                    'auth': auth or old.get('auth'),
+                    'updated_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+                }
+                self._dirty = True
+
+    def record_auth_fallback(self, host: str, port: int = 22):
+        """Forget the cached auth method after it failed."""
+        with self._lock:
+            self.stats.auth_fallbacks += 1
+            record = self._load().get(self._key(host, port))
+            if record and record.get('auth'):
+                record['auth'] = None
+                self._dirty = True
+
+    def forget(self, host: str, port: int = 22):
+        """Drop the record for a host so the next connect re-probes."""
+        with self._lock:
+            if self._load().pop(self._key(host, port), None) is not None:
+                self._dirty = True
+
+    def save(self):
+        """Write records to disk if anything changed."""
+        with self._lock:
+            if not self._dirty or self._records is None:
+                return
+            data = json.dumps(self._records, indent=1, sort_keys=True)
+            self._dirty = False
+
+        try:
+            write_text(self.path, data)
+        except Exception as e:
+            logger.warning(f"Failed to save negotiation cache {self.path}: {e}")
+
+
+_default_cache = ProcessWide(NegotiationCache)
+
+
+def get_negotiation_cache() -> NegotiationCache:
+    """Get the process-wide negotiation cache."""
+    return _default_cache.get()
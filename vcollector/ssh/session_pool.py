@@ -0,0 +1,266 @@
+"""
+SSH Session Pool - Reuse authenticated shells across jobs.
+
+Path: vcollector/ssh/session_pool.py
+
+Keeps connected SSHClient sessions alive for the duration of a batch so
+that several jobs against the same device share one login, key exchange
+and prompt detection. Sessions are keyed by (host, port, credential) and
+leased exclusively - a session is never used by two threads at once.
+
+Sessions are evicted when idle longer than idle_timeout, older than
+max_age, or when the health check fails at lease time.
+
+Usage:
+    with SSHSessionPool(idle_timeout=120, max_age=1800) as sessions:
+        runner = JobRunner(credentials=creds, session_pool=sessions)
+        for job_id in job_ids:
+            runner.run_job(job_id=job_id)
+        print(sessions.stats)
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+from vcollector.ssh.client import SSHClient
+from vcollector.vault.models import SSHCredentials
+
+
+logger = logging.getLogger(__name__)
+
+
+SessionKey = Tuple[str, int, str, str]
+
+
+@dataclass
+class PooledSession:
+    """A connected client plus the state learned when it was opened."""
+    key: SessionKey
+    client: SSHClient
+    prompt: str
+    created_at: float = field(default_factory=time.time)
+    last_used: float = field(default_factory=time.time)
+    uses: int = 0
+    setup_done: Set[str] = field(default_factory=set)  # Session setup already sent (e.g. paging disable)
+
+
+@dataclass
+class SessionPoolStats:
+    """Counters for session reuse."""
+    created: int = 0
+    reused: int = 0
+    evicted_idle: int = 0
+    evicted_age: int = 0
+    evicted_unhealthy: int = 0
+
+    @property
+    def reuse_rate(self) -> float:
+        total = self.created + self.reused
+        return self.reused / total if total else 0.0
+
+    def __repr__(self) -> str:
+        return (f"SessionPoolStats(created={self.created}, reused={self.reused}, "
+                f"reuse_rate={self.reuse_rate:.0%}, evicted_idle={self.evicted_idle}, "
+                f"evicted_age={self.evicted_age}, evicted_unhealthy={self.evicted_unhealthy})")
+
+
+def session_key(host: str, credentials: SSHCredentials, port: int = 22) -> SessionKey:
+    """
+    Build the pool key for a device/credential pair.
+
+    Secrets are reduced to a digest so the key can be logged safely.
+    """
+    digest = hashlib.sha256(
+        "\0".join([
+            credentials.username or "",
+            credentials.password or "",
+            credentials.key_content or "",
+        ]).encode("utf-8")
+    ).hexdigest()[:16]
+    return (host, port, credentials.username, digest)
+
+
+class SSHSessionPool:
+    """
+    Pool of authenticated SSH sessions shared by the jobs of a batch.
+
+    Thread-safe. acquire() hands out an idle, healthy session or None (the
+    caller then connects as usual and offers the new client back with
+    release()). Sessions released after a failure should be discarded
+    instead.
+    """
+
+    def __init__(
+        self,
+        idle_timeout: float = 120.0,
+        max_age: float = 1800.0,
+        max_idle_sessions: int = 1024,
+        max_idle_per_key: int = 2,
+    ):
+        """
+        Initialize session pool.
+
+        Args:
+            idle_timeout: Close sessions unused for this many seconds. Keep
+                below the devices' vty exec-timeout.
+            max_age: Close sessions older than this many seconds.
+            max_idle_sessions: Cap on idle sessions held across all devices.
+            max_idle_per_key: Cap on idle sessions held per device/credential.
+        """
+        self.idle_timeout = idle_timeout
+        self.max_age = max_age
+        self.max_idle_sessions = max_idle_sessions
+        self.max_idle_per_key = max_idle_per_key
+
+        self.stats = SessionPoolStats()
+        self._idle: Dict[SessionKey, List[PooledSession]] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def acquire(self, host: str, credentials: SSHCredentials, port: int = 22) -> Optional[PooledSession]:
+        """
+        Lease an idle session for host/credentials.
+
+        Returns:
+            PooledSession (exclusively owned until release/discard), or None.
+        """
+        key = session_key(host, credentials, port)
+        now = time.time()
+
+        while True:
+            with self._lock:
+                if self._closed:
+                    return None
+                sessions = self._idle.get(key)
+                if not sessions:
+                    return None
+                session = sessions.pop()
+                if not sessions:
+                    del self._idle[key]
+
+            reason = self._expired(session, now)
+            if reason is None and not session.client.is_alive():
+                reason = "unhealthy"
+
+            if reason:
+                self._close(session, reason)
+                continue
+
+            session.client.discard_pending()
+            session.uses += 1
+            with self._lock:
+                self.stats.reused += 1
+            logger.debug(f"{host}: Reusing pooled session (uses={session.uses}, "
+                         f"age={now - session.created_at:.0f}s)")
+            return session
+
+    def register(self, host: str, credentials: SSHCredentials, client: SSHClient,
+                 prompt: str, port: int = 22) -> PooledSession:
+        """Wrap a freshly connected client so it can be released to the pool."""
+        with self._lock:
+            self.stats.created += 1
+        return PooledSession(key=session_key(host, credentials, port), client=client, prompt=prompt)
+
+    def release(self, session: PooledSession) -> None:
+        """Return a leased session to the pool (closing it if it cannot be kept)."""
+        session.last_used = time.time()
+
+        reason = self._expired(session, session.last_used)
+        if reason is None and not session.client.is_alive():
+            reason = "unhealthy"
+
+        if reason is None:
+            with self._lock:
+                sessions = self._idle.setdefault(session.key, [])
+                if self._closed:
+                    reason = "pool closed"
+                elif len(sessions) >= self.max_idle_per_key or self._idle_count() >= self.max_idle_sessions:
+                    reason = "pool full"
+                else:
+                    sessions.append(session)
+                if not sessions:
+                    del self._idle[session.key]
+
+        if reason:
+            self._close(session, reason)
+        else:
+            self._evict_expired()
+
+    def discard(self, session: PooledSession) -> None:
+        """Close a leased session that should not be reused (e.g. after an error)."""
+        self._close(session, "discarded")
+
+    def close(self) -> None:
+        """Close every idle session. Sessions still leased are closed on release."""
+        with self._lock:
+            self._closed = True
+            sessions = [s for group in self._idle.values() for s in group]
+            self._idle.clear()
+
+        for session in sessions:
+            self._close(session, "pool closed")
+
+        logger.info(str(self.stats))
+
+    @property
+    def idle_count(self) -> int:
+        with self._lock:
+            return self._idle_count()
+
+    def _idle_count(self) -> int:
+        return sum(len(group) for group in self._idle.values())
+
+    def _expired(self, session: PooledSession, now: float) -> Optional[str]:
+        if now - session.created_at > self.max_age:
+            return "max age"
+        if now - session.last_used > self.idle_timeout:
+            return "idle timeout"
+        return None
+
+    def _evict_expired(self) -> None:
+        """Close idle sessions past their idle timeout or max age."""
+        now = time.time()
+        expired = []
+        with self._lock:
+            for key in list(self._idle):
+                keep = []
+                for session in self._idle[key]:
+                    reason = self._expired(session, now)
+                    if reason:
+                        expired.append((session, reason))
+                    else:
+                        keep.append(session)
+                if keep:
+                    self._idle[key] = keep
+                else:
+                    del self._idle[key]
+
+        for session, reason in expired:
+            self._close(session, reason)
+
+    def _close(self, session: PooledSession, reason: str) -> None:
+        host = session.key[0]
+        with self._lock:
+            if reason == "idle timeout":
+                self.stats.evicted_idle += 1
+            elif reason == "max age":
+                self.stats.evicted_age += 1
+            elif reason == "unhealthy":
+                self.stats.evicted_unhealthy += 1
+
+        logger.debug(f"{host}: Closing pooled session ({reason})")
+        try:
+            session.client.disconnect()
+        except Exception as e:
+            logger.debug(f"{host}: Error closing pooled session: {e}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
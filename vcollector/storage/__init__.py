@@ -1 +1,39 @@
 """Capture storage - save and retrieve collected data."""
+
+from vcollector.storage.capture_store import (
+    ZSTD_AVAILABLE,
+    CaptureRun,
+    CaptureStore,
+    CaptureVersion,
+    StoredCapture,
+    write_atomic,
+)
+from vcollector.storage.columnar import (
+    PYARROW_AVAILABLE,
+    ParquetDatasetWriter,
+    PartitionSummary,
+)
+from vcollector.storage.parsed_records import (
+    ParsedCapture,
+    discard_parsed,
+    load_parsed,
+    parsed_path,
+    save_parsed,
+)
+
+__all__ = [
+    "ZSTD_AVAILABLE",
+    "CaptureRun",
+    "CaptureStore",
+    "CaptureVersion",
+    "StoredCapture",
+    "write_atomic",
+    "PYARROW_AVAILABLE",
+    "ParquetDatasetWriter",
+    "PartitionSummary",
+    "ParsedCapture",
+    "discard_parsed",
+    "load_parsed",
+    "parsed_path",
+    "save_parsed",
+]
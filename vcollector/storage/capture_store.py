@@ -0,0 +1,305 @@
+"""
+Capture Store - content-addressed, compressed history of captures.
+
+Path: vcollector/storage/capture_store.py
+
+Jobs used to overwrite collections/<type>/<device>.txt on every run, so a
+nightly config pull rewrote thousands of unchanged files and kept no
+history. The capture store keeps each distinct output once, compressed
+and named by its SHA-256, and records every run in a manifest:
+
+    collections/arp/router1.txt                       latest output (the view)
+    collections/.store/objects/3f/3fa2...c1.zst       content by hash (zstd or gzip)
+    collections/.store/manifests/20261016T020000-cisco-arp-1a2b3c.ndjson
+
+The view stays a plain text file, so OutputView, the coverage tools and
+scripts read it as before. When a run's output equals the view, nothing
+is written: only the view's mtime is bumped, since that is what readers
+show as the collection time. Views, objects and manifests are written to
+a temp file and renamed into place, so readers never see partial files.
+
+Manifests are NDJSON: a header line for the run, then one line per
+capture. They are the history - history() and read_version() use them.
+
+    {"_run": {"name": "cisco-arp", "started_at": "...", "finished_at": "...",
+              "captures": 120, "changed": 3, "bytes_written": 5120}}
+    {"path": "arp/router1.txt", "sha256": "3fa2...", "size": 10240,
+     "changed": false, "captured_at": "..."}
+
+zstd needs the zstandard package (pip install velocitycollector[zstd]);
+without it objects are gzip. Both can be read either way.
+
+Usage:
+    store = CaptureStore(collections_dir)
+    run = store.begin_run("cisco-arp")
+    saved = run.save(collections_dir / "arp" / "router1.txt", output)
+    run.close()
+
+    for version in store.history(collections_dir / "arp" / "router1.txt"):
+        text = store.read_version(version.sha256)
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from vcollector.core.shared import write_atomic
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+
+logger = logging.getLogger(__name__)
+
+
+STORE_DIR = '.store'
+RUN_KEY = '_run'
+SUFFIXES = {'zstd': '.zst', 'gzip': '.gz'}
+ZSTD_LEVEL = 9
+GZIP_LEVEL = 6
+
+
+@dataclass
+class StoredCapture:
+    """Outcome of saving one capture."""
+    path: Path       # View file
+    sha256: str
+    size: int        # Uncompressed bytes
+    changed: bool    # False = view already had this content, nothing written
+    captured_at: str
+
+
+@dataclass
+class CaptureVersion:
+    """One run's entry for a view, from its manifest."""
+    run: str
+    sha256: str
+    size: int
+    changed: bool
+    captured_at: str
+
+
+class CaptureStore:
+    """
+    Content-addressed store under <root>/.store for the captures in root.
+
+    Thread-safe; separate processes may share a store (all writes are
+    atomic renames of complete files).
+    """
+
+    def __init__(self, root: Union[str, Path], compression: Optional[str] = None):
+        """
+        Initialize capture store.
+
+        Args:
+            root: Collections directory the views live in.
+            compression: 'zstd' or 'gzip' for new objects
+                (default: zstd if zstandard is installed, else gzip).
+        """
+        if compression is None:
+            compression = 'zstd' if ZSTD_AVAILABLE else 'gzip'
+        if compression not in SUFFIXES:
+            raise ValueError(f"Unknown compression: {compression}")
+        if compression == 'zstd' and not ZSTD_AVAILABLE:
+            raise ImportError("zstd compression requires zstandard (pip install zstandard)")
+
+        self.root = Path(root)
+        self.store_dir = self.root / STORE_DIR
+        self.objects_dir = self.store_dir / 'objects'
+        self.manifests_dir = self.store_dir / 'manifests'
+        self.compression = compression
+
+    # -------------------------------------------------------------------------
+    # Objects
+    # -------------------------------------------------------------------------
+
+    def object_path(self, sha256: str) -> Optional[Path]:
+        """Path of the stored object for a digest, in whichever format it exists."""
+        directory = self.objects_dir / sha256[:2]
+        for suffix in SUFFIXES.values():
+            path = directory / (sha256 + suffix)
+            if path.exists():
+                return path
+        return None
+
+    def _put_object(self, sha256: str, data: bytes) -> int:
+        """Store data under its digest unless present. Returns bytes written."""
+        if self.object_path(sha256) is not None:
+            return 0
+        if self.compression == 'zstd':
+            blob = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+        else:
+            blob = gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+        path = self.objects_dir / sha256[:2] / (sha256 + SUFFIXES[self.compression])
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(path, blob)
+        return len(blob)
+
+    def read_version(self, sha256: str) -> str:
+        """Text of a stored version."""
+        path = self.object_path(sha256)
+        if path is None:
+            raise FileNotFoundError(f"No stored capture {sha256} in {self.objects_dir}")
+        blob = path.read_bytes()
+        if path.suffix == SUFFIXES['zstd']:
+            if not ZSTD_AVAILABLE:
+                raise ImportError(f"Reading {path} requires zstandard (pip install zstandard)")
+            data = zstandard.ZstdDecompressor().decompress(blob)
+        else:
+            data = gzip.decompress(blob)
+        return data.decode('utf-8', errors='replace')
+
+    # -------------------------------------------------------------------------
+    # Views
+    # -------------------------------------------------------------------------
+
+    def save(self, view: Union[str, Path], output: str) -> Tuple[StoredCapture, int]:
+        """
+        Store output and bring the view up to date.
+
+        Returns:
+            (StoredCapture, bytes written to disk)
+        """
+        view = Path(view)
+        data = output.encode('utf-8')
+        sha256 = hashlib.sha256(data).hexdigest()
+        captured_at = datetime.now().isoformat()
+
+        written = self._put_object(sha256, data)
+        changed = not self._view_matches(view, data)
+        if changed:
+            view.parent.mkdir(parents=True, exist_ok=True)
+            write_atomic(view, data)
+            written += len(data)
+        else:
+            os.utime(view)  # Freshness only - readers show mtime as collection time
+
+        return StoredCapture(view, sha256, len(data), changed, captured_at), written
+
+    @staticmethod
+    def _view_matches(view: Path, data: bytes) -> bool:
+        try:
+            if view.stat().st_size != len(data):
+                return False
+            return view.read_bytes() == data
+        except OSError:
+            return False
+
+    # -------------------------------------------------------------------------
+    # Runs and history
+    # -------------------------------------------------------------------------
+
+    def begin_run(self, name: str) -> 'CaptureRun':
+        """Start recording a run (one job execution)."""
+        return CaptureRun(self, name)
+
+    def relative(self, view: Union[str, Path]) -> str:
+        """View path as recorded in manifests."""
+        view = Path(view)
+        try:
+            return view.resolve().relative_to(self.root.resolve()).as_posix()
+        except ValueError:
+            return str(view)
+
+    def history(self, view: Union[str, Path]) -> List[CaptureVersion]:
+        """Every recorded capture of a view, newest first."""
+        rel = self.relative(view)
+        versions = []
+        if not self.manifests_dir.exists():
+            return versions
+
+        for manifest in sorted(self.manifests_dir.glob('*.ndjson'), reverse=True):
+            try:
+                with open(manifest) as f:
+                    run = json.loads(f.readline())[RUN_KEY].get('name', manifest.stem)
+                    for line in f:
+                        entry = json.loads(line)
+                        if entry.get('path') == rel:
+                            versions.append(CaptureVersion(
+                                run=run,
+                                sha256=entry['sha256'],
+                                size=entry['size'],
+                                changed=entry['changed'],
+                                captured_at=entry['captured_at'],
+                            ))
+            except Exception as e:
+                logger.debug(f"Skipping unreadable manifest {manifest}: {e}")
+
+        versions.sort(key=lambda v: v.captured_at, reverse=True)
+        return versions
+
+
+class CaptureRun:
+    """Captures saved by one run; close() writes the run's manifest."""
+
+    def __init__(self, store: CaptureStore, name: str):
+        self.store = store
+        self.name = name
+        self.started_at = datetime.now()
+        self.saved = 0
+        self.changed = 0
+        self.bytes_written = 0
+        self._entries: List[Dict] = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def save(self, view: Union[str, Path], output: str) -> StoredCapture:
+        """Save one capture (see CaptureStore.save) and record it."""
+        stored, written = self.store.save(view, output)
+        entry = {
+            'path': self.store.relative(stored.path),
+            'sha256': stored.sha256,
+            'size': stored.size,
+            'changed': stored.changed,
+            'captured_at': stored.captured_at,
+        }
+        with self._lock:
+            self._entries.append(entry)
+            self.saved += 1
+            self.changed += stored.changed
+            self.bytes_written += written
+        return stored
+
+    def close(self) -> Optional[Path]:
+        """
+        Write the manifest (nothing if no captures were saved).
+
+        Returns:
+            Manifest path, or None.
+        """
+        with self._lock:
+            if self._closed or not self._entries:
+                self._closed = True
+                return None
+            self._closed = True
+            entries = self._entries
+            header = {
+                'name': self.name,
+                'started_at': self.started_at.isoformat(),
+                'finished_at': datetime.now().isoformat(),
+                'captures': self.saved,
+                'changed': self.changed,
+                'bytes_written': self.bytes_written,
+            }
+
+        safe_name = ''.join(c if c.isalnum() or c in '-_.' else '_' for c in self.name)
+        path = self.store.manifests_dir / (f"{self.started_at:%Y%m%dT%H%M%S}-{safe_name}-"
+                                           f"{uuid.uuid4().hex[:6]}.ndjson")
+        lines = [json.dumps({RUN_KEY: header})] + [json.dumps(entry) for entry in entries]
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(path, ('\n'.join(lines) + '\n').encode('utf-8'))
+
+        logger.debug(f"Capture run {self.name}: {self.saved} saved, {self.changed} changed, "
+                     f"{self.bytes_written} bytes written ({path.name})")
+        return path
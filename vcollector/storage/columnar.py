@@ -0,0 +1,247 @@
+"""
+Columnar Export - parsed records as a partitioned Parquet dataset.
+
+Path: vcollector/storage/columnar.py
+
+Row formats (JSON, NDJSON, CSV, SQLite) repeat every field name or device
+name on every record and are slow to scan. ParquetDatasetWriter writes one
+dataset per export root, partitioned Hive-style by capture type and the
+date the output was collected:
+
+    <root>/capture_type=arp/date=2026-10-16/part-20261016T101500-1a2b3c-0000.parquet
+    <root>/capture_type=routes/date=2026-10-16/part-...
+
+Each file holds one row per record: device, vendor, platform and template
+(dictionary-encoded), score, then the template's fields as strings (or
+lists of strings for TextFSM List values). Files are named per run, so
+exporting again adds to the dataset instead of replacing it.
+
+Requires pyarrow (pip install velocitycollector[parquet]).
+
+Usage:
+    with ParquetDatasetWriter(root) as writer:
+        writer.write("arp", records, device="router1", vendor="Cisco",
+                     template="cisco_ios_show_ip_arp", score=87.5,
+                     collected=datetime.fromtimestamp(capture.stat().st_mtime))
+
+    # DuckDB
+    SELECT * FROM read_parquet('<root>/*/*/*.parquet', hive_partitioning = true,
+                               union_by_name = true)
+    # pandas
+    df = pd.read_parquet('<root>/capture_type=routes')
+"""
+
+import json
+import logging
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+
+logger = logging.getLogger(__name__)
+
+
+# Columns written before the record fields, dictionary-encoded except score
+META_COLUMNS = ('device', 'vendor', 'platform', 'template')
+SCORE_COLUMN = 'score'
+
+
+@dataclass
+class PartitionSummary:
+    """What was written to one capture_type/date partition."""
+    capture_type: str
+    date: str
+    rows: int = 0
+    files: List[Path] = field(default_factory=list)
+
+
+@dataclass
+class _Partition:
+    summary: PartitionSummary
+    directory: Path
+    rows: List[Tuple[Tuple, Dict[str, Any]]] = field(default_factory=list)  # (meta values, record)
+    schema: Optional[Any] = None  # pa.Schema of the open file
+    writer: Optional[Any] = None  # pq.ParquetWriter
+
+
+class ParquetDatasetWriter:
+    """
+    Writes parsed records into a partitioned Parquet dataset.
+
+    Records are buffered per partition and written as row groups of
+    batch_rows. A partition keeps one file open until its fields change
+    (e.g. a second template with other fields), then starts the next part.
+    Not thread-safe.
+    """
+
+    def __init__(
+        self,
+        root: Union[str, Path],
+        batch_rows: int = 65536,
+        compression: str = 'zstd',
+    ):
+        """
+        Initialize dataset writer.
+
+        Args:
+            root: Dataset directory (created if missing).
+            batch_rows: Records per row group; bounds buffered memory.
+            compression: Parquet codec (zstd, snappy, gzip, none).
+        """
+        if not PYARROW_AVAILABLE:
+            raise ImportError("Parquet export requires pyarrow (pip install pyarrow)")
+
+        self.root = Path(root)
+        self.batch_rows = batch_rows
+        self.compression = compression
+        self.run_id = f"{datetime.now():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:6]}"
+        self._partitions: Dict[Tuple[str, str], _Partition] = {}
+
+    def write(
+        self,
+        capture_type: str,
+        records: List[Dict[str, Any]],
+        device: str,
+        vendor: Optional[str] = None,
+        platform: Optional[str] = None,
+        template: Optional[str] = None,
+        score: Optional[float] = None,
+        collected: Optional[Union[datetime, date]] = None,
+    ):
+        """
+        Add one capture's records.
+
+        Args:
+            capture_type: Partition (and table) the records belong to
+            records: Parsed records as dicts
+            device: Device name
+            vendor: Device vendor
+            platform: Device platform
+            template: Template that parsed the records
+            score: Match score
+            collected: When the output was collected (default: today)
+        """
+        if not records:
+            return
+
+        day = (collected or datetime.now()).strftime('%Y-%m-%d')
+        key = (capture_type, day)
+        partition = self._partitions.get(key)
+        if partition is None:
+            directory = self.root / f"capture_type={capture_type.replace('/', '_')}" / f"date={day}"
+            partition = self._partitions[key] = _Partition(
+                summary=PartitionSummary(capture_type=capture_type, date=day),
+                directory=directory,
+            )
+
+        meta = (device, vendor, platform, template, score)
+        partition.rows.extend((meta, record) for record in records)
+        if len(partition.rows) >= self.batch_rows:
+            self._flush(partition)
+
+    def _flush(self, partition: _Partition):
+        rows, partition.rows = partition.rows, []
+        if not rows:
+            return
+
+        # Record fields in first-seen order; List values make list<string> columns
+        field_types: Dict[str, Any] = {}
+        for _, record in rows:
+            for name, value in record.items():
+                if name not in field_types or (field_types[name] is None and value not in (None, '')):
+                    field_types[name] = None if value in (None, '') else isinstance(value, list)
+
+        schema = partition.schema
+        if schema is None or any(name not in schema.names for name in field_types):
+            schema = self._schema(schema, field_types)
+            self._open(partition, schema)
+
+        table = pa.Table.from_arrays(self._columns(rows, schema), schema=schema)
+        partition.writer.write_table(table)
+        partition.summary.rows += len(rows)
+
+    @staticmethod
+    def _schema(previous: Optional[Any], field_types: Dict[str, Any]) -> Any:
+        """Schema of previous plus any new fields."""
+        dictionary = pa.dictionary(pa.int32(), pa.string())
+        if previous is None:
+            fields = [pa.field(name, dictionary) for name in META_COLUMNS]
+            fields.append(pa.field(SCORE_COLUMN, pa.float64()))
+        else:
+            fields = list(previous)
+
+        known = {f.name for f in fields}
+        for name, is_list in field_types.items():
+            if name not in known:
+                fields.append(pa.field(name, pa.list_(pa.string()) if is_list else pa.string()))
+        return pa.schema(fields)
+
+    def _open(self, partition: _Partition, schema: Any):
+        """Close the partition's current file and start the next part with schema."""
+        if partition.writer is not None:
+            partition.writer.close()
+
+        partition.directory.mkdir(parents=True, exist_ok=True)
+        path = partition.directory / f"part-{self.run_id}-{len(partition.summary.files):04d}.parquet"
+        partition.writer = pq.ParquetWriter(str(path), schema, compression=self.compression)
+        partition.schema = schema
+        partition.summary.files.append(path)
+        logger.debug(f"Writing {path}")
+
+    @staticmethod
+    def _columns(rows: List[Tuple[Tuple, Dict[str, Any]]], schema: Any) -> List[Any]:
+        columns = []
+        for i, name in enumerate(META_COLUMNS):
+            values = pa.array([meta[i] for meta, _ in rows], pa.string())
+            columns.append(values.dictionary_encode())
+        columns.append(pa.array([meta[len(META_COLUMNS)] for meta, _ in rows], pa.float64()))
+
+        for f in list(schema)[len(META_COLUMNS) + 1:]:
+            is_list = pa.types.is_list(f.type)
+            values = []
+            for _, record in rows:
+                value = record.get(f.name)
+                if value is None:
+                    values.append(None)
+                elif is_list:
+                    values.append([str(v) for v in value] if isinstance(value, list) else
+                                  ([str(value)] if value != '' else []))
+                elif isinstance(value, (list, dict)):
+                    values.append(json.dumps(value))
+                else:
+                    values.append(str(value))
+            columns.append(pa.array(values, f.type))
+        return columns
+
+    def close(self) -> List[PartitionSummary]:
+        """
+        Write buffered records and close all files.
+
+        Returns:
+            One summary per partition written, sorted by capture type and date.
+        """
+        for partition in self._partitions.values():
+            try:
+                self._flush(partition)
+            finally:
+                if partition.writer is not None:
+                    partition.writer.close()
+                    partition.writer = None
+        return sorted((p.summary for p in self._partitions.values()),
+                      key=lambda s: (s.capture_type, s.date))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
@@ -0,0 +1,232 @@
+"""
+Parsed Records - TextFSM results stored next to each capture.
+
+Path: vcollector/storage/parsed_records.py
+
+The job runner already parses every capture to validate it. With
+save_parsed enabled it keeps the winning template's records in a sidecar
+file, so export and reporting tools load them instead of running TextFSM
+over the same text again:
+
+    collections/arp/router1.txt
+    collections/arp/router1.txt.parsed.ndjson
+
+The sidecar is NDJSON: a header line, then one record per line.
+
+    {"_meta": {"template": "cisco_ios_show_ip_arp", "template_hash": "...",
+               "output_sha256": "...", "score": 87.5, "record_count": 2,
+               "parsed_at": "..."}}
+    {"PROTOCOL": "Internet", "ADDRESS": "10.1.1.1", ...}
+    {"PROTOCOL": "Internet", "ADDRESS": "10.1.1.2", ...}
+
+A sidecar is only used while it still describes its capture: the capture
+text must hash to output_sha256, and (when a template database is given)
+the template must still have the content hash it was parsed with.
+
+Usage:
+    save_parsed(capture_path, output, template, template_hash, score, records)
+
+    parsed = load_parsed(capture_path, content=text, db_path=tfsm_db)
+    if parsed:
+        records = parsed.records
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple, Union
+
+from vcollector.core.db import connect
+from vcollector.validation.template_cache import content_hash, db_signature
+
+
+logger = logging.getLogger(__name__)
+
+
+PARSED_SUFFIX = '.parsed.ndjson'
+META_KEY = '_meta'
+
+
+@dataclass
+class ParsedCapture:
+    """Stored parse of one capture."""
+    template: str
+    template_hash: str
+    output_sha256: str
+    score: float = 0.0
+    records: List[Dict[str, Any]] = field(default_factory=list)
+    parsed_at: Optional[str] = None
+
+    @property
+    def record_count(self) -> int:
+        return len(self.records)
+
+
+def parsed_path(capture_path: Union[str, Path]) -> Path:
+    """Sidecar path for a capture file."""
+    capture_path = Path(capture_path)
+    return capture_path.with_name(capture_path.name + PARSED_SUFFIX)
+
+
+def output_hash(output: str) -> str:
+    """Digest of capture text, used to tell whether a sidecar still matches it."""
+    return hashlib.sha256(output.encode('utf-8', errors='replace')).hexdigest()
+
+
+def save_parsed(
+    capture_path: Union[str, Path],
+    output: str,
+    template: str,
+    template_hash: str,
+    score: float,
+    records: List[Dict[str, Any]],
+) -> Path:
+    """
+    Write the sidecar for a capture (atomically replacing any old one).
+
+    Args:
+        capture_path: Capture file the records were parsed from
+        output: Capture text exactly as saved
+        template: Template name (cli_command)
+        template_hash: Content hash of the template (template_cache.content_hash)
+        score: Validation score
+        records: Parsed records as dicts
+
+    Returns:
+        Path of the sidecar file.
+    """
+    path = parsed_path(capture_path)
+    meta = {
+        'template': template,
+        'template_hash': template_hash,
+        'output_sha256': output_hash(output),
+        'score': score,
+        'record_count': len(records),
+        'parsed_at': datetime.now().isoformat(),
+    }
+
+    fd, tmp = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(json.dumps({META_KEY: meta}) + '\n')
+            for record in records:
+                f.write(json.dumps(record) + '\n')
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+    logger.debug(f"Saved {len(records)} parsed records: {path}")
+    return path
+
+
+def discard_parsed(capture_path: Union[str, Path]):
+    """Remove a capture's sidecar, if any (the capture was saved unparsed)."""
+    try:
+        parsed_path(capture_path).unlink()
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"Failed to remove stale parsed records for {capture_path}: {e}")
+
+
+def load_parsed(
+    capture_path: Union[str, Path],
+    content: Optional[str] = None,
+    db_path: Optional[Union[str, Path]] = None,
+) -> Optional[ParsedCapture]:
+    """
+    Load a capture's stored records if they are still current.
+
+    Args:
+        capture_path: Capture file
+        content: Capture text if already read (read from capture_path otherwise)
+        db_path: Template database; if given, records parsed with a template
+            that has since changed (or been removed) are not returned
+
+    Returns:
+        ParsedCapture, or None if there is no usable sidecar.
+    """
+    path = parsed_path(capture_path)
+    try:
+        with open(path) as f:
+            header = json.loads(f.readline())
+            meta = header[META_KEY]
+            records = [json.loads(line) for line in f if line.strip()]
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.debug(f"Ignoring unreadable parsed records {path}: {e}")
+        return None
+
+    try:
+        if content is None:
+            content = Path(capture_path).read_text(errors='replace')
+    except OSError:
+        return None
+
+    if meta.get('output_sha256') != output_hash(content):
+        logger.debug(f"Parsed records out of date (capture changed): {path}")
+        return None
+
+    if db_path is not None:
+        current = template_hashes(str(db_path)).get(meta.get('template'), ())
+        if meta.get('template_hash') not in current:
+            logger.debug(f"Parsed records out of date (template changed): {path}")
+            return None
+
+    return ParsedCapture(
+        template=meta['template'],
+        template_hash=meta['template_hash'],
+        output_sha256=meta['output_sha256'],
+        score=meta.get('score', 0.0),
+        records=records,
+        parsed_at=meta.get('parsed_at'),
+    )
+
+
+_template_hashes: Dict[str, Tuple[Optional[tuple], Dict[str, FrozenSet[str]]]] = {}
+_template_hashes_lock = threading.Lock()
+
+
+def template_hashes(db_path: str) -> Dict[str, FrozenSet[str]]:
+    """
+    Template name -> content hashes for a template database (a name can
+    appear in more than one row, e.g. from different sources).
+
+    Computed once per database and recomputed when the file changes.
+    """
+    db_path = str(Path(db_path).expanduser())
+    signature = db_signature(db_path)
+    with _template_hashes_lock:
+        cached = _template_hashes.get(db_path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+
+    hashes: Dict[str, set] = {}
+    if signature is not None:
+        try:
+            conn = connect(db_path, readonly=True)
+            try:
+                for name, content in conn.execute("SELECT cli_command, textfsm_content FROM templates"):
+                    if name is not None:
+                        hashes.setdefault(name, set()).add(content_hash(content or ''))
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Cannot read template hashes from {db_path}: {e}")
+
+    frozen = {name: frozenset(digests) for name, digests in hashes.items()}
+    with _template_hashes_lock:
+        _template_hashes[db_path] = (signature, frozen)
+    return frozen
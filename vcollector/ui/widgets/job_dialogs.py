@@ -132,6 +132,8 @@ class JobDetailDialog(QDialog):
         tfsm_layout.addRow("Enabled:", self._label("Yes" if self.job.use_textfsm else "No"))
         tfsm_layout.addRow("Template:", self._label(self.job.textfsm_template))
         tfsm_layout.addRow("Min Score:", self._label(str(self.job.validation_min_score)))
+        tfsm_layout.addRow("Sample Lines:", self._label(
+            str(self.job.validation_sample_lines) if self.job.validation_sample_lines else "Full output"))
         commands_layout.addWidget(tfsm_group)
 
         commands_layout.addStretch()
@@ -395,6 +397,17 @@ class JobEditDialog(QDialog):
         self.min_score_input.setValue(0)
         tfsm_layout.addRow("Min Quality Score:", self.min_score_input)
 
+        self.sample_lines_input = QSpinBox()
+        self.sample_lines_input.setRange(0, 1000000)
+        self.sample_lines_input.setSingleStep(500)
+        self.sample_lines_input.setValue(0)
+        self.sample_lines_input.setSpecialValueText("Full output")
+        self.sample_lines_input.setToolTip(
+            "Score templates on head, middle and tail windows of this many lines "
+            "in total when the output is longer"
+        )
+        tfsm_layout.addRow("Sample Lines:", self.sample_lines_input)
+
         self.store_failures_check = QCheckBox("Store output even if validation fails")
         self.store_failures_check.setChecked(True)
         tfsm_layout.addRow("", self.store_failures_check)
@@ -567,6 +580,7 @@ class JobEditDialog(QDialog):
         self.use_textfsm_check.setChecked(self.job.use_textfsm)
         self.textfsm_template_input.setText(self.job.textfsm_template or "")
         self.min_score_input.setValue(self.job.validation_min_score or 0)
+        self.sample_lines_input.setValue(self.job.validation_sample_lines or 0)
         self.store_failures_check.setChecked(self.job.store_failures)
 
         # Execution
@@ -635,6 +649,7 @@ class JobEditDialog(QDialog):
             'use_textfsm': self.use_textfsm_check.isChecked(),
             'textfsm_template': self.textfsm_template_input.text().strip() or None,
             'validation_min_score': self.min_score_input.value(),
+            'validation_sample_lines': self.sample_lines_input.value(),
             'store_failures': self.store_failures_check.isChecked(),
             'max_workers': self.max_workers_input.value(),
             'timeout_seconds': self.timeout_input.value(),
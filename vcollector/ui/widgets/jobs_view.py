@@ -21,6 +21,7 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import Qt, QTimer, pyqtSignal, QThread
 from PyQt6.QtGui import QAction, QColor, QShortcut, QKeySequence
 
+from vcollector.core.db import connect
 from vcollector.dcim.jobs_repo import JobsRepository, Job
 from vcollector.ui.widgets.stat_cards import StatCard
 from vcollector.ui.widgets.job_dialogs import JobDetailDialog, JobEditDialog
@@ -83,6 +84,7 @@ def parse_job_json(filepath: Path) -> Optional[Dict[str, Any]]:
         job['use_textfsm'] = 1 if validation.get('use_tfsm') else 0
         job['textfsm_template'] = validation.get('tfsm_filter')
         job['validation_min_score'] = validation.get('min_score', 0)
+        job['validation_sample_lines'] = validation.get('sample_lines', 0)
         job['store_failures'] = 1 if validation.get('store_failures', True) else 0
 
         # Execution
@@ -157,6 +159,7 @@ class StarterJobsDownloadWorker(QThread):
                 use_textfsm INTEGER DEFAULT 0,
                 textfsm_template TEXT,
                 validation_min_score INTEGER DEFAULT 0,
+                validation_sample_lines INTEGER DEFAULT 0,
                 store_failures INTEGER DEFAULT 1,
                 max_workers INTEGER DEFAULT 10,
                 timeout_seconds INTEGER DEFAULT 60,
@@ -195,7 +198,8 @@ class StarterJobsDownloadWorker(QThread):
             'name', 'slug', 'capture_type', 'vendor', 'credential_fallback_env',
             'protocol', 'device_filter_source', 'device_filter_name_pattern',
             'paging_disable_command', 'command', 'output_directory', 'filename_pattern',
-            'use_textfsm', 'textfsm_template', 'validation_min_score', 'store_failures',
+            'use_textfsm', 'textfsm_template', 'validation_min_score',
+            'validation_sample_lines', 'store_failures',
             'max_workers', 'timeout_seconds', 'inter_command_delay', 'base_path',
             'legacy_job_id', 'legacy_job_file', 'migrated_at'
         ]
@@ -217,7 +221,6 @@ class StarterJobsDownloadWorker(QThread):
             return None
 
     def run(self):
-        import sqlite3
         try:
             # Download zip
             self.progress.emit("Downloading starter jobs from GitHub...")
@@ -246,11 +249,11 @@ class StarterJobsDownloadWorker(QThread):
 
                 # Connect to database
                 if self.db_path:
-                    conn = sqlite3.connect(str(self.db_path))
+                    conn = connect(self.db_path)
                 else:
                     # Fallback to default location
                     default_path = Path.home() / '.vcollector' / 'collector.db'
-                    conn = sqlite3.connect(str(default_path))
+                    conn = connect(default_path)
 
                 self._init_jobs_schema(conn)
 
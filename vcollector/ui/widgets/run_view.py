@@ -151,11 +151,13 @@ class BatchExecutionThread(QThread):
 
     def run(self):
         results = []
+        session_pool = None
 
         try:
             from vcollector.jobs.runner import JobRunner
             from vcollector.vault.resolver import CredentialResolver
             from vcollector.dcim.jobs_repo import JobsRepository
+            from vcollector.ssh.session_pool import SSHSessionPool
 
             self.log_message.emit("Unlocking vault...")
             resolver = CredentialResolver()
@@ -194,6 +196,15 @@ class BatchExecutionThread(QThread):
                 delay_between = self.options.get('delay_between_jobs', 5)
                 total_jobs = len(self.job_slugs)
 
+                if self.options.get('device_major', False):
+                    results = self._run_device_major(creds, credential_resolver)
+                    if not self._cancelled:
+                        self.batch_finished.emit(results)
+                    return
+
+                # Share authenticated SSH sessions across the jobs in this batch
+                session_pool = SSHSessionPool() if self.options.get('reuse_sessions', True) else None
+
                 for i, slug in enumerate(self.job_slugs):
                     if self._cancelled:
                         self.log_message.emit("Batch cancelled by user")
@@ -219,6 +230,7 @@ class BatchExecutionThread(QThread):
                         limit=self.options.get('limit'),
                         quiet=False,
                         record_history=True,
+                        session_pool=session_pool,
                     )
 
                     def on_progress(completed, total, result):
@@ -261,11 +273,57 @@ class BatchExecutionThread(QThread):
                     self.batch_finished.emit(results)
 
             finally:
+                if session_pool:
+                    self.log_message.emit(f"Session reuse: {session_pool.stats}")
+                    session_pool.close()
                 resolver.lock_vault()
 
         except Exception as e:
             self.error.emit(f"Batch execution error: {str(e)}\n{traceback.format_exc()}")
 
+    def _run_device_major(self, creds, credential_resolver) -> list:
+        """Run the batch device by device (one login per device for all jobs)."""
+        from vcollector.jobs.device_major import DeviceMajorRunner
+
+        self.log_message.emit("Device-major mode: one session per device for all jobs")
+        total_jobs = len(self.job_slugs)
+        self.job_starting.emit(1, total_jobs, "all jobs (device-major)")
+
+        runner = DeviceMajorRunner(
+            credentials=creds,
+            credential_resolver=credential_resolver,
+            validate=self.options.get('validate', True),
+            debug=self.options.get('debug', False),
+            no_save=self.options.get('no_save', False),
+            force_save=self.options.get('force_save', False),
+            limit=self.options.get('limit'),
+        )
+
+        def on_progress(completed, total, result):
+            if self._cancelled:
+                return
+            progress = DeviceProgress(
+                device_name=result.host,
+                host=result.host,
+                success=result.success,
+                duration_ms=result.duration_ms,
+                error=result.error,
+                credential_name=result.credential_name,
+            )
+            self.job_progress.emit(completed, total, progress)
+
+        finished = []
+
+        def on_job(slug, result):
+            finished.append((slug, result))
+            self.job_finished.emit(len(finished), slug, result)
+
+        runner.run(self.job_slugs, progress_callback=on_progress, job_callback=on_job,
+                   should_cancel=lambda: self._cancelled)
+        if self._cancelled:
+            self.log_message.emit("Batch cancelled by user")
+        return finished
+
     def cancel(self):
         self._cancelled = True
 
@@ -432,6 +490,13 @@ class RunView(QWidget):
         self.stop_on_failure_check.setToolTip("Stop batch execution if a job fails")
         batch_opts_layout.addRow("", self.stop_on_failure_check)
 
+        self.device_major_check = QCheckBox("One login per device (device-major)")
+        self.device_major_check.setToolTip(
+            "Group the batch by device: log in once and run every matching job's\n"
+            "command in the same session. Jobs then run together, not one after another."
+        )
+        batch_opts_layout.addRow("", self.device_major_check)
+
         self.delay_spin = QSpinBox()
         self.delay_spin.setRange(0, 60)
         self.delay_spin.setValue(5)
@@ -799,6 +864,7 @@ class RunView(QWidget):
             'use_per_device_creds': self.per_device_creds_check.isChecked(),
             'stop_on_failure': self.stop_on_failure_check.isChecked(),
             'delay_between_jobs': self.delay_spin.value(),
+            'device_major': self.device_major_check.isChecked(),
         }
 
         self._prepare_execution()
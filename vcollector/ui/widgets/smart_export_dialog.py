@@ -2,7 +2,7 @@
 Smart Export Dialog for VelocityCollector Output View
 
 Parses  network output using TextFSM templates (auto-detected or manual)
-and exports structured data to JSON or CSV formats.
+and exports structured data to JSON, CSV or Parquet formats.
 
 Usage:
     from smart_export_dialog import SmartExportDialog
@@ -17,6 +17,7 @@ Usage:
 
 import json
 import csv
+import re
 import sqlite3
 import io
 from pathlib import Path
@@ -48,6 +49,37 @@ except ImportError:
     except ImportError:
         pass
 
+# Shared connection settings (read-only URI, busy timeout) - see vcollector.core.db
+try:
+    from vcollector.core.db import connect as db_connect
+except ImportError:
+    def db_connect(path, readonly=False, row_factory=None):
+        conn = sqlite3.connect(str(path))
+        conn.row_factory = row_factory
+        return conn
+
+# On-disk parse results from earlier runs (VCOLLECTOR_NO_PARSE_CACHE=1 to bypass)
+try:
+    from vcollector.validation.parse_cache import get_parse_cache
+except ImportError:
+    def get_parse_cache():
+        return None
+
+# Records the job runner saved with the capture (config save_parsed)
+PARSED_RECORDS_AVAILABLE = False
+try:
+    from vcollector.storage.parsed_records import load_parsed
+    PARSED_RECORDS_AVAILABLE = True
+except ImportError:
+    pass
+
+# Columnar export (optional: pip install pyarrow)
+PYARROW_AVAILABLE = False
+try:
+    from vcollector.storage.columnar import PYARROW_AVAILABLE, ParquetDatasetWriter
+except ImportError:
+    pass
+
 
 @dataclass
 class ParseResult:
@@ -80,13 +112,47 @@ class TemplateMatchWorker(QThread):
     progress = pyqtSignal(str)  # status message
     error = pyqtSignal(str)
 
-    def __init__(self, db_path: str, content: str, filter_hint: str = ""):
+    def __init__(self, db_path: str, content: str, filter_hint: str = "",
+                 filepath: Optional[Path] = None):
         super().__init__()
         self.db_path = db_path
         self.content = content
         self.filter_hint = filter_hint
+        self.filepath = filepath
+
+    def _load_stored(self) -> Optional[ParseResult]:
+        """Records saved by the job runner for this file, if current and matching the hint."""
+        if self.filepath is None or not PARSED_RECORDS_AVAILABLE:
+            return None
+
+        stored = load_parsed(self.filepath, content=self.content, db_path=self.db_path)
+        if stored is None or not stored.records:
+            return None
+
+        name = stored.template.lower()
+        words = [w for w in re.split(r'[\s_-]+', self.filter_hint.lower()) if len(w) > 2]
+        if not all(word in name for word in words):
+            return None
+
+        return ParseResult(
+            success=True,
+            template_name=stored.template,
+            headers=list(stored.records[0].keys()),
+            data=stored.records,
+            score=stored.score,
+            record_count=stored.record_count
+        )
 
     def run(self):
+        try:
+            stored = self._load_stored()
+        except Exception:
+            stored = None
+        if stored is not None:
+            self.progress.emit("Loaded saved parse results")
+            self.finished.emit(stored)
+            return
+
         if not TFSM_ENGINE_AVAILABLE:
             self.error.emit("TextFSM Auto Engine not available")
             return
@@ -100,7 +166,7 @@ class TemplateMatchWorker(QThread):
                 return
 
             # Quick schema check before using engine
-            conn = sqlite3.connect(self.db_path)
+            conn = db_connect(self.db_path, readonly=True)
             cursor = conn.cursor()
             cursor.execute("PRAGMA table_info(templates)")
             columns = [row[1] for row in cursor.fetchall()]
@@ -115,7 +181,7 @@ class TemplateMatchWorker(QThread):
                 )
                 return
 
-            engine = TextFSMAutoEngine(self.db_path, verbose=False)
+            engine = TextFSMAutoEngine(self.db_path, verbose=False, parse_cache=get_parse_cache())
 
             self.progress.emit(f"Searching for matching templates...")
 
@@ -180,7 +246,7 @@ class SmartExportDialog(QDialog):
     - Auto-detect best matching template
     - Manual template selection from database
     - Preview parsed data in table
-    - Export to JSON or CSV
+    - Export to JSON or CSV, or add to a Parquet dataset
     - Handles multi-record output
     - Schema-adaptive: works with different tfsm_templates.db schemas
     """
@@ -248,7 +314,7 @@ class SmartExportDialog(QDialog):
             return
 
         try:
-            conn = sqlite3.connect(str(db_path))
+            conn = db_connect(db_path, readonly=True)
             cursor = conn.cursor()
 
             # Get column info
@@ -414,6 +480,15 @@ class SmartExportDialog(QDialog):
         self.export_csv_btn.setEnabled(False)
         export_layout.addWidget(self.export_csv_btn)
 
+        self.export_parquet_btn = QPushButton("🧱 Export Parquet")
+        self.export_parquet_btn.clicked.connect(self._export_parquet)
+        self.export_parquet_btn.setEnabled(False)
+        self.export_parquet_btn.setToolTip(
+            "Add records to a Parquet dataset folder (partitioned by capture type and date)"
+            if PYARROW_AVAILABLE else "Requires pyarrow (pip install pyarrow)"
+        )
+        export_layout.addWidget(self.export_parquet_btn)
+
         self.copy_json_btn = QPushButton("📋 Copy JSON")
         self.copy_json_btn.clicked.connect(self._copy_json)
         self.copy_json_btn.setEnabled(False)
@@ -480,8 +555,7 @@ class SmartExportDialog(QDialog):
             return
 
         try:
-            conn = sqlite3.connect(str(db_path))
-            conn.row_factory = sqlite3.Row
+            conn = db_connect(db_path, readonly=True, row_factory=sqlite3.Row)
             cursor = conn.cursor()
 
             # Use detected column name
@@ -532,7 +606,8 @@ class SmartExportDialog(QDialog):
             self._worker = TemplateMatchWorker(
                 self.db_path,
                 self._content,
-                filter_hint
+                filter_hint,
+                filepath=self.filepath
             )
             self._worker.finished.connect(self._on_auto_detect_finished)
             self._worker.progress.connect(self._on_progress)
@@ -557,8 +632,7 @@ class SmartExportDialog(QDialog):
         filter_hint = self.filter_input.text().strip().lower()
 
         try:
-            conn = sqlite3.connect(str(self.db_path))
-            conn.row_factory = sqlite3.Row
+            conn = db_connect(self.db_path, readonly=True, row_factory=sqlite3.Row)
             cursor = conn.cursor()
 
             # Get all templates
@@ -698,8 +772,7 @@ class SmartExportDialog(QDialog):
 
         # Get template content from database
         try:
-            conn = sqlite3.connect(str(self.db_path))
-            conn.row_factory = sqlite3.Row
+            conn = db_connect(self.db_path, readonly=True, row_factory=sqlite3.Row)
             cursor = conn.cursor()
 
             # Use detected column name
@@ -815,6 +888,7 @@ class SmartExportDialog(QDialog):
         """Enable/disable export buttons."""
         self.export_json_btn.setEnabled(enabled)
         self.export_csv_btn.setEnabled(enabled)
+        self.export_parquet_btn.setEnabled(enabled and PYARROW_AVAILABLE)
         self.copy_json_btn.setEnabled(enabled)
 
     def _export_json(self):
@@ -915,6 +989,45 @@ class SmartExportDialog(QDialog):
         except Exception as e:
             QMessageBox.warning(self, "Export Error", str(e))
 
+    def _export_parquet(self):
+        """Add results to a Parquet dataset folder."""
+        if not self._current_result:
+            return
+
+        directory = QFileDialog.getExistingDirectory(
+            self,
+            "Export Parquet - choose dataset folder",
+            str(Path.home())
+        )
+
+        if not directory:
+            return
+
+        try:
+            data = self._current_result.to_dicts()
+            capture_type = self.capture_type or self.filepath.parent.name
+            collected = datetime.fromtimestamp(self.filepath.stat().st_mtime)
+
+            writer = ParquetDatasetWriter(directory)
+            writer.write(
+                capture_type, data,
+                device=self.filepath.stem,
+                template=self._current_result.template_name,
+                score=self._current_result.score,
+                collected=collected
+            )
+            partitions = writer.close()
+            written = partitions[0].files[-1] if partitions else Path(directory)
+
+            self.status_label.setText(f"✓ Exported to {written.name}")
+            QMessageBox.information(
+                self, "Export Complete",
+                f"Exported {len(data)} records to:\n{written}"
+            )
+
+        except Exception as e:
+            QMessageBox.warning(self, "Export Error", str(e))
+
     def _copy_json(self):
         """Copy JSON to clipboard."""
         if not self._current_result:
@@ -14,7 +14,38 @@ except ImportError as e:
     validate_output = None
     _import_error = str(e)
 
+from vcollector.validation.parse_cache import (
+    ParseCacheStats,
+    ParseResultCache,
+    get_parse_cache,
+)
+from vcollector.validation.postprocess import PostProcessPool, clean_output
+from vcollector.validation.template_cache import (
+    TemplateCache,
+    TemplateCacheStats,
+    get_template_cache,
+)
+from vcollector.validation.template_index import TemplateIndex, get_template_index
+from vcollector.validation.template_routes import (
+    TemplateRouteStats,
+    TemplateRouteTable,
+    get_template_routes,
+)
+
 __all__ = [
+    "ParseCacheStats",
+    "ParseResultCache",
+    "get_parse_cache",
+    "PostProcessPool",
+    "clean_output",
+    "TemplateCache",
+    "TemplateCacheStats",
+    "get_template_cache",
+    "TemplateIndex",
+    "get_template_index",
+    "TemplateRouteStats",
+    "TemplateRouteTable",
+    "get_template_routes",
     "ValidationEngine",
     "ValidationResult",
     "validate_output",
@@ -0,0 +1,404 @@
+"""
+Parse Cache - On-disk TextFSM results keyed by output and template content.
+
+Path: vcollector/validation/parse_cache.py
+
+The export dialog, template tester, coverage analyzer and report server
+all search the same templates over the same capture files, run after run.
+ParseResultCache remembers, in ~/.vcollector/parse_cache.db:
+
+- parses: records of one template on one output,
+  keyed by (sha256 of the output, template content hash)
+- best: the winner of a search over a candidate list,
+  keyed by (sha256 of the output, candidate list hash, scorer)
+
+The candidate list hash covers every candidate's name and content hash,
+so editing one template only invalidates the searches it took part in,
+and those re-parse only the edited template - every other candidate's
+records come from the parses table. Empty parses are not stored (the
+prefilter rejects most of them for less than a lookup costs).
+
+Scores are not shared between consumers: each scores with its own
+function, named by the scorer key.
+
+Least recently used entries are evicted once stored records exceed
+max_bytes. Set VCOLLECTOR_NO_PARSE_CACHE=1 (or use a tool's --no-cache)
+to bypass the cache.
+
+Usage:
+    cache = get_parse_cache()
+    template, records, score = cache.best_template(
+        output, templates,
+        parse=lambda t: parse_with(t, output),
+        score=lambda records, t: score_records(records, t, output),
+        scorer="coverage_analyzer",
+    )
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from vcollector.core.db import connect
+from vcollector.validation.template_cache import CONTENT_HASH_KEY, content_hash
+
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Environment variable that turns get_parse_cache() off
+DISABLE_ENV = 'VCOLLECTOR_NO_PARSE_CACHE'
+
+# Stored records are checked against max_bytes every this many writes
+_EVICT_CHECK_WRITES = 200
+
+# Rough size charged for a best row
+_BEST_ROW_BYTES = 200
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS parses (
+    output_sha256 TEXT NOT NULL,
+    template_hash TEXT NOT NULL,
+    records BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    used_at REAL NOT NULL,
+    PRIMARY KEY (output_sha256, template_hash)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_parses_used_at ON parses(used_at);
+
+CREATE TABLE IF NOT EXISTS best (
+    output_sha256 TEXT NOT NULL,
+    candidates TEXT NOT NULL,
+    scorer TEXT NOT NULL,
+    template_hash TEXT,
+    score REAL NOT NULL,
+    used_at REAL NOT NULL,
+    PRIMARY KEY (output_sha256, candidates, scorer)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_best_used_at ON best(used_at);
+"""
+
+
+@dataclass
+class ParseCacheStats:
+    """Counters for parse cache use."""
+    best_hits: int = 0     # Whole search answered from the cache
+    best_misses: int = 0   # Search ran (candidates may still hit)
+    parse_hits: int = 0    # Candidate records loaded instead of parsed
+    parse_misses: int = 0  # Candidate tried (parsed or prefiltered)
+    evictions: int = 0     # Entries dropped to stay under max_bytes
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.best_hits + self.best_misses
+        return self.best_hits / total if total else 0.0
+
+    def __repr__(self) -> str:
+        return (f"ParseCacheStats(best_hits={self.best_hits}, best_misses={self.best_misses}, "
+                f"hit_rate={self.hit_rate:.0%}, parse_hits={self.parse_hits}, "
+                f"parse_misses={self.parse_misses}, evictions={self.evictions})")
+
+
+def output_key(output: str) -> str:
+    """sha256 of output text."""
+    return hashlib.sha256(output.encode('utf-8', errors='replace')).hexdigest()
+
+
+def _template_hash(template: Mapping) -> str:
+    try:
+        return template[CONTENT_HASH_KEY]
+    except (KeyError, IndexError):
+        return content_hash(template['textfsm_content'] or '')
+
+
+def candidates_key(templates: Sequence[Mapping]) -> str:
+    """Hash of a candidate list (names, content and order)."""
+    digest = hashlib.sha1()
+    for template in templates:
+        digest.update(f"{template['cli_command']}:{_template_hash(template)}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+
+class ParseResultCache:
+    """
+    SQLite-backed cache of TextFSM parse results.
+
+    Thread-safe; safe to share between processes (WAL mode).
+    """
+
+    def __init__(self, path: Optional[Path] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Initialize parse cache.
+
+        Args:
+            path: Cache database. If None, uses ~/.vcollector/parse_cache.db.
+            max_bytes: Stored (compressed) records kept before LRU eviction.
+        """
+        if path is None:
+            path = Path.home() / ".vcollector" / "parse_cache.db"
+
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.stats = ParseCacheStats()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = connect(self.path, check_same_thread=False)  # Guarded by self._lock
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    # -------------------------------------------------------------------------
+    # Lookup
+    # -------------------------------------------------------------------------
+
+    def best_template(
+        self,
+        output: str,
+        templates: Sequence[Mapping],
+        parse: Callable[[Mapping], Optional[List[Dict]]],
+        score: Callable[[List[Dict], Mapping], float],
+        scorer: str,
+        early_exit: Optional[float] = None,
+    ) -> Tuple[Optional[Mapping], List[Dict], float]:
+        """
+        Best of templates for output, searching only what is not cached.
+
+        Args:
+            output: Text being parsed
+            templates: Candidate rows in search order (cli_command, textfsm_content)
+            parse: Parse output with one template; None = rejected without parsing.
+                Exceptions count as no match.
+            score: Score one template's records
+            scorer: Name of the score function (and its thresholds); results
+                are only shared between callers using the same name
+            early_exit: Stop at the first template scoring at least this
+
+        Returns:
+            Tuple of (template row or None, records, score).
+        """
+        out_key = output_key(output)
+        cand_key = candidates_key(templates)
+        by_hash = {_template_hash(t): t for t in templates}
+
+        hit = self._get_best(out_key, cand_key, scorer)
+        if hit is not None:
+            template_hash, best_score = hit
+            if template_hash is None:
+                self._count('best_hits')
+                self._save(out_key, touched=[], parses=[], best=None, best_key=(cand_key, scorer))
+                return None, [], 0.0
+            template = by_hash.get(template_hash)
+            records = self._get_parse(out_key, template_hash) if template is not None else None
+            if records is not None:
+                self._count('best_hits')
+                self._save(out_key, touched=[template_hash], parses=[], best=None, best_key=(cand_key, scorer))
+                return template, records, best_score
+        self._count('best_misses')
+
+        touched: List[str] = []
+        parses: List[Tuple[str, bytes]] = []
+        best: Tuple[Optional[Mapping], List[Dict], float] = (None, [], 0.0)
+        for template in templates:
+            template_hash = _template_hash(template)
+            records = self._get_parse(out_key, template_hash)
+            if records is not None:
+                self._count('parse_hits')
+                touched.append(template_hash)
+            else:
+                self._count('parse_misses')
+                try:
+                    records = parse(template)
+                except Exception as e:
+                    logger.debug(f"{template['cli_command']}: parse failed - {e}")
+                    continue
+                if not records:
+                    continue
+                parses.append((template_hash, zlib.compress(json.dumps(records).encode('utf-8'))))
+
+            template_score = score(records, template)
+            if template_score > best[2]:
+                best = (template, records, template_score)
+                if early_exit is not None and template_score >= early_exit:
+                    break
+
+        winner = _template_hash(best[0]) if best[0] is not None else None
+        self._save(out_key, touched, parses, best=(winner, best[2]), best_key=(cand_key, scorer))
+        return best
+
+    def records(self, out_key: str, template_hash: str) -> Optional[List[Dict]]:
+        """
+        Cached records of one template for one output, if any.
+
+        Args:
+            out_key: output_key() of the output
+            template_hash: Content hash of the template
+        """
+        return self._get_parse(out_key, template_hash)
+
+    def _count(self, name: str):
+        with self._lock:
+            setattr(self.stats, name, getattr(self.stats, name) + 1)
+
+    def _get_best(self, out_key: str, cand_key: str, scorer: str) -> Optional[Tuple[Optional[str], float]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT template_hash, score FROM best "
+                "WHERE output_sha256 = ? AND candidates = ? AND scorer = ?",
+                (out_key, cand_key, scorer),
+            ).fetchone()
+        return (row[0], row[1]) if row is not None else None
+
+    def _get_parse(self, out_key: str, template_hash: str) -> Optional[List[Dict]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT records FROM parses WHERE output_sha256 = ? AND template_hash = ?",
+                (out_key, template_hash),
+            ).fetchone()
+        if row is None:
+            return None
+        try:
+            return json.loads(zlib.decompress(row[0]))
+        except Exception as e:
+            logger.debug(f"Ignoring corrupt parse cache entry: {e}")
+            return None
+
+    # -------------------------------------------------------------------------
+    # Store
+    # -------------------------------------------------------------------------
+
+    def _save(
+        self,
+        out_key: str,
+        touched: List[str],
+        parses: List[Tuple[str, bytes]],
+        best: Optional[Tuple[Optional[str], float]],
+        best_key: Tuple[str, str],
+    ):
+        """
+        Write one search's outcome in a single transaction: new parses, the
+        winner (best=None keeps the stored one) and use times for LRU.
+        """
+        now = time.time()
+        cand_key, scorer = best_key
+        with self._lock:
+            try:
+                with self._conn:
+                    self._conn.executemany(
+                        "UPDATE parses SET used_at = ? WHERE output_sha256 = ? AND template_hash = ?",
+                        [(now, out_key, template_hash) for template_hash in touched],
+                    )
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO parses (output_sha256, template_hash, records, size, used_at) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        [(out_key, template_hash, blob, len(blob), now) for template_hash, blob in parses],
+                    )
+                    if best is None:
+                        self._conn.execute(
+                            "UPDATE best SET used_at = ? "
+                            "WHERE output_sha256 = ? AND candidates = ? AND scorer = ?",
+                            (now, out_key, cand_key, scorer),
+                        )
+                    else:
+                        self._conn.execute(
+                            "INSERT OR REPLACE INTO best "
+                            "(output_sha256, candidates, scorer, template_hash, score, used_at) "
+                            "VALUES (?, ?, ?, ?, ?, ?)",
+                            (out_key, cand_key, scorer, best[0], best[1], now),
+                        )
+            except sqlite3.Error as e:
+                # A busy or read-only cache must not fail the parse it was saving
+                logger.debug(f"Parse cache write failed: {e}")
+                return
+
+            self._writes += len(parses) + (best is not None)
+            if self._writes >= _EVICT_CHECK_WRITES:
+                self._writes = 0
+                self._evict()
+
+    def _evict(self):
+        """Drop least recently used entries down to 80% of max_bytes (caller holds the lock)."""
+        if self._size() <= self.max_bytes:
+            return
+
+        target = self.max_bytes * 0.8
+        kept = 0
+        cutoff = None
+        rows = self._conn.execute(
+            "SELECT used_at, size FROM parses "
+            "UNION ALL SELECT used_at, ? FROM best "
+            "ORDER BY used_at DESC",
+            (_BEST_ROW_BYTES,),
+        )
+        for used_at, size in rows:
+            kept += size
+            if kept > target:
+                cutoff = used_at
+                break
+        if cutoff is None:
+            return
+
+        with self._conn:
+            evicted = self._conn.execute("DELETE FROM parses WHERE used_at <= ?", (cutoff,)).rowcount
+            evicted += self._conn.execute("DELETE FROM best WHERE used_at <= ?", (cutoff,)).rowcount
+        self.stats.evictions += evicted
+        logger.debug(f"Parse cache evicted {evicted} entries ({self.path})")
+
+    def _size(self) -> int:
+        parses = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM parses").fetchone()[0]
+        best = self._conn.execute("SELECT COUNT(*) FROM best").fetchone()[0]
+        return parses + best * _BEST_ROW_BYTES
+
+    # -------------------------------------------------------------------------
+    # Maintenance
+    # -------------------------------------------------------------------------
+
+    def size_bytes(self) -> int:
+        """Bytes charged against max_bytes."""
+        with self._lock:
+            return self._size()
+
+    def clear(self):
+        """Drop every cached result."""
+        with self._lock:
+            self._conn.execute("DELETE FROM parses")
+            self._conn.execute("DELETE FROM best")
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._evict()
+            self._conn.close()
+
+
+_default_cache: Optional[ParseResultCache] = None
+_default_lock = threading.Lock()
+
+
+def get_parse_cache() -> Optional[ParseResultCache]:
+    """
+    Get the process-wide parse cache.
+
+    Returns None when disabled with VCOLLECTOR_NO_PARSE_CACHE or when the
+    cache database cannot be opened.
+    """
+    global _default_cache
+    if os.environ.get(DISABLE_ENV):
+        return None
+    with _default_lock:
+        if _default_cache is None:
+            try:
+                _default_cache = ParseResultCache()
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"Parse cache unavailable: {e}")
+                return None
+        return _default_cache
@@ -0,0 +1,300 @@
+"""
+Post-processing stage - clean and validate output in worker processes.
+
+Path: vcollector/validation/postprocess.py
+
+Output cleaning, TextFSM parsing and scoring are pure CPU work. Run in the
+collector process they compete for the GIL with the paramiko threads doing
+crypto and ANSI filtering. PostProcessPool ships (output, command, filter)
+to a ProcessPoolExecutor of validators and hands back compact results
+(cleaned output plus template/score/record count). Parsed records are only
+sent back when asked for (keep_records), e.g. to be saved with the capture.
+
+Each worker process keeps its own ValidationEngine and template cache.
+If the pool breaks, pending items are processed in-process instead.
+
+Usage:
+    with PostProcessPool(db_path, workers=4) as pool:
+        pool.submit(context, raw_output, "show ip route", "cisco_ios_show_ip_route")
+        for context, result in pool.drain(block=pool.full):
+            ...
+        for context, result in pool.drain(wait_all=True):
+            ...
+"""
+
+import logging
+import multiprocessing
+import re
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+def clean_output(raw_output: str, command: Optional[str] = None) -> str:
+    """
+    Clean raw CLI output for TextFSM parsing.
+
+    Strips everything up to and including the command echo line,
+    and removes trailing prompts.
+
+    Args:
+        raw_output: Raw output from SSH session
+        command: The command that was run (e.g., "show ip arp")
+
+    Returns:
+        Cleaned output suitable for TextFSM parsing
+    """
+    lines = raw_output.split('\n')
+
+    # Find the line containing the command echo
+    if command:
+        # Get the actual show/display command
+        cmd_parts = [c.strip() for c in command.split(',') if c.strip()]
+        main_cmd = None
+        for part in cmd_parts:
+            if part.lower().startswith(('show ', 'display ', 'get ')):
+                main_cmd = part
+                break
+
+        if main_cmd:
+            # Find line containing this command (case-insensitive)
+            cmd_pattern = re.escape(main_cmd)
+            start_idx = 0
+            for i, line in enumerate(lines):
+                if re.search(cmd_pattern, line, re.IGNORECASE):
+                    start_idx = i + 1  # Start after the command line
+                    break
+
+            # Get lines after command, before trailing prompts
+            cleaned_lines = []
+            prompt_pattern = r'^[\w\-\.]+[\#\>\$\)]\s*$'
+
+            for line in lines[start_idx:]:
+                # Skip trailing prompts
+                if re.match(prompt_pattern, line.strip()):
+                    continue
+                cleaned_lines.append(line)
+
+            # Remove trailing empty lines
+            while cleaned_lines and not cleaned_lines[-1].strip():
+                cleaned_lines.pop()
+
+            return '\n'.join(cleaned_lines)
+
+    # Fallback: return as-is if we can't find the command
+    return raw_output
+
+
+@dataclass
+class ValidationSummary:
+    """ValidationResult without the parsed records (cheap to send between processes)."""
+    is_valid: bool
+    template: Optional[str] = None
+    score: float = 0.0
+    record_count: int = 0
+    error: Optional[str] = None
+    routed: bool = False
+    sampled: bool = False
+    template_hash: Optional[str] = None
+    records: Optional[List[Dict]] = None  # All records, only with keep_records
+
+    @classmethod
+    def from_result(cls, result) -> 'ValidationSummary':
+        return cls(
+            is_valid=result.is_valid,
+            template=result.template,
+            score=result.score,
+            record_count=result.record_count,
+            error=result.error,
+            routed=result.routed,
+            sampled=result.sampled,
+            template_hash=result.template_hash,
+        )
+
+
+@dataclass
+class PostProcessResult:
+    """Outcome of cleaning and validating one device's output."""
+    cleaned_output: str
+    filter_string: Optional[str] = None
+    validation: Optional[ValidationSummary] = None  # None = not validated
+    error: Optional[str] = None  # Validation raised (output is still usable)
+
+
+# =============================================================================
+# Worker process side
+# =============================================================================
+
+_worker_engine = None
+
+
+def _make_engine(db_path: Optional[str], min_score: float):
+    """ValidationEngine for this process (templates come from the process-wide cache)."""
+    from vcollector.validation.tfsm_engine import ValidationEngine
+    return ValidationEngine(db_path=db_path, min_score=min_score)
+
+
+def _worker_init(db_path: Optional[str], min_score: float):
+    """Create this worker's engine once, so its template cache survives between items."""
+    global _worker_engine
+    _worker_engine = _make_engine(db_path, min_score)
+
+
+def _process(engine, raw_output: str, command: Optional[str], filter_string: Optional[str],
+             route: Optional[Tuple[str, float]] = None, sample_lines: int = 0,
+             keep_records: bool = False) -> PostProcessResult:
+    cleaned = clean_output(raw_output, command)
+    result = PostProcessResult(cleaned_output=cleaned, filter_string=filter_string)
+
+    if filter_string is not None and engine is not None:
+        preferred, accept_score = route or (None, None)
+        try:
+            validation = engine.validate(cleaned, filter_string, preferred_template=preferred,
+                                         accept_score=accept_score, sample_lines=sample_lines)
+            result.validation = ValidationSummary.from_result(validation)
+            if keep_records and validation.is_valid:
+                result.validation.records = engine.full_records(validation, cleaned, filter_string)
+        except Exception as e:
+            result.error = str(e)
+
+    return result
+
+
+def _worker_process(*args) -> PostProcessResult:
+    return _process(_worker_engine, *args)
+
+
+# =============================================================================
+# Collector process side
+# =============================================================================
+
+class PostProcessPool:
+    """
+    Process pool for cleaning and validating device output.
+
+    Not thread-safe: submit() and drain() are called from one thread
+    (the runner's result callback), which keeps saving and database writes
+    on that thread too.
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        workers: int = 2,
+        max_pending: Optional[int] = None,
+        min_score: float = 0.01,
+    ):
+        """
+        Initialize post-processing pool.
+
+        Args:
+            db_path: Path to tfsm_templates.db (None = default location).
+            workers: Number of worker processes.
+            max_pending: Items in flight before drain(block=pool.full) waits.
+                Bounds memory held for outputs awaiting processing.
+                Default: 4 per worker.
+            min_score: Minimum score for valid output.
+        """
+        self.db_path = db_path
+        self.workers = max(1, workers)
+        self.max_pending = max_pending or self.workers * 4
+        self.min_score = min_score
+
+        self.processed = 0
+        self.fallbacks = 0  # Items processed in-process after the pool broke
+
+        # spawn: the collector process is full of paramiko threads; forking it is unsafe
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_worker_init,
+            initargs=(db_path, min_score),
+        )
+        self._pending: Dict[Future, Tuple[Any, tuple]] = {}  # future -> (context, _process args)
+        self._local_engine = None
+
+    @property
+    def full(self) -> bool:
+        return len(self._pending) >= self.max_pending
+
+    def submit(self, context: Any, raw_output: str, command: Optional[str],
+               filter_string: Optional[str], route: Optional[Tuple[str, float]] = None,
+               sample_lines: int = 0, keep_records: bool = False):
+        """
+        Queue one output for cleaning (and validation, if filter_string is set).
+
+        Args:
+            context: Returned with the result by drain()
+            raw_output: Raw SSH output
+            command: Command that produced it (for echo stripping)
+            filter_string: Template filter, or None to skip validation
+            route: (preferred_template, accept_score) to try before the full
+                candidate sweep, see ValidationEngine.validate()
+            sample_lines: Validate on a sample of longer outputs (0 = whole output)
+            keep_records: Return all parsed records of valid output
+                (ValidationSummary.records)
+        """
+        args = (raw_output, command, filter_string, route, sample_lines, keep_records)
+        try:
+            future = self._executor.submit(_worker_process, *args)
+        except Exception as e:
+            # Broken or shut-down pool - finish it here and hand back via a done future
+            logger.debug(f"Post-process pool unavailable, processing in-process: {e}")
+            future = Future()
+            future.set_result(self._process_locally(*args))
+        self._pending[future] = (context, args)
+
+    def drain(self, block: bool = False, wait_all: bool = False) -> Iterator[Tuple[Any, PostProcessResult]]:
+        """
+        Yield (context, result) for finished items.
+
+        Args:
+            block: Wait for at least one item to finish
+            wait_all: Wait for every pending item
+        """
+        if not self._pending:
+            return
+
+        if wait_all:
+            done, _ = wait(list(self._pending))
+        elif block:
+            done, _ = wait(list(self._pending), return_when=FIRST_COMPLETED)
+        else:
+            done = [f for f in self._pending if f.done()]
+
+        for future in done:
+            context, args = self._pending.pop(future)
+            try:
+                result = future.result()
+                self.processed += 1
+            except Exception as e:
+                logger.warning(f"Post-process worker failed ({e}), processing in-process")
+                result = self._process_locally(*args)
+            yield context, result
+
+    def _process_locally(self, raw_output: str, command: Optional[str], filter_string: Optional[str],
+                         route: Optional[Tuple[str, float]] = None, sample_lines: int = 0,
+                         keep_records: bool = False) -> PostProcessResult:
+        self.fallbacks += 1
+        if filter_string is not None and self._local_engine is None:
+            try:
+                self._local_engine = _make_engine(self.db_path, self.min_score)
+            except Exception as e:
+                logger.warning(f"In-process validation unavailable: {e}")
+        return _process(self._local_engine, raw_output, command, filter_string, route,
+                        sample_lines, keep_records)
+
+    def close(self):
+        """Shut down worker processes (pending items are abandoned)."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._pending.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
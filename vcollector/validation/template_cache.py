@@ -0,0 +1,443 @@
+"""
+Template Cache - Compiled TextFSM templates shared across validations.
+
+Path: vcollector/validation/template_cache.py
+
+Every validation used to re-run the templates LIKE query and compile each
+candidate with textfsm.TextFSM(). On a large job the same few dozen
+templates were compiled tens of thousands of times. TemplateCache keeps,
+per process:
+
+- filtered template rows, keyed by (db path, filter string)
+- compiled TextFSM objects, keyed by (template id, content hash), LRU
+
+TextFSM objects hold parse state, so they are leased: a thread gets an
+instance nobody else is using, Reset() it, parses, and hands it back. A
+few idle instances are kept per template for concurrent threads.
+
+When a template is compiled its prefilter signature is kept too: the
+Start-state rules that can capture a value or leave Start. A template
+none of whose signature rules match any line of the output cannot produce
+a record, so may_match() rejects it without a full ParseText: if every
+such rule begins with literal text ("^Interface\s+IP") and no line starts
+with one, by a regex search over the whole output at C speed; otherwise
+by walking the Start state line by line exactly as TextFSM does, without
+its value and record bookkeeping, and stopping at the first line that
+would get past it. The output is split into lines once per thread, not
+once per candidate.
+
+Everything is dropped when tfsm_templates.db changes on disk (size or
+mtime of the db or its -wal file).
+
+Usage:
+    cache = get_template_cache()
+    rows = cache.templates(db_path, filter_string,
+                           lambda: engine._get_filtered_templates(conn, filter_string))
+    for template in rows:
+        header, parsed = cache.parse(template, output)
+    print(cache.stats)
+"""
+
+import hashlib
+import io
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Pattern, Tuple
+
+try:
+    import textfsm
+    TEXTFSM_AVAILABLE = True
+except ImportError:
+    TEXTFSM_AVAILABLE = False
+
+
+logger = logging.getLogger(__name__)
+
+
+# Key added to cached template rows
+CONTENT_HASH_KEY = '_content_hash'
+
+# Literal text at the start of a rule regex (no metacharacters)
+_LITERAL_PREFIX = re.compile(r'\^([\w ,:;/"\'<>=@#%&!~-]+)')
+
+# Any character str.splitlines() does not break a line on
+_NOT_LINE_BREAK = r'[^\n\r\x0b\x0c\x1c-\x1e\x85\u2028\u2029]'
+
+
+@dataclass
+class TemplateCacheStats:
+    """Counters for template cache use."""
+    hits: int = 0           # Compiled template reused
+    misses: int = 0         # Template compiled
+    evictions: int = 0      # Templates dropped by LRU
+    invalidations: int = 0  # Cache cleared because the db changed
+    query_hits: int = 0     # Filtered rows served from memory
+    query_misses: int = 0   # Filtered rows loaded from the db
+    prefilter_checks: int = 0   # Candidates tested against their signature
+    prefilter_rejects: int = 0  # Candidates discarded without parsing
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    @property
+    def rejection_rate(self) -> float:
+        return self.prefilter_rejects / self.prefilter_checks if self.prefilter_checks else 0.0
+
+    def __repr__(self) -> str:
+        return (f"TemplateCacheStats(hits={self.hits}, misses={self.misses}, "
+                f"hit_rate={self.hit_rate:.0%}, evictions={self.evictions}, "
+                f"invalidations={self.invalidations}, query_hits={self.query_hits}, "
+                f"query_misses={self.query_misses}, prefilter_checks={self.prefilter_checks}, "
+                f"prefilter_rejects={self.prefilter_rejects}, "
+                f"rejection_rate={self.rejection_rate:.0%})")
+
+
+@dataclass
+class _StartRule:
+    pattern: Pattern
+    literal: Optional[str]  # Text a matching line must start with
+    signature: bool         # Captures a value or leaves Start
+    line_op: str
+    new_state: str
+
+
+@dataclass
+class StartSignature:
+    """Start-state rules a template needs to match before it can record anything."""
+    rules: Tuple[_StartRule, ...]
+    literals: Optional[Tuple[str, ...]]  # Set when every signature rule has a literal prefix
+    literal_patterns: Tuple[Pattern, ...] = ()  # One per literal, see _line_start_pattern()
+
+    def may_match(self, text: str, split: Callable[[str], List[str]] = str.splitlines) -> bool:
+        """
+        Check text against the signature.
+
+        Args:
+            text: Device output.
+            split: Returns text's lines; called only if the literal check passes.
+        """
+        if not any(rule.signature for rule in self.rules):
+            return False
+        if self.literal_patterns and not any(p.search(text) for p in self.literal_patterns):
+            return False
+
+        # Same rule order and line ops as TextFSM._CheckLine in the Start state
+        for line in split(text):
+            for rule in self.rules:
+                if rule.literal and not line.startswith(rule.literal):
+                    continue
+                if not rule.pattern.match(line):
+                    continue
+                if rule.signature:
+                    return True
+                if rule.line_op == 'Error' or rule.new_state in ('End', 'EOF'):
+                    return False  # Parse raises or stops with nothing recorded
+                if rule.line_op != 'Continue':
+                    break
+        return False
+
+
+@dataclass
+class _CompiledTemplate:
+    """Idle TextFSM objects for one template, plus its prefilter signature."""
+    signature: StartSignature
+    idle: List[Any] = field(default_factory=list)
+
+
+def content_hash(content: str) -> str:
+    """Digest of template text, used to tell edited templates apart."""
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+
+def _template_key(template: Mapping) -> Tuple[Any, str]:
+    try:
+        digest = template[CONTENT_HASH_KEY]
+    except (KeyError, IndexError):
+        digest = content_hash(template['textfsm_content'])
+    try:
+        template_id = template['id']
+    except (KeyError, IndexError):
+        template_id = template['cli_command']
+    return template_id, digest
+
+
+def _literal_prefix(regex: str) -> Optional[str]:
+    """Text every line matching regex must start with, if any."""
+    if '|' in regex:
+        return None
+    m = _LITERAL_PREFIX.match(regex)
+    if not m:
+        return None
+    literal = m.group(1)
+    if regex[m.end():m.end() + 1] in ('?', '*', '{'):
+        literal = literal[:-1]  # Last character is optional
+    return literal or None
+
+
+def _line_start_pattern(literal: str) -> Pattern:
+    """
+    Regex finding literal at the start of a line of a whole text.
+
+    Lines are cut as str.splitlines() cuts them. The pattern leads with the
+    literal, so re scans for it at C speed, then looks back to reject hits
+    that follow a non-break character.
+    """
+    escaped = re.escape(literal)
+    return re.compile(r'%s(?<!%s%s)' % (escaped, _NOT_LINE_BREAK, escaped))
+
+
+def start_signature(fsm: Any) -> StartSignature:
+    """Signature of a compiled template for may_match()."""
+    rules = []
+    for rule in fsm.states.get('Start', []):
+        if rule.line_op == 'Error':
+            signature = False
+        else:
+            leaves_start = rule.new_state not in ('', 'Start', 'End', 'EOF')
+            signature = '(?P<' in rule.regex or leaves_start
+        rules.append(_StartRule(
+            pattern=rule.regex_obj,
+            literal=_literal_prefix(rule.regex),
+            signature=signature,
+            line_op=rule.line_op,
+            new_state=rule.new_state,
+        ))
+
+    literals = tuple(rule.literal for rule in rules if rule.signature)
+    if not all(literals):
+        return StartSignature(rules=tuple(rules), literals=None)
+    return StartSignature(rules=tuple(rules), literals=literals,
+                          literal_patterns=tuple(_line_start_pattern(lit) for lit in set(literals)))
+
+
+def db_signature(db_path: str) -> Optional[Tuple]:
+    """(size, mtime) of the db and its WAL file, or None if missing."""
+    signature = []
+    for path in (db_path, db_path + '-wal'):
+        try:
+            st = os.stat(path)
+            signature.append((st.st_size, st.st_mtime_ns))
+        except OSError:
+            signature.append(None)
+    return tuple(signature) if signature[0] else None
+
+
+class TemplateCache:
+    """
+    Process-wide cache of template rows and compiled TextFSM objects.
+
+    Thread-safe. Compiled objects are only ever used by one thread at a time.
+    """
+
+    def __init__(
+        self,
+        max_templates: int = 512,
+        max_instances: int = 8,
+        max_queries: int = 256,
+    ):
+        """
+        Initialize template cache.
+
+        Args:
+            max_templates: Distinct compiled templates kept (LRU).
+            max_instances: Idle compiled copies kept per template (one per
+                concurrently parsing thread is enough).
+            max_queries: Distinct (db, filter) row lists kept (LRU).
+        """
+        self.max_templates = max_templates
+        self.max_instances = max_instances
+        self.max_queries = max_queries
+
+        self.stats = TemplateCacheStats()
+        self._compiled: 'OrderedDict[Tuple[Any, str], _CompiledTemplate]' = OrderedDict()
+        self._queries: 'OrderedDict[Tuple[str, Optional[str]], List[dict]]' = OrderedDict()
+        self._signatures: Dict[str, Optional[Tuple]] = {}
+        self._lock = threading.Lock()
+        self._split = threading.local()  # Last output split by each thread
+
+    # -------------------------------------------------------------------------
+    # Template rows
+    # -------------------------------------------------------------------------
+
+    def check_db(self, db_path: str) -> bool:
+        """
+        Clear the cache if db_path changed since it was last seen.
+
+        Returns:
+            True if the cache was invalidated.
+        """
+        db_path = str(db_path)
+        signature = db_signature(db_path)
+        with self._lock:
+            if db_path not in self._signatures:
+                self._signatures[db_path] = signature
+                return False
+            if self._signatures[db_path] == signature:
+                return False
+            self._signatures[db_path] = signature
+            self._compiled.clear()
+            self._queries.clear()
+            self.stats.invalidations += 1
+
+        logger.info(f"Template database changed, template cache cleared: {db_path}")
+        return True
+
+    def templates(
+        self,
+        db_path: str,
+        filter_string: Optional[str],
+        loader: Callable[[], Iterable[Mapping]],
+    ) -> List[dict]:
+        """
+        Get filtered template rows, loading them with loader() on a miss.
+
+        Rows are returned as dicts with a content hash added, and must not be
+        modified by the caller.
+        """
+        db_path = str(db_path)
+        self.check_db(db_path)
+        key = (db_path, filter_string)
+
+        with self._lock:
+            rows = self._queries.get(key)
+            if rows is not None:
+                self._queries.move_to_end(key)
+                self.stats.query_hits += 1
+                return rows
+
+        rows = []
+        for row in loader():
+            row = dict(row)
+            row[CONTENT_HASH_KEY] = content_hash(row.get('textfsm_content') or '')
+            rows.append(row)
+
+        with self._lock:
+            self.stats.query_misses += 1
+            self._queries[key] = rows
+            while len(self._queries) > self.max_queries:
+                self._queries.popitem(last=False)
+        return rows
+
+    # -------------------------------------------------------------------------
+    # Compiled templates
+    # -------------------------------------------------------------------------
+
+    @contextmanager
+    def lease(self, template: Mapping) -> Iterator[Any]:
+        """
+        Lease a reset TextFSM object for template.
+
+        The object is exclusively the caller's inside the with block.
+        """
+        key = _template_key(template)
+        fsm = None
+
+        with self._lock:
+            entry = self._compiled.get(key)
+            if entry is not None:
+                self._compiled.move_to_end(key)
+                if entry.idle:
+                    fsm = entry.idle.pop()
+            if fsm is not None:
+                self.stats.hits += 1
+            else:
+                self.stats.misses += 1
+
+        if fsm is None:
+            fsm = textfsm.TextFSM(io.StringIO(template['textfsm_content']))
+        else:
+            fsm.Reset()
+
+        try:
+            yield fsm
+        finally:
+            self._give_back(key, fsm)
+
+    def parse(self, template: Mapping, text: str) -> Tuple[List[str], List[list]]:
+        """
+        Parse text with a cached compiled template.
+
+        Returns:
+            Tuple of (header, rows).
+        """
+        with self.lease(template) as fsm:
+            rows = fsm.ParseText(text)
+            return list(fsm.header), rows
+
+    def may_match(self, template: Mapping, text: str) -> bool:
+        """
+        Cheap check whether template could parse any record from text.
+
+        False means ParseText would return nothing; True means it might.
+        The literal check searches text directly; when lines are needed the
+        output is split once per thread and reused while candidates are
+        checked against the same text object.
+        """
+        key = _template_key(template)
+        with self._lock:
+            entry = self._compiled.get(key)
+        if entry is None:
+            # Compile now; the object is kept for the parse that usually follows
+            with self.lease(template):
+                pass
+            with self._lock:
+                entry = self._compiled.get(key)
+            if entry is None:
+                return True
+
+        possible = entry.signature.may_match(text, self._lines)
+        with self._lock:
+            self.stats.prefilter_checks += 1
+            if not possible:
+                self.stats.prefilter_rejects += 1
+        return possible
+
+    def _lines(self, text: str) -> List[str]:
+        """text.splitlines(), kept for this thread until it checks another text."""
+        split = self._split
+        if getattr(split, 'text', None) is not text:
+            split.text = text
+            split.lines = text.splitlines()
+        return split.lines
+
+    def _give_back(self, key: Tuple[Any, str], fsm: Any):
+        with self._lock:
+            entry = self._compiled.get(key)
+            if entry is None:
+                entry = self._compiled[key] = _CompiledTemplate(signature=start_signature(fsm))
+                while len(self._compiled) > self.max_templates:
+                    self._compiled.popitem(last=False)
+                    self.stats.evictions += 1
+            if len(entry.idle) < self.max_instances:
+                entry.idle.append(fsm)
+
+    def clear(self):
+        """Drop all cached rows and compiled templates."""
+        with self._lock:
+            self._compiled.clear()
+            self._queries.clear()
+            self._signatures.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._compiled)
+
+
+_default_cache: Optional[TemplateCache] = None
+_default_lock = threading.Lock()
+
+
+def get_template_cache() -> TemplateCache:
+    """Get the process-wide template cache."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = TemplateCache()
+        return _default_cache
@@ -0,0 +1,194 @@
+"""
+Template Index - In-memory token index over template names.
+
+Path: vcollector/validation/template_index.py
+
+Template filters ("cisco_ios_show_ip_arp") used to become
+"cli_command LIKE '%cisco%' AND cli_command LIKE '%ios%' ..." queries - a
+full scan of the templates table for every device output. TemplateIndex
+reads (rowid, cli_command) once, splits each name on '_' into lowercase
+tokens, and answers the same filter with set intersections:
+
+    a template matches when every filter term longer than 2 characters
+    is a substring of its cli_command (case-insensitive)
+
+A term cannot contain '_', so it can only match inside one name token;
+term -> rowids is the union over tokens containing the term, memoized per
+term. Results are in rowid order, the order the unordered SELECT scanned.
+
+The index is rebuilt when tfsm_templates.db changes on disk.
+
+Usage:
+    index = get_template_index(db_path)
+    rowids = index.match("cisco_ios_show_ip_arp")
+    rows = index.fetch(connection, "cisco_ios_show_ip_arp")
+"""
+
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Optional, Set
+
+from vcollector.core.db import connect
+from vcollector.validation.template_cache import db_signature
+
+
+logger = logging.getLogger(__name__)
+
+
+# SQLite default SQLITE_MAX_VARIABLE_NUMBER on older builds is 999
+_FETCH_CHUNK = 500
+
+
+def filter_terms(filter_string: Optional[str]) -> List[str]:
+    """Terms a filter string is matched on (same split as the LIKE queries)."""
+    if not filter_string:
+        return []
+    terms = filter_string.replace('-', '_').split('_')
+    return [term.lower() for term in terms if term and len(term) > 2]
+
+
+class TemplateIndex:
+    """
+    Token index over the templates table of one tfsm_templates.db.
+
+    Thread-safe. Shared per database path via get_template_index().
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Initialize template index.
+
+        Args:
+            db_path: Path to tfsm_templates.db
+        """
+        self.db_path = str(db_path)
+        self._signature = None
+        self._rowids: List[int] = []  # Rowid order
+        self._commands: Dict[int, str] = {}
+        self._tokens: Dict[str, Set[int]] = {}
+        self._term_matches: Dict[str, FrozenSet[int]] = {}
+        self._lock = threading.Lock()
+
+    def _build(self):
+        """Read names from the db (caller holds the lock)."""
+        conn = connect(self.db_path, readonly=True)
+        try:
+            rows = conn.execute("SELECT rowid, cli_command FROM templates ORDER BY rowid").fetchall()
+        finally:
+            conn.close()
+
+        self._rowids = [rowid for rowid, _ in rows]
+        self._commands = {}
+        self._tokens = {}
+        self._term_matches = {}
+        for rowid, cli_command in rows:
+            if cli_command is None:
+                continue  # LIKE never matches NULL
+            self._commands[rowid] = cli_command
+            for token in cli_command.lower().split('_'):
+                if token:
+                    self._tokens.setdefault(token, set()).add(rowid)
+
+        logger.debug(f"Template index built: {len(self._rowids)} templates, "
+                     f"{len(self._tokens)} tokens ({self.db_path})")
+
+    def refresh(self) -> bool:
+        """
+        Build the index, or rebuild it if the db changed.
+
+        Returns:
+            True if the index was (re)built.
+        """
+        signature = db_signature(self.db_path)
+        with self._lock:
+            if signature == self._signature and self._signature is not None:
+                return False
+            self._build()
+            self._signature = signature
+            return True
+
+    def _term_rowids(self, term: str) -> FrozenSet[int]:
+        """Rowids whose name contains term (caller holds the lock)."""
+        matches = self._term_matches.get(term)
+        if matches is None:
+            found: Set[int] = set()
+            for token, rowids in self._tokens.items():
+                if term in token:
+                    found |= rowids
+            matches = self._term_matches[term] = frozenset(found)
+        return matches
+
+    def match(self, filter_string: Optional[str] = None) -> List[int]:
+        """
+        Rowids of templates matching filter_string, in rowid order.
+
+        No usable terms matches every template.
+        """
+        self.refresh()
+        terms = filter_terms(filter_string)
+
+        with self._lock:
+            if not terms:
+                return list(self._rowids)
+
+            # Rarest term first keeps the intersection small
+            sets = sorted((self._term_rowids(term) for term in terms), key=len)
+            result = set(sets[0])
+            for matches in sets[1:]:
+                result &= matches
+                if not result:
+                    return []
+            return sorted(result)
+
+    def commands(self, filter_string: Optional[str] = None) -> List[str]:
+        """Template names matching filter_string."""
+        rowids = self.match(filter_string)
+        with self._lock:
+            return [self._commands[r] for r in rowids if r in self._commands]
+
+    def fetch(self, connection: sqlite3.Connection,
+              filter_string: Optional[str] = None) -> List[sqlite3.Row]:
+        """
+        Load full template rows matching filter_string.
+
+        Args:
+            connection: Connection to this index's db (its row_factory is used)
+            filter_string: Template filter
+
+        Returns:
+            Rows as from "SELECT * FROM templates", in rowid order.
+        """
+        rowids = self.match(filter_string)
+        if not filter_terms(filter_string):
+            return connection.execute("SELECT * FROM templates").fetchall()
+
+        rows = []
+        for i in range(0, len(rowids), _FETCH_CHUNK):
+            chunk = rowids[i:i + _FETCH_CHUNK]
+            placeholders = ','.join('?' * len(chunk))
+            rows.extend(connection.execute(
+                f"SELECT * FROM templates WHERE rowid IN ({placeholders}) ORDER BY rowid",
+                chunk,
+            ).fetchall())
+        return rows
+
+    def __len__(self) -> int:
+        self.refresh()
+        with self._lock:
+            return len(self._rowids)
+
+
+_indexes: Dict[str, TemplateIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_template_index(db_path: str) -> TemplateIndex:
+    """Get the process-wide index for a template database."""
+    key = str(Path(db_path).expanduser().resolve())
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = TemplateIndex(key)
+        return index
@@ -0,0 +1,177 @@
+"""
+Template Routes - Remember which template won per platform and filter.
+
+Path: vcollector/validation/template_routes.py
+
+For a given platform and template filter the winning template almost never
+changes between runs, yet every validation scored every candidate. The
+route table records the last winner per (platform, filter) so validation
+can try it first and skip the sweep when it scores well enough. Routes are
+learned from full sweeps only, and are all dropped when tfsm_templates.db
+changes.
+
+Routes are kept in ~/.vcollector/template_routes.json and written
+atomically on save().
+
+Usage:
+    routes = get_template_routes()
+    routes.bind(db_path)
+    preferred = routes.get(platform, filter_string)
+    result = engine.validate(output, filter_string, preferred_template=preferred)
+    if result.is_valid and not result.routed:
+        routes.record(platform, filter_string, result.template)
+    routes.save()
+"""
+
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from vcollector.core.shared import ProcessWide, write_text
+from vcollector.validation.template_cache import db_signature
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TemplateRouteStats:
+    """Counters for template route use."""
+    hits: int = 0     # Routed template accepted, sweep skipped
+    misses: int = 0   # No route - full sweep
+    rejects: int = 0  # Routed template scored too low - full sweep
+
+    @property
+    def lookups(self) -> int:
+        return self.hits + self.misses + self.rejects
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def __repr__(self) -> str:
+        return (f"TemplateRouteStats(hits={self.hits}, misses={self.misses}, "
+                f"rejects={self.rejects}, hit_rate={self.hit_rate:.0%})")
+
+
+def _fingerprint(db_path: str) -> Optional[str]:
+    signature = db_signature(str(Path(db_path).expanduser()))
+    if signature is None:
+        return None
+    size, mtime_ns = signature[0]
+    return f"{size}:{mtime_ns}"
+
+
+class TemplateRouteTable:
+    """
+    Persistent (platform, filter) -> winning template map.
+
+    Thread-safe; shared by all runners in a process.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Initialize route table.
+
+        Args:
+            path: JSON file to persist routes in. If None, uses default location.
+        """
+        if path is None:
+            path = Path.home() / ".vcollector" / "template_routes.json"
+
+        self.path = Path(path)
+        self._data: Optional[dict] = None  # {'template_db': fingerprint, 'routes': {key: record}}
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(platform: Optional[str], filter_string: str) -> str:
+        return f"{(platform or '').lower()}|{filter_string}"
+
+    def _load(self) -> dict:
+        """Load routes from disk on first use (caller holds the lock)."""
+        if self._data is None:
+            self._data = {'template_db': None, 'routes': {}}
+            try:
+                if self.path.exists():
+                    data = json.loads(self.path.read_text())
+                    if isinstance(data, dict) and isinstance(data.get('routes'), dict):
+                        self._data = data
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable template routes {self.path}: {e}")
+        return self._data
+
+    def bind(self, db_path: str) -> bool:
+        """
+        Tie the routes to a template database, dropping them if it changed.
+
+        Returns:
+            True if existing routes were dropped.
+        """
+        fingerprint = _fingerprint(db_path)
+        with self._lock:
+            data = self._load()
+            if data.get('template_db') == fingerprint:
+                return False
+            dropped = bool(data['routes'])
+            data['template_db'] = fingerprint
+            data['routes'] = {}
+            self._dirty = True
+
+        if dropped:
+            logger.info("Template database changed, learned template routes cleared")
+        return dropped
+
+    def get(self, platform: Optional[str], filter_string: str) -> Optional[str]:
+        """Last winning template for platform/filter, or None."""
+        with self._lock:
+            record = self._load()['routes'].get(self._key(platform, filter_string))
+            return record.get('template') if record else None
+
+    def record(self, platform: Optional[str], filter_string: str, template: str):
+        """Record the winner of a full candidate sweep."""
+        with self._lock:
+            routes = self._load()['routes']
+            key = self._key(platform, filter_string)
+            old = routes.get(key)
+            if not old or old.get('template') != template:
+                routes[key] = {
+                    'template': template,
+                    'updated_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+                }
+                self._dirty = True
+
+    def forget(self, platform: Optional[str], filter_string: str):
+        """Drop one route so the next validation sweeps."""
+        with self._lock:
+            if self._load()['routes'].pop(self._key(platform, filter_string), None) is not None:
+                self._dirty = True
+
+    def save(self):
+        """Write routes to disk if anything changed."""
+        with self._lock:
+            if not self._dirty or self._data is None:
+                return
+            data = json.dumps(self._data, indent=1, sort_keys=True)
+            self._dirty = False
+
+        try:
+            write_text(self.path, data)
+        except Exception as e:
+            logger.warning(f"Failed to save template routes {self.path}: {e}")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._load()['routes'])
+
+
+_default_routes = ProcessWide(TemplateRouteTable)
+
+
+def get_template_routes() -> TemplateRouteTable:
+    """Get the process-wide template route table."""
+    return _default_routes.get()
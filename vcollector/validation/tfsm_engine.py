@@ -4,6 +4,11 @@ TextFSM Validation Engine - Based on tfsm_fire.
 Validates collected output against TextFSM templates.
 Only output with score > 0 is considered valid.
 
+Large outputs can be scored on a sample instead of in full
+(sample_lines=N): the head, a middle window and the tail, cut at record
+boundaries. parsed_data then holds the sample's records only; use
+try_template() with the winning template when all records are needed.
+
 Usage:
     engine = ValidationEngine(db_path="~/.vcollector/tfsm_templates.db")
     result = engine.validate(output, filter_string="cisco_ios_show_version")
@@ -19,8 +24,6 @@ Usage:
 """
 
 import sqlite3
-import threading
-import io
 from contextlib import contextmanager
 from dataclasses import dataclass
 from pathlib import Path
@@ -32,6 +35,10 @@ try:
 except ImportError:
     TEXTFSM_AVAILABLE = False
 
+from vcollector.core.db import ThreadLocalConnections
+from vcollector.validation.template_cache import CONTENT_HASH_KEY, TemplateCache, get_template_cache
+from vcollector.validation.template_index import get_template_index
+
 
 @dataclass
 class ValidationResult:
@@ -41,6 +48,9 @@ class ValidationResult:
     parsed_data: Optional[List[Dict]] = None
     score: float = 0.0
     error: Optional[str] = None
+    routed: bool = False  # Preferred template accepted without a full sweep
+    sampled: bool = False  # Scored on a sample; parsed_data is partial
+    template_hash: Optional[str] = None  # Content hash of the winning template
     
     @property
     def record_count(self) -> int:
@@ -48,34 +58,79 @@ class ValidationResult:
         return len(self.parsed_data) if self.parsed_data else 0
 
 
+# How far a window edge may move to reach a record start
+_ALIGN_LINES = 64
+
+
+def _is_record_start(line: str) -> bool:
+    """Line that starts a record (not blank, not an indented continuation)."""
+    return bool(line) and not line[0].isspace()
+
+
+def _align(lines: List[str], index: int, step: int, limit: int) -> int:
+    """
+    Move index by step to the nearest record start, within _ALIGN_LINES and
+    without crossing limit. Tables whose rows are all indented have no
+    record starts nearby; their edges stay where they are.
+    """
+    i = index
+    for _ in range(_ALIGN_LINES):
+        if i == limit or not 0 <= i < len(lines):
+            break
+        if _is_record_start(lines[i]):
+            return i
+        i += step
+    return index
+
+
+def sample_output(text: str, max_lines: int) -> Optional[str]:
+    """
+    Representative sample of a long output, or None if it is short enough.
+
+    Half the budget goes to the head (headers and first records), a quarter
+    each to a window in the middle and to the tail (totals and trailers).
+    Window edges are moved to record starts so multi-line records
+    (e.g. show interfaces blocks) stay whole.
+    """
+    if max_lines <= 0:
+        return None
+    lines = text.splitlines()
+    if len(lines) <= max_lines:
+        return None
+
+    head_size = max(1, max_lines // 2)
+    middle_size = max(1, max_lines // 4)
+    tail_size = max(1, max_lines - head_size - middle_size)
+
+    head_end = _align(lines, head_size, -1, 1)
+    middle_start = _align(lines, (len(lines) - middle_size) // 2, 1, len(lines))
+    middle_end = _align(lines, middle_start + middle_size, -1, middle_start + 1)
+    tail_start = _align(lines, len(lines) - tail_size, 1, len(lines) - 1)
+
+    sample = lines[:head_end] + lines[middle_start:middle_end] + lines[tail_start:]
+    return '\n'.join(sample)
+
+
 class ThreadSafeConnection:
-    """Thread-local storage for SQLite connections."""
+    """Thread-local, read-only connections to the templates database."""
 
     def __init__(self, db_path: str, verbose: bool = False):
         self.db_path = db_path
         self.verbose = verbose
-        self._local = threading.local()
+        self._connections = ThreadLocalConnections(db_path, readonly=True)
 
     @contextmanager
     def get_connection(self):
         """Get a thread-local connection."""
-        if not hasattr(self._local, 'connection'):
-            self._local.connection = sqlite3.connect(self.db_path)
-            self._local.connection.row_factory = sqlite3.Row
-
         try:
-            yield self._local.connection
-        except Exception as e:
-            if hasattr(self._local, 'connection'):
-                self._local.connection.close()
-                delattr(self._local, 'connection')
-            raise e
+            yield self._connections.get()
+        except Exception:
+            self._connections.discard()
+            raise
 
     def close_all(self):
-        """Close connection if it exists for current thread."""
-        if hasattr(self._local, 'connection'):
-            self._local.connection.close()
-            delattr(self._local, 'connection')
+        """Close every thread's connection."""
+        self._connections.close_all()
 
 
 class ValidationEngine:
@@ -97,6 +152,7 @@ class ValidationEngine:
         db_path: Optional[str] = None,
         min_score: float = 0.01,
         verbose: bool = False,
+        template_cache: Optional[TemplateCache] = None,
     ):
         """
         Initialize validation engine.
@@ -105,6 +161,8 @@ class ValidationEngine:
             db_path: Path to tfsm_templates.db. If None, uses default location.
             min_score: Minimum score to consider output valid.
             verbose: Enable verbose output.
+            template_cache: Compiled template cache. If None, uses the
+                process-wide cache.
         """
         if not TEXTFSM_AVAILABLE:
             raise ImportError(
@@ -119,6 +177,7 @@ class ValidationEngine:
         self.min_score = min_score
         self.verbose = verbose
         self.connection_manager = ThreadSafeConnection(db_path, verbose)
+        self.template_cache = template_cache or get_template_cache()
         
         # Verify database exists
         if not Path(db_path).exists():
@@ -127,10 +186,17 @@ class ValidationEngine:
                 "Download from: https://github.com/networktocode/ntc-templates"
             )
 
+        # Token index over template names, built once per database
+        self.template_index = get_template_index(db_path)
+        self.template_index.refresh()
+
     def validate(
         self,
         device_output: str,
         filter_string: Optional[str] = None,
+        preferred_template: Optional[str] = None,
+        accept_score: Optional[float] = None,
+        sample_lines: int = 0,
     ) -> ValidationResult:
         """
         Validate device output against TextFSM templates.
@@ -138,6 +204,13 @@ class ValidationEngine:
         Args:
             device_output: Raw CLI output from device.
             filter_string: Template filter (e.g., "cisco_ios_show_version").
+            preferred_template: Template to try first (e.g. last winner for
+                this platform). Accepted without trying other candidates if
+                it scores at least accept_score.
+            accept_score: Score the preferred template must reach
+                (never below min_score).
+            sample_lines: Score candidates on a sample of this many lines
+                when the output is longer (0 = whole output).
             
         Returns:
             ValidationResult with validation status and parsed data.
@@ -148,7 +221,27 @@ class ValidationEngine:
                 error="Empty output"
             )
         
+        sample = sample_output(device_output, sample_lines)
+        sampled = sample is not None
+        if sampled:
+            device_output = sample
+
         try:
+            if preferred_template:
+                routed = self.try_template(device_output, filter_string, preferred_template)
+                if routed is not None:
+                    parsed_data, score = routed
+                    if score > 0 and score >= max(accept_score or 0.0, self.min_score):
+                        return ValidationResult(
+                            is_valid=True,
+                            template=preferred_template,
+                            parsed_data=parsed_data,
+                            score=score,
+                            routed=True,
+                            sampled=sampled,
+                            template_hash=self.template_hash(filter_string, preferred_template),
+                        )
+
             template, parsed_data, score = self.find_best_template(
                 device_output, filter_string
             )
@@ -160,6 +253,8 @@ class ValidationEngine:
                 template=template,
                 parsed_data=parsed_data,
                 score=score,
+                sampled=sampled,
+                template_hash=self.template_hash(filter_string, template) if template else None,
             )
             
         except Exception as e:
@@ -187,62 +282,108 @@ class ValidationEngine:
         best_parsed_output = None
         best_score = 0.0
 
-        with self.connection_manager.get_connection() as conn:
-            templates = self._get_filtered_templates(conn, filter_string)
-            
-            if self.verbose:
-                print(f"Found {len(templates)} templates for filter: {filter_string}")
-
-            for template in templates:
-                try:
-                    fsm = textfsm.TextFSM(io.StringIO(template['textfsm_content']))
-                    parsed = fsm.ParseText(device_output)
-                    parsed_dicts = [dict(zip(fsm.header, row)) for row in parsed]
-                    score = self._calculate_score(parsed_dicts, template, device_output)
-
-                    if self.verbose:
-                        print(f"  {template['cli_command']}: score={score:.2f}, records={len(parsed_dicts)}")
-
-                    if score > best_score:
-                        best_score = score
-                        best_template = template['cli_command']
-                        best_parsed_output = parsed_dicts
-                        
-                        # Early exit on high confidence match
-                        if score >= 70:
-                            break
-
-                except Exception as e:
-                    if self.verbose:
-                        print(f"  {template['cli_command']}: failed - {e}")
-                    continue
+        templates = self._candidates(filter_string)
+        
+        if self.verbose:
+            print(f"Found {len(templates)} templates for filter: {filter_string}")
+
+        for template in templates:
+            try:
+                parsed_dicts, score = self._score_template(template, device_output)
+
+                if self.verbose:
+                    print(f"  {template['cli_command']}: score={score:.2f}, records={len(parsed_dicts)}")
+
+                if score > best_score:
+                    best_score = score
+                    best_template = template['cli_command']
+                    best_parsed_output = parsed_dicts
+                    
+                    # Early exit on high confidence match
+                    if score >= 70:
+                        break
+
+            except Exception as e:
+                if self.verbose:
+                    print(f"  {template['cli_command']}: failed - {e}")
+                continue
 
         return best_template, best_parsed_output, best_score
 
+    def try_template(
+        self,
+        device_output: str,
+        filter_string: Optional[str],
+        template_name: str,
+    ) -> Optional[Tuple[List[Dict], float]]:
+        """
+        Parse and score output with one named candidate.
+        
+        Returns:
+            Tuple of (parsed_data, score), or None if the template is not
+            among the filter's candidates or fails to parse.
+        """
+        for template in self._candidates(filter_string):
+            if template['cli_command'] != template_name:
+                continue
+            try:
+                parsed_dicts, score = self._score_template(template, device_output)
+            except Exception as e:
+                if self.verbose:
+                    print(f"  {template_name}: failed - {e}")
+                return None
+            return parsed_dicts, score
+        return None
+
+    def template_hash(self, filter_string: Optional[str], template_name: str) -> Optional[str]:
+        """Content hash of a named candidate for filter_string, or None."""
+        for template in self._candidates(filter_string):
+            if template['cli_command'] == template_name:
+                return template[CONTENT_HASH_KEY]
+        return None
+
+    def full_records(
+        self,
+        result: ValidationResult,
+        device_output: str,
+        filter_string: Optional[str],
+    ) -> Optional[List[Dict]]:
+        """
+        All records of a validated output.
+
+        parsed_data as is, unless the result was scored on a sample: then
+        the whole output is parsed once with the winning template.
+        """
+        if not result.template:
+            return None
+        if not result.sampled:
+            return result.parsed_data
+        parsed = self.try_template(device_output, filter_string, result.template)
+        return parsed[0] if parsed else None
+
+    def _candidates(self, filter_string: Optional[str]) -> List[Dict]:
+        """Templates for a filter, from the shared template cache."""
+        with self.connection_manager.get_connection() as conn:
+            return self.template_cache.templates(
+                self.db_path, filter_string,
+                lambda: self._get_filtered_templates(conn, filter_string),
+            )
+
+    def _score_template(self, template: Dict, device_output: str) -> Tuple[List[Dict], float]:
+        """Parse output with one template and score the result."""
+        if not self.template_cache.may_match(template, device_output):
+            return [], 0.0
+        header, parsed = self.template_cache.parse(template, device_output)
+        parsed_dicts = [dict(zip(header, row)) for row in parsed]
+        return parsed_dicts, self._calculate_score(parsed_dicts, template, device_output)
+
     def _get_filtered_templates(
         self,
         connection: sqlite3.Connection,
         filter_string: Optional[str] = None,
     ) -> List[sqlite3.Row]:
         """Get templates matching filter from database."""
-        cursor = connection.cursor()
-        
-        if filter_string:
-            # Split filter into terms and build query
-            filter_terms = filter_string.replace('-', '_').split('_')
-            query = "SELECT * FROM templates WHERE 1=1"
-            params = []
-            
-            for term in filter_terms:
-                if term and len(term) > 2:
-                    query += " AND cli_command LIKE ?"
-                    params.append(f"%{term}%")
-            
-            cursor.execute(query, params)
-        else:
-            cursor.execute("SELECT * FROM templates")
-        
-        return cursor.fetchall()
+        return self.template_index.fetch(connection, filter_string)
 
     def _calculate_score(
         self,
@@ -308,9 +449,7 @@ class ValidationEngine:
 
     def list_templates(self, filter_string: Optional[str] = None) -> List[str]:
         """List available templates matching filter."""
-        with self.connection_manager.get_connection() as conn:
-            templates = self._get_filtered_templates(conn, filter_string)
-            return [t['cli_command'] for t in templates]
+        return self.template_index.commands(filter_string)
 
     def __del__(self):
         """Clean up connections."""
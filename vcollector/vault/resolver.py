@@ -22,6 +22,7 @@ from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 
 from vcollector.core.config import get_config
+from vcollector.core.db import connect
 from vcollector.vault.models import SSHCredentials, CredentialInfo
 
 
@@ -58,6 +59,7 @@ class CredentialResolver:
         self.db_path = db_path or config.collector_db
         self._fernet: Optional[Fernet] = None
         self._unlocked = False
+        self._schema_ready = False
 
     @property
     def is_unlocked(self) -> bool:
@@ -69,11 +71,12 @@ class CredentialResolver:
         # Ensure parent directory exists
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        conn = connect(self.db_path, row_factory=sqlite3.Row)
         
-        # Create tables if they don't exist
-        self._ensure_schema(conn)
+        # Create tables if they don't exist (once - executescript commits)
+        if not self._schema_ready:
+            self._ensure_schema(conn)
+            self._schema_ready = True
         
         return conn
 